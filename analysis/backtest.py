@@ -0,0 +1,221 @@
+# analysis/backtest.py
+"""
+Векторизований бектестер правил входу/виходу на DataFrame з індикаторами.
+Позиції, комісії, крива капіталу та просідання розраховуються операціями над масивами numpy
+без циклу по свічках; перебір параметрів виконується паралельно в пулі процесів.
+Працює офлайн з локального сховища свічок (analysis/kline_store.py).
+"""
+import itertools
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import numpy as np
+
+# Комісія за угоду (частка від обсягу): 0.1% - базова спотова комісія Binance
+DEFAULT_FEE = 0.001
+# Кількість свічок на рік для річної волатильності та коефіцієнта Шарпа
+PERIODS_PER_YEAR = {'1m': 525_600, '5m': 105_120, '15m': 35_040, '30m': 17_520, '1h': 8_760, '4h': 2_190,
+                    '1d': 365, '1w': 52}
+
+@dataclass
+class BacktestResult:
+    """Підсумок бектесту одного набору параметрів."""
+    params: dict
+    total_return: float
+    max_drawdown: float
+    sharpe: float
+    trades: int
+    exposure: float
+    # Криві (лише для одиночного бектесту; у переборі параметрів не зберігаються)
+    equity: np.ndarray = field(default=None, repr=False)
+    drawdown: np.ndarray = field(default=None, repr=False)
+    positions: np.ndarray = field(default=None, repr=False)
+
+    def to_dict(self):
+        return {'params': self.params, 'total_return': self.total_return, 'max_drawdown': self.max_drawdown,
+                'sharpe': self.sharpe, 'trades': self.trades, 'exposure': self.exposure}
+
+def signals_to_positions(entries, exits):
+    """
+    Перетворює сигнали входу/виходу на позицію (1 - в ринку, 0 - поза ринком) без циклу:
+    позиція дорівнює останньому сигналу (вхід має пріоритет, якщо обидва сигнали на одній свічці).
+    """
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.asarray(exits, dtype=bool)
+    signal_index = np.where(entries | exits, np.arange(len(entries)), -1)
+    last_signal = np.maximum.accumulate(signal_index)
+    return np.where(last_signal >= 0, entries[np.maximum(last_signal, 0)], False).astype(float)
+
+def run_backtest(close, entries, exits, fee=DEFAULT_FEE, periods_per_year=365, params=None, keep_curves=True):
+    """
+    Бектест long-only стратегії. Позиція, визначена сигналом на закритті свічки, діє з наступної свічки
+    (без зазирання в майбутнє). Комісія списується з кожної зміни позиції.
+    :return: BacktestResult.
+    """
+    close = np.asarray(close, dtype=float)
+    positions = signals_to_positions(entries, exits)
+    # Позиція на кожній свічці (зсунута на одну свічку) та дохідність ціни
+    held = np.zeros(len(close))
+    held[1:] = positions[:-1]
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1.0
+    turnover = np.abs(np.diff(held, prepend=0.0))
+    strategy_returns = held * returns - fee * turnover
+    equity = np.cumprod(1.0 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    deviation = strategy_returns.std()
+    sharpe = strategy_returns.mean() / deviation * math.sqrt(periods_per_year) if deviation > 0 else 0.0
+    return BacktestResult(
+        params=params or {},
+        total_return=float(equity[-1] - 1.0) if len(equity) else 0.0,
+        max_drawdown=float(drawdown.min()) if len(drawdown) else 0.0,
+        sharpe=float(sharpe),
+        trades=int(np.count_nonzero(np.diff(positions, prepend=0.0) > 0)),
+        exposure=float(held.mean()) if len(held) else 0.0,
+        equity=equity if keep_curves else None,
+        drawdown=drawdown if keep_curves else None,
+        positions=positions if keep_curves else None,
+    )
+
+# --- Правила (функції df, **параметри -> (входи, виходи)); мають бути на рівні модуля для пулу процесів ---
+
+def rsi(close, length=14):
+    """RSI Вайлдера для всього ряду (векторизовано через ewm)."""
+    import pandas as pd
+    change = pd.Series(close).diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1 / length, min_periods=length).mean()
+    return (100 * gain / (gain + loss)).to_numpy()
+
+def rsi_threshold_rule(df, length=14, lower=30, upper=70):
+    """Вхід, коли RSI нижче lower (перепроданість), вихід - коли вище upper."""
+    column = f'RSI_{length}'
+    values = df[column].to_numpy() if column in df else rsi(df['close'].to_numpy(), length)
+    return values < lower, values > upper
+
+def supertrend_flip_rule(df, length=7, multiplier=3.0):
+    """Вхід при зміні напрямку Supertrend на висхідний, вихід - на низхідний."""
+    direction = df[f'SUPERTd_{length}_{multiplier}'].to_numpy()
+    previous = np.r_[np.nan, direction[:-1]]
+    return (direction > 0) & (previous < 0), (direction < 0) & (previous > 0)
+
+def sma_cross_rule(df, fast=20, slow=50):
+    """Вхід, коли швидка SMA перетинає повільну знизу вгору; вихід - при зворотному перетині."""
+    close = df['close'].to_numpy()
+    cumulative = np.r_[0.0, np.cumsum(close)]
+
+    def sma(length):
+        values = np.full(len(close), np.nan)
+        values[length - 1:] = (cumulative[length:] - cumulative[:-length]) / length
+        return values
+
+    above = sma(fast) > sma(slow)
+    previous = np.r_[False, above[:-1]]
+    return above & ~previous, ~above & previous
+
+RULES = {
+    'rsi': rsi_threshold_rule,
+    'supertrend': supertrend_flip_rule,
+    'sma_cross': sma_cross_rule,
+}
+
+def _prepare_rsi(df, grid):
+    """Додає колонки RSI для всіх довжин перебору, щоб не перераховувати RSI для кожної комбінації порогів."""
+    missing = [length for length in grid.get('length', [14]) if f'RSI_{length}' not in df]
+    if not missing:
+        return df
+    df = df.copy()
+    for length in missing:
+        df[f'RSI_{length}'] = rsi(df['close'].to_numpy(), length)
+    return df
+
+# Підготовка DataFrame перед перебором параметрів правила (спільні для комбінацій розрахунки)
+RULE_PREPARERS = {
+    'rsi': _prepare_rsi,
+}
+
+def backtest_rule(df, rule, params=None, fee=DEFAULT_FEE, periods_per_year=365, keep_curves=True):
+    """Застосовує правило з параметрами до DataFrame з індикаторами та запускає бектест."""
+    params = params or {}
+    rule = RULES.get(rule, rule)
+    entries, exits = rule(df, **params)
+    return run_backtest(df['close'].to_numpy(), entries, exits, fee, periods_per_year, params, keep_curves)
+
+# --- Паралельний перебір параметрів ---
+
+_worker_frame = None
+
+def _init_worker(df):
+    """Ініціалізація процесу пулу: DataFrame передається один раз на процес, а не з кожним завданням."""
+    global _worker_frame
+    _worker_frame = df
+
+def _run_chunk(rule, param_chunk, fee, periods_per_year):
+    return [backtest_rule(_worker_frame, rule, params, fee, periods_per_year, keep_curves=False)
+            for params in param_chunk]
+
+def parameter_grid(grid):
+    """{'lower': [20, 30], 'upper': [70, 80]} -> список словників усіх комбінацій."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def sweep(df, rule, grid, fee=DEFAULT_FEE, periods_per_year=365, max_workers=None, chunk_size=256,
+          sort_by='sharpe'):
+    """
+    Перебирає всі комбінації параметрів правила паралельно в пулі процесів.
+    :param rule: Назва правила з RULES або функція рівня модуля.
+    :param grid: Словник {параметр: список значень}.
+    :param max_workers: Кількість процесів (1 - у поточному процесі, без пулу).
+    :return: Список BacktestResult, відсортований за sort_by (спадання).
+    """
+    combinations = parameter_grid(grid)
+    if rule in RULE_PREPARERS:
+        df = RULE_PREPARERS[rule](df, grid)
+    chunks = [combinations[start:start + chunk_size] for start in range(0, len(combinations), chunk_size)]
+    logging.info(f"Перебір {len(combinations)} комбінацій параметрів правила {getattr(rule, '__name__', rule)}")
+    if max_workers == 1 or len(chunks) <= 1:
+        _init_worker(df)
+        results = [result for chunk in chunks for result in _run_chunk(rule, chunk, fee, periods_per_year)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(df,)) as executor:
+            futures = [executor.submit(_run_chunk, rule, chunk, fee, periods_per_year) for chunk in chunks]
+            results = [result for future in futures for result in future.result()]
+    results.sort(key=lambda result: getattr(result, sort_by), reverse=True)
+    return results
+
+def load_backtest_frame(symbol, interval='1d', kline_store=None):
+    """
+    DataFrame з індикаторами з локально збережених свічок (без запитів до біржі).
+    Індикатори для кожної свічки розраховуються інкрементальним рушієм.
+    """
+    from analysis.kline_store import KlineStore
+    from analysis.technical_analysis import indicator_frame, klines_frame
+    if kline_store is None:
+        from balance import config
+        kline_store = KlineStore(config.KLINE_STORE_DIR)
+    records = kline_store.load(symbol.upper(), interval)
+    if len(records) == 0:
+        raise ValueError(f"Немає локальних свічок {symbol.upper()} ({interval}); спочатку запустіть --ta для символу")
+    return indicator_frame(klines_frame(records))
+
+DEFAULT_GRIDS = {
+    'rsi': {'length': [7, 14, 21], 'lower': list(range(15, 45, 5)), 'upper': list(range(55, 90, 5))},
+    'supertrend': {'length': [7], 'multiplier': [3.0]},
+    'sma_cross': {'fast': list(range(5, 55, 5)), 'slow': list(range(20, 220, 20))},
+}
+
+def run_backtest_from_cli(symbol, rule='rsi', interval='1d', fee=DEFAULT_FEE, top=10, output_path=None):
+    """Точка входу для main.py --backtest: перебір параметрів правила, друк найкращих, збереження в JSON."""
+    from balance import config, data_processing
+    df = load_backtest_frame(symbol, interval)
+    results = sweep(df, rule, DEFAULT_GRIDS[rule], fee, PERIODS_PER_YEAR.get(interval, 365))
+    print(f"\n--- Бектест {symbol.upper()} ({interval}), правило '{rule}', свічок: {len(df)} ---")
+    for result in results[:top]:
+        print(f"{result.params}  дохідність {result.total_return:+.2%}  просідання {result.max_drawdown:.2%}  "
+              f"Шарп {result.sharpe:.2f}  угод {result.trades}")
+    output_path = output_path or os.path.join(config.OUTPUT_DIR, f'backtest_{symbol.upper()}_{interval}_{rule}.json')
+    output_dir, file_name = os.path.split(output_path)
+    data_processing.save_to_json([result.to_dict() for result in results], output_dir or '.', file_name)
+    return results
@@ -0,0 +1,142 @@
+# analysis/batch.py
+"""
+Пакетний технічний аналіз багатьох символів: свічки завантажуються паралельно в пулі потоків
+(операції введення-виведення, спільне локальне сховище свічок), а індикатори розраховуються
+в пулі процесів (CPU). Результат - одна таблиця останніх значень індикаторів по символах (JSON або Parquet).
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime
+from analysis.kline_store import KlineStore
+from analysis.results import INCREMENTAL_INDICATOR_GROUPS, INDICATOR_GROUPS, TechnicalAnalysisResult
+from balance import config
+from balance import data_processing
+from balance.prices import USD_STABLECOINS
+from balance.settings import get_settings
+
+DEFAULT_QUOTE_ASSET = 'USDT'
+DEFAULT_FETCH_WORKERS = 8
+BATCH_OUTPUT_BASE_NAME = 'ta_batch_output'
+
+def held_spot_symbols(account, quote_asset=DEFAULT_QUOTE_ASSET, dust_threshold=None):
+    """Пари з quote_asset для всіх активів спотового гаманця (крім стейблкоїнів)."""
+    spot_list, _, _ = account.get_spot_balance(dust_threshold)
+    assets = sorted({item['Актив'] for item in spot_list} - set(USD_STABLECOINS))
+    return [f"{asset}{quote_asset}" for asset in assets]
+
+def _compute_latest(symbol, records, incremental, interval):
+    """
+    Розраховує останні значення індикаторів одного символу (виконується в процесі пулу).
+    :return: Плоский рядок TechnicalAnalysisResult.to_record (NaN зберігається як null).
+    """
+    from analysis.technical_analysis import add_technical_indicators, klines_frame, latest_indicators
+    df = klines_frame(records)
+    if incremental:
+        last_row = latest_indicators(df)
+    else:
+        last_row = add_technical_indicators(df).iloc[-1]
+    groups = INCREMENTAL_INDICATOR_GROUPS if incremental else INDICATOR_GROUPS
+    return TechnicalAnalysisResult.from_row(symbol, last_row, interval, groups).to_record()
+
+def _fetch_all(client, symbols, interval, limit, kline_store, fetch_workers):
+    """Паралельно оновлює свічки символів у сховищі; повертає ({символ: масив свічок}, {символ: помилка})."""
+    records, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="klines") as executor:
+        futures = {executor.submit(kline_store.update, client, symbol, interval, limit): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                symbol_records = future.result()
+            except Exception as e:
+                logging.error(f"Помилка при отриманні свічок {symbol}: {e}")
+                errors[symbol] = str(e)
+                continue
+            if len(symbol_records) == 0:
+                errors[symbol] = "Немає свічок"
+                continue
+            # Копія з memory-mapped файлу, щоб передати масив у процес пулу
+            records[symbol] = symbol_records.copy()
+    return records, errors
+
+def run_batch_analysis(client, symbols, interval='1d', limit=300, kline_store=None, incremental=False,
+                       fetch_workers=DEFAULT_FETCH_WORKERS, max_workers=None, use_processes=True):
+    """
+    Аналізує список символів.
+    :param incremental: Розраховувати індикатори інкрементальним рушієм замість pandas_ta.
+    :param max_workers: Кількість процесів для розрахунку індикаторів (за замовчуванням - кількість CPU).
+    :param use_processes: False - розраховувати індикатори в потоках (наприклад, для налагодження).
+    :return: (рядки результату, відсортовані за символом, {символ: помилка}).
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    kline_store = kline_store or KlineStore(config.KLINE_STORE_DIR)
+    logging.info(f"Пакетний технічний аналіз {len(symbols)} символів ({interval}, {limit} свічок)")
+
+    records, errors = _fetch_all(client, symbols, interval, limit, kline_store, fetch_workers)
+
+    rows = []
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        futures = {executor.submit(_compute_latest, symbol, symbol_records, incremental, interval): symbol
+                   for symbol, symbol_records in records.items()}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                logging.error(f"Помилка при розрахунку індикаторів {symbol}: {e}")
+                errors[symbol] = str(e)
+    rows.sort(key=lambda row: row['symbol'])
+    logging.info(f"Проаналізовано символів: {len(rows)}, з помилками: {len(errors)}")
+    return rows, errors
+
+def save_batch_result(rows, errors, output_path, interval='1d'):
+    """
+    Зберігає таблицю результатів: .parquet - через pandas/pyarrow (якщо встановлено), інакше JSON.
+    :return: Шлях збереженого файлу або None у разі помилки.
+    """
+    if output_path.endswith('.parquet'):
+        import pandas as pd
+        try:
+            pd.DataFrame(rows).to_parquet(output_path, index=False)
+        except ImportError as e:
+            logging.error(f"Для збереження у Parquet потрібен pyarrow: {e}")
+            return None
+        except Exception as e:
+            logging.error(f"Помилка при збереженні у файл Parquet ({output_path}): {e}")
+            return None
+        logging.info(f"Результат пакетного аналізу збережено: {output_path}")
+        return output_path
+
+    data = {
+        'timestamp': datetime.now().isoformat(),
+        'interval': interval,
+        'results': rows,
+        'errors': errors,
+    }
+    output_dir, file_name = os.path.split(output_path)
+    if not data_processing.save_to_json(data, output_dir_path=output_dir or '.', file_name=file_name):
+        return None
+    return output_path
+
+def run_batch_from_cli(account, symbols=None, interval='1d', limit=None, incremental=False, output_path=None):
+    """
+    Точка входу для main.py --ta-batch.
+    :param symbols: Список символів; порожній або None - усі активи спотового гаманця.
+    :param limit: Кількість свічок (за замовчуванням - analysis.kline_limit з налаштувань).
+    :param output_path: Файл результату (за замовчуванням - у папці звітів, формат analysis.output_format).
+    """
+    settings = get_settings()
+    limit = limit or settings.analysis.kline_limit
+    if not symbols:
+        symbols = held_spot_symbols(account)
+        logging.info(f"Символи зі спотового гаманця: {', '.join(symbols) or 'немає'}")
+    if not symbols:
+        logging.warning("Немає символів для пакетного аналізу.")
+        return None
+    rows, errors = run_batch_analysis(account.client, symbols, interval, limit, incremental=incremental,
+                                      fetch_workers=settings.concurrency.kline_fetch_workers)
+    output_path = output_path or os.path.join(
+        config.OUTPUT_DIR, f"{BATCH_OUTPUT_BASE_NAME}.{settings.analysis.output_format}"
+    )
+    return save_batch_result(rows, errors, output_path, interval)
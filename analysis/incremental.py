@@ -0,0 +1,780 @@
+# analysis/incremental.py
+"""
+Інкрементальні технічні індикатори: кожен індикатор зберігає стан (акумулятори EMA/RMA,
+ковзні вікна з поточними сумами, монотонні черги для екстремумів, накопичений OBV)
+і оновлюється за O(1) (або O(довжина вікна) для CCI) на кожну нову закриту свічку,
+без повторного розрахунку всієї історії. Назви значень збігаються з колонками pandas_ta,
+тож analyze_symbol може виводити результат будь-якого з двох джерел. Значення збігаються
+з pandas_ta після прогріву: на перших свічках старт EMA/RMA (зокрема для похідних рядів
+з пропущеними значеннями) може відрізнятися, але різниця згасає. Паритет з pandas_ta
+перевіряє tests/test_incremental.py (якщо pandas_ta встановлено).
+"""
+import collections
+import math
+from datetime import datetime, timezone
+
+NAN = float('nan')
+
+def _valid(value):
+    return value == value and value not in (math.inf, -math.inf)
+
+def _ratio(numerator, denominator, scale=1.0):
+    return scale * numerator / denominator if denominator else NAN
+
+class _Window:
+    """Ковзне вікно фіксованої довжини з поточними сумою та сумою квадратів."""
+    def __init__(self, length):
+        self.length = length
+        self.items = collections.deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value):
+        self.items.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if len(self.items) > self.length:
+            removed = self.items.popleft()
+            self.total -= removed
+            self.total_sq -= removed * removed
+
+    @property
+    def full(self):
+        return len(self.items) == self.length
+
+    def mean(self):
+        return self.total / self.length if self.full else NAN
+
+    def std(self, ddof=0):
+        if not self.full:
+            return NAN
+        variance = (self.total_sq - self.total * self.total / self.length) / (self.length - ddof)
+        return math.sqrt(max(variance, 0.0))
+
+class _Extreme:
+    """Максимум (або мінімум) ковзного вікна за амортизовані O(1) (монотонна черга)."""
+    def __init__(self, length, maximum=True):
+        self.length = length
+        self.maximum = maximum
+        self.queue = collections.deque()  # (номер свічки, значення)
+        self.count = 0
+
+    def push(self, value):
+        better = (lambda a, b: a >= b) if self.maximum else (lambda a, b: a <= b)
+        while self.queue and better(value, self.queue[-1][1]):
+            self.queue.pop()
+        self.queue.append((self.count, value))
+        self.count += 1
+        while self.queue[0][0] <= self.count - 1 - self.length:
+            self.queue.popleft()
+
+    @property
+    def value(self):
+        return self.queue[0][1] if self.count >= self.length else NAN
+
+    @property
+    def age(self):
+        """Скільки свічок тому було досягнуто екстремум вікна."""
+        return self.count - 1 - self.queue[0][0]
+
+class _Sma:
+    """Просте ковзне середнє; NaN на вході до першого валідного значення пропускаються."""
+    def __init__(self, length):
+        self.window = _Window(length)
+        self.value = NAN
+
+    def push(self, value):
+        if _valid(value):
+            self.window.push(value)
+            self.value = self.window.mean()
+        return self.value
+
+class _Wma:
+    """Зважене ковзне середнє (вага останнього значення - length) через поточні суми."""
+    def __init__(self, length):
+        self.length = length
+        self.items = collections.deque()
+        self.total = 0.0
+        self.weighted = 0.0
+        self.value = NAN
+
+    def push(self, value):
+        if not _valid(value):
+            return self.value
+        if len(self.items) == self.length:
+            self.weighted -= self.total
+            self.total -= self.items.popleft()
+        self.items.append(value)
+        self.total += value
+        self.weighted += len(self.items) * value
+        if len(self.items) == self.length:
+            self.value = self.weighted / (self.length * (self.length + 1) / 2)
+        return self.value
+
+class _Ema:
+    """
+    EMA, що стартує з SMA перших length значень (як ema у pandas_ta).
+    Пропущені (NaN) значення не враховуються, тож для рядів з NaN на початку старт відрізняється від pandas_ta.
+    """
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.seed = []
+        self.value = NAN
+
+    def push(self, value):
+        if not _valid(value):
+            return self.value
+        if len(self.seed) < self.length:
+            self.seed.append(value)
+            if len(self.seed) == self.length:
+                self.value = sum(self.seed) / self.length
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+class _Rma:
+    """Згладжування Вайлдера: ewm(alpha=1/length, min_periods=length).mean() у pandas."""
+    def __init__(self, length):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+        self.value = NAN
+
+    def push(self, value):
+        if not _valid(value):
+            return self.value
+        self.numerator = self.numerator * self.decay + value
+        self.denominator = self.denominator * self.decay + 1.0
+        self.count += 1
+        if self.count >= self.length:
+            self.value = self.numerator / self.denominator
+        return self.value
+
+class _Lag:
+    """Значення length свічок тому."""
+    def __init__(self, length):
+        self.items = collections.deque(maxlen=length + 1)
+
+    def push(self, value):
+        self.items.append(value)
+        return self.items[0] if len(self.items) == self.items.maxlen else NAN
+
+def _roc(value, previous):
+    return 100.0 * (value - previous) / previous if _valid(previous) and previous else NAN
+
+class Indicator:
+    """
+    Базовий клас інкрементального індикатора.
+    update приймає закриту свічку (словник або запис KLINE_DTYPE з полями open, high, low, close,
+    volume, open_time) і оновлює стан; values повертає останні значення {колонка pandas_ta: значення}.
+    """
+    def update(self, candle):
+        raise NotImplementedError
+
+    def values(self):
+        raise NotImplementedError
+
+class SMA(Indicator):
+    def __init__(self, length):
+        self.name = f'SMA_{length}'
+        self.sma = _Sma(length)
+
+    def update(self, candle):
+        self.sma.push(float(candle['close']))
+
+    def values(self):
+        return {self.name: self.sma.value}
+
+class EMA(Indicator):
+    def __init__(self, length):
+        self.name = f'EMA_{length}'
+        self.ema = _Ema(length)
+
+    def update(self, candle):
+        self.ema.push(float(candle['close']))
+
+    def values(self):
+        return {self.name: self.ema.value}
+
+class RSI(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.gain = _Rma(length)
+        self.loss = _Rma(length)
+        self.previous_close = None
+
+    def update(self, candle):
+        close = float(candle['close'])
+        if self.previous_close is not None:
+            change = close - self.previous_close
+            self.gain.push(max(change, 0.0))
+            self.loss.push(max(-change, 0.0))
+        self.previous_close = close
+
+    def values(self):
+        return {f'RSI_{self.length}': _ratio(self.gain.value, self.gain.value + self.loss.value, 100.0)}
+
+class MACD(Indicator):
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.suffix = f'{fast}_{slow}_{signal}'
+        self.fast = _Ema(fast)
+        self.slow = _Ema(slow)
+        self.signal = _Ema(signal)
+        self.macd = NAN
+
+    def update(self, candle):
+        close = float(candle['close'])
+        self.macd = self.fast.push(close) - self.slow.push(close)
+        self.signal.push(self.macd)
+
+    def values(self):
+        return {
+            f'MACD_{self.suffix}': self.macd,
+            f'MACDh_{self.suffix}': self.macd - self.signal.value,
+            f'MACDs_{self.suffix}': self.signal.value,
+        }
+
+class STOCH(Indicator):
+    def __init__(self, k=14, d=3, smooth_k=3):
+        self.suffix = f'{k}_{d}_{smooth_k}'
+        self.highest = _Extreme(k, maximum=True)
+        self.lowest = _Extreme(k, maximum=False)
+        self.k = _Sma(smooth_k)
+        self.d = _Sma(d)
+
+    def update(self, candle):
+        self.highest.push(float(candle['high']))
+        self.lowest.push(float(candle['low']))
+        low = self.lowest.value
+        stoch = _ratio(float(candle['close']) - low, self.highest.value - low, 100.0)
+        self.d.push(self.k.push(stoch))
+
+    def values(self):
+        return {f'STOCHk_{self.suffix}': self.k.value, f'STOCHd_{self.suffix}': self.d.value}
+
+class WILLR(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.highest = _Extreme(length, maximum=True)
+        self.lowest = _Extreme(length, maximum=False)
+        self.close = NAN
+
+    def update(self, candle):
+        self.highest.push(float(candle['high']))
+        self.lowest.push(float(candle['low']))
+        self.close = float(candle['close'])
+
+    def values(self):
+        high = self.highest.value
+        return {f'WILLR_{self.length}': _ratio(self.close - high, high - self.lowest.value, 100.0)}
+
+class AO(Indicator):
+    def __init__(self, fast=5, slow=34):
+        self.name = f'AO_{fast}_{slow}'
+        self.fast = _Sma(fast)
+        self.slow = _Sma(slow)
+
+    def update(self, candle):
+        median = (float(candle['high']) + float(candle['low'])) / 2
+        self.fast.push(median)
+        self.slow.push(median)
+
+    def values(self):
+        return {self.name: self.fast.value - self.slow.value}
+
+class CCI(Indicator):
+    """CCI потребує середнього відхилення по вікну - O(length) на свічку, незалежно від довжини історії."""
+    def __init__(self, length=20, c=0.015):
+        self.name = f'CCI_{length}_{c}'
+        self.c = c
+        self.window = _Window(length)
+        self.value = NAN
+
+    def update(self, candle):
+        typical = (float(candle['high']) + float(candle['low']) + float(candle['close'])) / 3
+        self.window.push(typical)
+        if self.window.full:
+            mean = self.window.mean()
+            mad = sum(abs(item - mean) for item in self.window.items) / self.window.length
+            self.value = _ratio(typical - mean, self.c * mad)
+
+    def values(self):
+        return {self.name: self.value}
+
+class ROC(Indicator):
+    def __init__(self, length=10):
+        self.length = length
+        self.lag = _Lag(length)
+        self.value = NAN
+
+    def update(self, candle):
+        close = float(candle['close'])
+        self.value = _roc(close, self.lag.push(close))
+
+    def values(self):
+        return {f'ROC_{self.length}': self.value}
+
+class TRIX(Indicator):
+    def __init__(self, length=15, signal=9):
+        self.suffix = f'{length}_{signal}'
+        self.emas = [_Ema(length), _Ema(length), _Ema(length)]
+        self.signal = _Sma(signal)
+        self.previous = NAN
+        self.value = NAN
+
+    def update(self, candle):
+        value = float(candle['close'])
+        for ema in self.emas:
+            value = ema.push(value)
+        self.value = _roc(value, self.previous)
+        self.previous = value
+        self.signal.push(self.value)
+
+    def values(self):
+        return {f'TRIX_{self.suffix}': self.value, f'TRIXs_{self.suffix}': self.signal.value}
+
+class CMO(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.up = _Rma(length)
+        self.down = _Rma(length)
+        self.previous_close = None
+
+    def update(self, candle):
+        close = float(candle['close'])
+        if self.previous_close is not None:
+            change = close - self.previous_close
+            self.up.push(max(change, 0.0))
+            self.down.push(max(-change, 0.0))
+        self.previous_close = close
+
+    def values(self):
+        up, down = self.up.value, self.down.value
+        return {f'CMO_{self.length}': _ratio(up - down, up + down, 100.0)}
+
+class KST(Indicator):
+    def __init__(self, roc=(10, 15, 20, 30), sma=(10, 10, 10, 15), signal=9):
+        self.name = f"KST_{'_'.join(map(str, roc + sma))}"
+        self.signal_name = f'KSTs_{signal}'
+        self.lags = [_Lag(length) for length in roc]
+        self.smas = [_Sma(length) for length in sma]
+        self.signal = _Sma(signal)
+        self.value = NAN
+
+    def update(self, candle):
+        close = float(candle['close'])
+        self.value = sum(weight * sma.push(_roc(close, lag.push(close)))
+                         for weight, (lag, sma) in enumerate(zip(self.lags, self.smas), start=1))
+        self.signal.push(self.value)
+
+    def values(self):
+        return {self.name: self.value, self.signal_name: self.signal.value}
+
+class COPPOCK(Indicator):
+    def __init__(self, length=10, fast=11, slow=14):
+        self.name = f'COPC_{fast}_{slow}_{length}'
+        self.fast = _Lag(fast)
+        self.slow = _Lag(slow)
+        self.wma = _Wma(length)
+
+    def update(self, candle):
+        close = float(candle['close'])
+        self.wma.push(_roc(close, self.fast.push(close)) + _roc(close, self.slow.push(close)))
+
+    def values(self):
+        return {self.name: self.wma.value}
+
+class TSI(Indicator):
+    def __init__(self, fast=13, slow=25, signal=13):
+        self.suffix = f'{fast}_{slow}_{signal}'
+        self.momentum = (_Ema(slow), _Ema(fast))
+        self.absolute = (_Ema(slow), _Ema(fast))
+        self.signal = _Ema(signal)
+        self.previous_close = None
+        self.value = NAN
+
+    def update(self, candle):
+        close = float(candle['close'])
+        if self.previous_close is not None:
+            change = close - self.previous_close
+            momentum = self.momentum[1].push(self.momentum[0].push(change))
+            absolute = self.absolute[1].push(self.absolute[0].push(abs(change)))
+            self.value = _ratio(momentum, absolute, 100.0)
+            self.signal.push(self.value)
+        self.previous_close = close
+
+    def values(self):
+        return {f'TSI_{self.suffix}': self.value, f'TSIs_{self.suffix}': self.signal.value}
+
+class UO(Indicator):
+    def __init__(self, fast=7, medium=14, slow=28):
+        self.name = f'UO_{fast}_{medium}_{slow}'
+        self.windows = [(_Window(length), _Window(length)) for length in (fast, medium, slow)]
+        self.previous_close = None
+
+    def update(self, candle):
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        if self.previous_close is not None:
+            true_low = min(low, self.previous_close)
+            true_high = max(high, self.previous_close)
+            for buying_pressure, true_range in self.windows:
+                buying_pressure.push(close - true_low)
+                true_range.push(true_high - true_low)
+        self.previous_close = close
+
+    def values(self):
+        averages = [_ratio(bp.total, tr.total) if tr.full else NAN for bp, tr in self.windows]
+        return {self.name: 100.0 * (4 * averages[0] + 2 * averages[1] + averages[2]) / 7}
+
+class ADX(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.atr = _Rma(length)
+        self.plus = _Rma(length)
+        self.minus = _Rma(length)
+        self.adx = _Rma(length)
+        self.previous = None
+        self.dmp = self.dmn = NAN
+
+    def update(self, candle):
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        if self.previous is not None:
+            previous_high, previous_low, previous_close = self.previous
+            up, down = high - previous_high, previous_low - low
+            true_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+            atr = self.atr.push(true_range)
+            self.dmp = _ratio(self.plus.push(up if up > down and up > 0 else 0.0), atr, 100.0)
+            self.dmn = _ratio(self.minus.push(down if down > up and down > 0 else 0.0), atr, 100.0)
+            self.adx.push(_ratio(abs(self.dmp - self.dmn), self.dmp + self.dmn, 100.0))
+        self.previous = (high, low, close)
+
+    def values(self):
+        return {f'ADX_{self.length}': self.adx.value, f'DMP_{self.length}': self.dmp, f'DMN_{self.length}': self.dmn}
+
+class AROON(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.highest = _Extreme(length + 1, maximum=True)
+        self.lowest = _Extreme(length + 1, maximum=False)
+
+    def update(self, candle):
+        self.highest.push(float(candle['high']))
+        self.lowest.push(float(candle['low']))
+
+    def values(self):
+        if self.highest.count < self.length + 1:
+            up = down = NAN
+        else:
+            up = 100.0 * (self.length - self.highest.age) / self.length
+            down = 100.0 * (self.length - self.lowest.age) / self.length
+        return {f'AROOND_{self.length}': down, f'AROONU_{self.length}': up, f'AROONOSC_{self.length}': up - down}
+
+class VORTEX(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.plus = _Window(length)
+        self.minus = _Window(length)
+        self.true_range = _Window(length)
+        self.previous = None
+
+    def update(self, candle):
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        if self.previous is not None:
+            previous_high, previous_low, previous_close = self.previous
+            self.plus.push(abs(high - previous_low))
+            self.minus.push(abs(low - previous_high))
+            self.true_range.push(max(high - low, abs(high - previous_close), abs(low - previous_close)))
+        self.previous = (high, low, close)
+
+    def values(self):
+        full = self.true_range.full
+        return {
+            f'VTXP_{self.length}': _ratio(self.plus.total, self.true_range.total) if full else NAN,
+            f'VTXM_{self.length}': _ratio(self.minus.total, self.true_range.total) if full else NAN,
+        }
+
+class PSAR(Indicator):
+    def __init__(self, af=0.02, max_af=0.2):
+        self.suffix = f'{af}_{max_af}'
+        self.step = af
+        self.max_af = max_af
+        self.previous = None
+        self.long = None
+        self.sar = NAN
+
+    def update(self, candle):
+        high, low = float(candle['high']), float(candle['low'])
+        if self.previous is None:
+            self.previous = (high, low)
+            return
+        previous_high, previous_low = self.previous
+        if self.long is None:
+            # Початковий напрямок - за першими двома свічками
+            self.long = not (previous_low - low > high - previous_high and previous_low - low > 0)
+            self.sar = previous_low if self.long else previous_high
+            self.extreme = high if self.long else low
+            self.af = self.step
+        else:
+            sar = self.sar + self.af * (self.extreme - self.sar)
+            if self.long:
+                sar = min(sar, previous_low, self.last_low)
+                if low < sar:
+                    self.long, sar, self.extreme, self.af = False, self.extreme, low, self.step
+                elif high > self.extreme:
+                    self.extreme, self.af = high, min(self.af + self.step, self.max_af)
+            else:
+                sar = max(sar, previous_high, self.last_high)
+                if high > sar:
+                    self.long, sar, self.extreme, self.af = True, self.extreme, high, self.step
+                elif low < self.extreme:
+                    self.extreme, self.af = low, min(self.af + self.step, self.max_af)
+            self.sar = sar
+        self.last_high, self.last_low = previous_high, previous_low
+        self.previous = (high, low)
+
+    def values(self):
+        return {
+            f'PSARl_{self.suffix}': self.sar if self.long else NAN,
+            f'PSARs_{self.suffix}': self.sar if self.long is False else NAN,
+        }
+
+class ICHIMOKU(Indicator):
+    """Лінії тенкан-сен та кідзюн-сен (хмара зміщена в майбутнє і потребує всієї історії pandas_ta)."""
+    def __init__(self, tenkan=9, kijun=26):
+        self.lines = {
+            f'ITS_{tenkan}': (_Extreme(tenkan, True), _Extreme(tenkan, False)),
+            f'IKS_{kijun}': (_Extreme(kijun, True), _Extreme(kijun, False)),
+        }
+
+    def update(self, candle):
+        for highest, lowest in self.lines.values():
+            highest.push(float(candle['high']))
+            lowest.push(float(candle['low']))
+
+    def values(self):
+        return {name: (highest.value + lowest.value) / 2 for name, (highest, lowest) in self.lines.items()}
+
+class SUPERTREND(Indicator):
+    def __init__(self, length=7, multiplier=3.0):
+        self.suffix = f'{length}_{multiplier}'
+        self.multiplier = multiplier
+        self.atr = _Rma(length)
+        self.previous_close = None
+        self.upper = self.lower = NAN
+        self.direction = 1
+        self.value = NAN
+
+    def update(self, candle):
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        if self.previous_close is not None:
+            atr = self.atr.push(max(high - low, abs(high - self.previous_close), abs(low - self.previous_close)))
+            if _valid(atr):
+                median = (high + low) / 2
+                upper, lower = median + self.multiplier * atr, median - self.multiplier * atr
+                if _valid(self.upper):
+                    if close > self.upper:
+                        self.direction = 1
+                    elif close < self.lower:
+                        self.direction = -1
+                    elif self.direction > 0:
+                        lower = max(lower, self.lower)
+                    else:
+                        upper = min(upper, self.upper)
+                self.upper, self.lower = upper, lower
+                self.value = lower if self.direction > 0 else upper
+        self.previous_close = close
+
+    def values(self):
+        return {
+            f'SUPERT_{self.suffix}': self.value,
+            f'SUPERTd_{self.suffix}': float(self.direction) if _valid(self.value) else NAN,
+            f'SUPERTl_{self.suffix}': self.value if self.direction > 0 else NAN,
+            f'SUPERTs_{self.suffix}': self.value if self.direction < 0 else NAN,
+        }
+
+class BBANDS(Indicator):
+    def __init__(self, length=20, std=2.0):
+        self.suffix = f'{length}_{std}'
+        self.std = std
+        self.window = _Window(length)
+        self.close = NAN
+
+    def update(self, candle):
+        self.close = float(candle['close'])
+        self.window.push(self.close)
+
+    def values(self):
+        middle = self.window.mean()
+        deviation = self.std * self.window.std(ddof=0)
+        lower, upper = middle - deviation, middle + deviation
+        return {
+            f'BBL_{self.suffix}': lower,
+            f'BBM_{self.suffix}': middle,
+            f'BBU_{self.suffix}': upper,
+            f'BBB_{self.suffix}': _ratio(upper - lower, middle, 100.0),
+            f'BBP_{self.suffix}': _ratio(self.close - lower, upper - lower),
+        }
+
+class ATR(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.atr = _Rma(length)
+        self.previous_close = None
+
+    def update(self, candle):
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        if self.previous_close is not None:
+            self.atr.push(max(high - low, abs(high - self.previous_close), abs(low - self.previous_close)))
+        self.previous_close = close
+
+    def values(self):
+        return {f'ATRr_{self.length}': self.atr.value}
+
+class STDEV(Indicator):
+    def __init__(self, length=20):
+        self.length = length
+        self.window = _Window(length)
+
+    def update(self, candle):
+        self.window.push(float(candle['close']))
+
+    def values(self):
+        return {f'STDEV_{self.length}': self.window.std(ddof=1)}
+
+class DONCHIAN(Indicator):
+    def __init__(self, lower_length=20, upper_length=20):
+        self.suffix = f'{lower_length}_{upper_length}'
+        self.lowest = _Extreme(lower_length, maximum=False)
+        self.highest = _Extreme(upper_length, maximum=True)
+
+    def update(self, candle):
+        self.lowest.push(float(candle['low']))
+        self.highest.push(float(candle['high']))
+
+    def values(self):
+        lower, upper = self.lowest.value, self.highest.value
+        return {f'DCL_{self.suffix}': lower, f'DCM_{self.suffix}': (lower + upper) / 2, f'DCU_{self.suffix}': upper}
+
+class OBV(Indicator):
+    def __init__(self):
+        self.obv = 0.0
+        self.previous_close = None
+
+    def update(self, candle):
+        close, volume = float(candle['close']), float(candle['volume'])
+        if self.previous_close is None or close > self.previous_close:
+            self.obv += volume
+        elif close < self.previous_close:
+            self.obv -= volume
+        self.previous_close = close
+
+    def values(self):
+        return {'OBV': self.obv if self.previous_close is not None else NAN}
+
+class CMF(Indicator):
+    def __init__(self, length=20):
+        self.length = length
+        self.flow = _Window(length)
+        self.volume = _Window(length)
+
+    def update(self, candle):
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        volume = float(candle['volume'])
+        multiplier = _ratio((close - low) - (high - close), high - low) if high != low else 0.0
+        self.flow.push(multiplier * volume)
+        self.volume.push(volume)
+
+    def values(self):
+        return {f'CMF_{self.length}': _ratio(self.flow.total, self.volume.total) if self.volume.full else NAN}
+
+class MFI(Indicator):
+    def __init__(self, length=14):
+        self.length = length
+        self.positive = _Window(length)
+        self.negative = _Window(length)
+        self.previous_typical = None
+
+    def update(self, candle):
+        typical = (float(candle['high']) + float(candle['low']) + float(candle['close'])) / 3
+        if self.previous_typical is not None:
+            flow = typical * float(candle['volume'])
+            self.positive.push(flow if typical > self.previous_typical else 0.0)
+            self.negative.push(flow if typical < self.previous_typical else 0.0)
+        self.previous_typical = typical
+
+    def values(self):
+        if not self.positive.full:
+            return {f'MFI_{self.length}': NAN}
+        return {f'MFI_{self.length}': _ratio(self.positive.total, self.positive.total + self.negative.total, 100.0)}
+
+class VWAP(Indicator):
+    """VWAP з якорем на початок доби (UTC), як VWAP_D у pandas_ta."""
+    def __init__(self):
+        self.day = None
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, candle):
+        day = datetime.fromtimestamp(int(candle['open_time']) / 1000, tz=timezone.utc).date()
+        if day != self.day:
+            self.day, self.price_volume, self.volume = day, 0.0, 0.0
+        typical = (float(candle['high']) + float(candle['low']) + float(candle['close'])) / 3
+        volume = float(candle['volume'])
+        self.price_volume += typical * volume
+        self.volume += volume
+
+    def values(self):
+        return {'VWAP_D': _ratio(self.price_volume, self.volume)}
+
+def default_indicators():
+    """Набір індикаторів, аналогічний стратегії add_technical_indicators (без зміщених у майбутнє DPO та хмари Ішимоку)."""
+    return [
+        RSI(14), MACD(12, 26, 9), STOCH(14, 3, 3), WILLR(14), AO(), CCI(20), ROC(10), TRIX(15, 9), CMO(14),
+        KST(), COPPOCK(), TSI(), UO(),
+        EMA(20), EMA(50), EMA(200), SMA(20), SMA(50), SMA(200), ADX(14), AROON(14), VORTEX(14), PSAR(),
+        ICHIMOKU(), SUPERTREND(),
+        BBANDS(20, 2.0), ATR(14), STDEV(20), DONCHIAN(20, 20),
+        OBV(), CMF(20), MFI(14), VWAP(),
+    ]
+
+class IncrementalIndicatorEngine:
+    """
+    Тримає стан усіх індикаторів. Початковий прогрів - один прохід по історії (update_many),
+    далі кожна нова закрита свічка - update за O(1) без перерахунку стратегії.
+    """
+    def __init__(self, indicators=None):
+        self.indicators = default_indicators() if indicators is None else list(indicators)
+        self.last_candle = None
+        self.count = 0
+
+    def update(self, candle):
+        """
+        Додає закриту свічку.
+        :return: Словник останніх значень усіх індикаторів.
+        """
+        self._push(candle)
+        return self.latest()
+
+    def update_many(self, candles):
+        """
+        Додає послідовність свічок (наприклад, масив KLINE_DTYPE зі сховища свічок).
+        Значення індикаторів збираються один раз, після останньої свічки.
+        """
+        for candle in candles:
+            self._push(candle)
+        return self.latest()
+
+    def _push(self, candle):
+        for indicator in self.indicators:
+            indicator.update(candle)
+        self.last_candle = candle
+        self.count += 1
+
+    def latest(self):
+        values = {}
+        for indicator in self.indicators:
+            values.update(indicator.values())
+        return values
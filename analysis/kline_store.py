@@ -0,0 +1,146 @@
+# analysis/kline_store.py
+import collections
+import logging
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+
+# Формат запису свічки (88 байт, little-endian) - ті самі поля, що й у відповіді GET /api/v3/klines
+KLINE_DTYPE = np.dtype([
+    ('open_time', '<i8'),                       # Час відкриття свічки, мс (Unix-час, UTC)
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('close_time', '<i8'),                      # Час закриття свічки, мс
+    ('quote_asset_volume', '<f8'),
+    ('number_of_trades', '<i8'),
+    ('taker_buy_base_asset_volume', '<f8'),
+    ('taker_buy_quote_asset_volume', '<f8'),
+])
+
+KLINE_FILE_SUFFIX = '.bin'
+# Максимальна кількість свічок в одній відповіді Binance
+MAX_KLINES_PER_REQUEST = 1000
+
+def klines_to_array(klines):
+    """Перетворює відповідь get_klines (списки з числами у вигляді рядків) на масив KLINE_DTYPE."""
+    return np.array([tuple(kline[:len(KLINE_DTYPE.names)]) for kline in klines], dtype=KLINE_DTYPE)
+
+class KlineStore:
+    """
+    Локальне сховище свічок: окремий файл для кожної пари (символ, інтервал) з відсортованими
+    за часом записами KLINE_DTYPE фіксованого розміру. Читання - memory-mapped масив без копіювання.
+    Оновлення запитує лише свічки, новіші за останню збережену (остання збережена свічка могла
+    бути ще не закритою, тому вона запитується повторно й перезаписується), а глибша історія
+    дозавантажується сторінками в минуле.
+    """
+    def __init__(self, root_dir, max_request_limit=MAX_KLINES_PER_REQUEST):
+        self.root_dir = root_dir
+        self.max_request_limit = max_request_limit
+        self._lock = threading.Lock()
+        # Окреме блокування для кожної пари: різні символи можна оновлювати паралельно
+        self._path_locks = collections.defaultdict(threading.Lock)
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root_dir, f"{symbol.upper()}_{interval}{KLINE_FILE_SUFFIX}")
+
+    def load(self, symbol, interval):
+        """
+        Повертає всі збережені свічки як read-only memory-mapped масив KLINE_DTYPE
+        (порожній масив, якщо свічок ще немає).
+        """
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=KLINE_DTYPE)
+        # Незавершений останній запис (наприклад, після аварійної зупинки) ігнорується
+        count = os.path.getsize(path) // KLINE_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.memmap(path, dtype=KLINE_DTYPE, mode='r', shape=(count,))
+
+    def _fetch(self, client, symbol, interval, limit, **time_range):
+        return klines_to_array(client.get_klines(symbol=symbol, interval=interval, limit=limit, **time_range))
+
+    def _fetch_newer(self, client, symbol, interval, start_time):
+        """Запитує всі свічки, починаючи з start_time (мс), сторінками вперед."""
+        pages = []
+        while True:
+            page = self._fetch(client, symbol, interval, self.max_request_limit, startTime=int(start_time))
+            pages.append(page)
+            if len(page) < self.max_request_limit:
+                break
+            start_time = page['open_time'][-1] + 1
+        return np.concatenate(pages)
+
+    def _fetch_older(self, client, symbol, interval, end_time, count):
+        """Запитує до count свічок, що закінчуються до end_time (мс), сторінками в минуле."""
+        pages = []
+        while count > 0:
+            limit = min(count, self.max_request_limit)
+            page = self._fetch(client, symbol, interval, limit, endTime=int(end_time))
+            if len(page) == 0:
+                break
+            pages.append(page)
+            count -= len(page)
+            if len(page) < limit:
+                # Досягнуто початку історії символу
+                break
+            end_time = page['open_time'][0] - 1
+        pages.reverse()
+        return np.concatenate(pages) if pages else np.empty(0, dtype=KLINE_DTYPE)
+
+    def _write(self, path, records):
+        """Атомарно замінює файл пари (тимчасовий файл + перейменування)."""
+        os.makedirs(self.root_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.root_dir, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(records.tobytes())
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def update(self, client, symbol, interval, limit=300):
+        """
+        Синхронізує сховище з біржею та повертає щонайменше `limit` останніх свічок (якщо вони існують).
+        Для вже збереженої пари це зазвичай один невеликий запит.
+        :return: Memory-mapped масив KLINE_DTYPE з останніми `limit` свічками (view без копіювання).
+        """
+        symbol = symbol.upper()
+        path = self.path(symbol, interval)
+        with self._lock:
+            path_lock = self._path_locks[path]
+        with path_lock:
+            stored = self.load(symbol, interval)
+            if len(stored) == 0:
+                logging.info(f"Завантаження {limit} свічок {symbol} ({interval}) у локальне сховище")
+                records = self._fetch_older(client, symbol, interval, time.time() * 1000, limit)
+                if len(records):
+                    self._write(path, records)
+            else:
+                last_open_time = int(stored['open_time'][-1])
+                newer = self._fetch_newer(client, symbol, interval, last_open_time)
+                keep = int(np.searchsorted(stored['open_time'], newer['open_time'][0])) if len(newer) else len(stored)
+                older = np.empty(0, dtype=KLINE_DTYPE)
+                missing = limit - (keep + len(newer))
+                if missing > 0:
+                    older = self._fetch_older(client, symbol, interval, int(stored['open_time'][0]) - 1, missing)
+                if len(older):
+                    # Дозавантаження в минуле - файл перезаписується повністю
+                    records = np.concatenate([older, np.asarray(stored[:keep]), newer])
+                    del stored
+                    self._write(path, records)
+                elif len(newer):
+                    del stored
+                    # Незакрита свічка та все після неї перезаписуються, решта файлу не змінюється
+                    with open(path, 'r+b') as f:
+                        f.truncate(keep * KLINE_DTYPE.itemsize)
+                        f.seek(0, os.SEEK_END)
+                        f.write(newer.tobytes())
+                    logging.info(f"Оновлено {len(newer)} свічок {symbol} ({interval})")
+        return self.load(symbol, interval)[-limit:]
@@ -0,0 +1,190 @@
+# analysis/results.py
+"""
+Структурований результат технічного аналізу: останні значення індикаторів, згруповані
+як у звіті analyze_symbol, з перевіркою стратегії на фактично розраховані колонки
+та експортом у словник, JSON, DataFrame і Parquet.
+"""
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# Колонки, які має створити стратегія add_technical_indicators (назви pandas_ta), за групами звіту
+INDICATOR_GROUPS = {
+    'momentum': ['RSI_14', 'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9', 'STOCHk_14_3_3', 'STOCHd_14_3_3',
+                 'WILLR_14', 'AO_5_34', 'CCI_20_0.015', 'ROC_10', 'TRIX_15_9', 'TRIXs_15_9', 'CMO_14',
+                 'KST_10_15_20_30_10_10_10_15', 'KSTs_9', 'COPC_11_14_10', 'TSI_13_25_13', 'TSIs_13_25_13',
+                 'UO_7_14_28', 'DPO_20'],
+    'trend': ['EMA_20', 'EMA_50', 'EMA_200', 'SMA_20', 'SMA_50', 'SMA_200', 'ADX_14', 'DMP_14', 'DMN_14',
+              'AROOND_14', 'AROONU_14', 'AROONOSC_14', 'VTXP_14', 'VTXM_14', 'PSARl_0.02_0.2', 'PSARs_0.02_0.2',
+              'ITS_9', 'IKS_26', 'ISA_9', 'ISB_26', 'ICS_26', 'SUPERT_7_3.0', 'SUPERTd_7_3.0', 'SUPERTl_7_3.0',
+              'SUPERTs_7_3.0'],
+    'volatility': ['BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0', 'BBP_20_2.0', 'ATRr_14', 'STDEV_20',
+                   'DCL_20_20', 'DCM_20_20', 'DCU_20_20'],
+    'volume': ['OBV', 'CMF_20', 'MFI_14', 'VWAP_D'],
+}
+# Зміщені в майбутнє колонки, яких свідомо не розраховує інкрементальний рушій (analysis/incremental.py)
+INCREMENTAL_SKIPPED_COLUMNS = ('DPO_20', 'ISA_9', 'ISB_26', 'ICS_26')
+# Очікувані колонки результату інкрементального рушія (--ta-incremental)
+INCREMENTAL_INDICATOR_GROUPS = {
+    group: [name for name in names if name not in INCREMENTAL_SKIPPED_COLUMNS]
+    for group, names in INDICATOR_GROUPS.items()
+}
+INDICATOR_GROUP_TITLES = {
+    'momentum': "Індикатори Моментуму",
+    'trend': "Трендові Індикатори",
+    'volatility': "Індикатори Волатильності",
+    'volume': "Індикатори Об'єму",
+}
+# Колонки свічок, що не є індикаторами
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+def validate_indicator_columns(columns, groups=None):
+    """
+    Порівнює колонки, створені стратегією, з очікуваними в INDICATOR_GROUPS.
+    :return: (очікувані, але відсутні колонки; створені колонки поза групами).
+    """
+    groups = groups or INDICATOR_GROUPS
+    expected = [name for names in groups.values() for name in names]
+    produced = [name for name in columns if name not in OHLCV_COLUMNS]
+    missing = [name for name in expected if name not in set(produced)]
+    unexpected = [name for name in produced if name not in set(expected)]
+    return missing, unexpected
+
+def _to_float(value):
+    """float або None для NaN/нечислових значень (NaN не є валідним JSON)."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+@dataclass
+class TechnicalAnalysisResult:
+    """Останні значення індикаторів одного символу (і таймфрейму)."""
+    symbol: str
+    time: datetime
+    close: float
+    timeframe: str = '1d'
+    # {група: {колонка: значення або None}} у порядку INDICATOR_GROUPS
+    indicators: dict = field(default_factory=dict)
+    # Колонки, розраховані стратегією, але не віднесені до жодної групи
+    extra: dict = field(default_factory=dict)
+    # Очікувані колонки, яких немає в результаті стратегії
+    missing: list = field(default_factory=list)
+
+    @classmethod
+    def from_row(cls, symbol, last_row, timeframe='1d', groups=None):
+        """
+        Створює результат з останнього рядка DataFrame з індикаторами (pd.Series; name - час свічки).
+        Відсутні та неочікувані колонки логуються, а не відкидаються мовчки.
+        """
+        groups = groups or INDICATOR_GROUPS
+        missing, unexpected = validate_indicator_columns(last_row.index, groups)
+        if missing:
+            logging.warning(f"{symbol} ({timeframe}): стратегія не створила колонки: {', '.join(missing)}")
+        if unexpected:
+            logging.info(f"{symbol} ({timeframe}): колонки поза групами звіту: {', '.join(unexpected)}")
+        indicators = {
+            group: {name: _to_float(last_row[name]) for name in names if name in last_row.index}
+            for group, names in groups.items()
+        }
+        time = last_row.name.to_pydatetime() if hasattr(last_row.name, 'to_pydatetime') else last_row.name
+        return cls(
+            symbol=symbol,
+            time=time,
+            close=_to_float(last_row['close']),
+            timeframe=timeframe,
+            indicators=indicators,
+            extra={name: _to_float(last_row[name]) for name in unexpected},
+            missing=missing,
+        )
+
+    def values(self):
+        """Усі значення індикаторів одним словником {колонка: значення}."""
+        flat = {}
+        for group_values in self.indicators.values():
+            flat.update(group_values)
+        flat.update(self.extra)
+        return flat
+
+    def to_dict(self):
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'time': self.time.isoformat(),
+            'close': self.close,
+            'indicators': self.indicators,
+            'extra': self.extra,
+            'missing': self.missing,
+        }
+
+    def to_record(self):
+        """Плоский рядок таблиці: symbol, timeframe, time, close та колонка на кожен індикатор."""
+        return {'symbol': self.symbol, 'timeframe': self.timeframe, 'time': self.time.isoformat(),
+                'close': self.close, **self.values()}
+
+    def to_frame(self):
+        """DataFrame з одним рядком (to_record)."""
+        import pandas as pd
+        return pd.DataFrame([self.to_record()])
+
+    def to_json(self, file_path=None, compact=False):
+        """
+        Серіалізує результат у JSON; з file_path - атомарно зберігає у файл.
+        :return: Рядок JSON (або True/False - результат збереження, якщо задано file_path).
+        """
+        from balance import data_processing
+        if file_path is None:
+            return data_processing.dumps_json(self.to_dict(), compact=compact)
+        output_dir, file_name = os.path.split(file_path)
+        return data_processing.save_to_json(self.to_dict(), output_dir or '.', file_name, compact=compact)
+
+    def to_parquet(self, file_path):
+        """Зберігає результат як однорядкову таблицю Parquet (потрібен pyarrow)."""
+        self.to_frame().to_parquet(file_path, index=False)
+
+    def format_text(self):
+        """Текстовий звіт у форматі analyze_symbol."""
+        lines = [f"\n--- Розширений Технічний Аналіз для {self.symbol}, таймфрейм {self.timeframe} (останні дані) ---"]
+        date_format = '%Y-%m-%d' if self.timeframe in ('1d', '3d', '1w') else '%Y-%m-%d %H:%M'
+        lines.append(f"Дата: {self.time.strftime(date_format)}")
+        lines.append(f"Ціна закриття: {self.close:.2f}\n")
+        for group, title in INDICATOR_GROUP_TITLES.items():
+            lines.append(f"--- {title} ---")
+            group_values = self.indicators.get(group, {})
+            if group_values:
+                width = max(len(name) for name in group_values)
+                for name, value in group_values.items():
+                    lines.append(f"{name.ljust(width)}  {'NaN' if value is None else f'{value:.6f}'}")
+            else:
+                lines.append("Немає даних для цієї категорії.")
+            lines.append("")
+        lines.append("--- Кінець аналізу ---")
+        return '\n'.join(lines)
+
+def results_frame(results):
+    """DataFrame з результатів кількох символів/таймфреймів (рядок на результат)."""
+    import pandas as pd
+    return pd.DataFrame([result.to_record() for result in results])
+
+def save_results(results, file_path):
+    """
+    Зберігає результати у файл: .parquet - таблиця (рядок на результат), інакше - JSON список to_dict.
+    :return: True у разі успіху.
+    """
+    if file_path.endswith('.parquet'):
+        try:
+            results_frame(results).to_parquet(file_path, index=False)
+        except ImportError as e:
+            logging.error(f"Для збереження у Parquet потрібен pyarrow: {e}")
+            return False
+        except Exception as e:
+            logging.error(f"Помилка при збереженні у файл Parquet ({file_path}): {e}")
+            return False
+        logging.info(f"Результат технічного аналізу збережено: {file_path}")
+        return True
+    from balance import data_processing
+    output_dir, file_name = os.path.split(file_path)
+    return data_processing.save_to_json([result.to_dict() for result in results], output_dir or '.', file_name)
@@ -1,28 +1,40 @@
 import pandas as pd
-import pandas_ta as ta
-from binance.client import Client
 import logging
+from analysis.incremental import IncrementalIndicatorEngine
+from analysis.kline_store import KlineStore, klines_to_array
+from analysis.results import INCREMENTAL_INDICATOR_GROUPS, INDICATOR_GROUPS, TechnicalAnalysisResult
+from analysis.timeframes import DEFAULT_BASE_INTERVAL, DEFAULT_TIMEFRAMES, load_timeframes
 
-def get_historical_data(client, symbol, interval=Client.KLINE_INTERVAL_1DAY, limit=300):
+# Те саме значення, що й binance.client.Client.KLINE_INTERVAL_1DAY (без імпорту клієнта)
+KLINE_INTERVAL_1DAY = '1d'
+
+def klines_frame(records):
+    """
+    DataFrame OHLCV з масиву свічок KLINE_DTYPE (колонки - view полів масиву, без розбору рядків).
+    """
+    df = pd.DataFrame({col: records[col] for col in ['open', 'high', 'low', 'close', 'volume']}, copy=False)
+    df.index = pd.to_datetime(records['open_time'], unit='ms')
+    df.index.name = 'timestamp'
+    return df
+
+def get_historical_data(client, symbol, interval=KLINE_INTERVAL_1DAY, limit=300, kline_store=None, use_store=True):
     """
     Отримує історичні дані OHLCV для вказаного символу.
     Збільшено ліміт до 300, щоб забезпечити достатньо даних для індикаторів.
+    Свічки кешуються в локальному сховищі (analysis/kline_store.py): повторний аналіз символу
+    запитує лише нові свічки.
+    :param kline_store: Сховище свічок (за замовчуванням - config.KLINE_STORE_DIR).
+    :param use_store: False - завантажити всі свічки з біржі без локального сховища.
     """
     try:
-        klines = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume', 
-            'close_time', 'quote_asset_volume', 'number_of_trades', 
-            'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-        ])
-        
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = pd.to_numeric(df[col])
-            
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        
-        return df[['open', 'high', 'low', 'close', 'volume']]
+        if use_store:
+            if kline_store is None:
+                from balance import config
+                kline_store = KlineStore(config.KLINE_STORE_DIR)
+            records = kline_store.update(client, symbol, interval, limit)
+        else:
+            records = klines_to_array(client.get_klines(symbol=symbol, interval=interval, limit=limit))
+        return klines_frame(records)
     except Exception as e:
         logging.error(f"Помилка при отриманні історичних даних для {symbol}: {e}")
         return None
@@ -33,6 +45,9 @@ def add_technical_indicators(df):
     """
     if df is None or df.empty:
         return None
+
+    # pandas_ta реєструє аксесор df.ta під час імпорту і завантажується довго
+    import pandas_ta as ta
         
     # Розширений список індикаторів
     custom_strategy = ta.Strategy(
@@ -88,46 +103,115 @@ def add_technical_indicators(df):
     
     return df
 
-def analyze_symbol(client, symbol):
+def latest_indicators(df, engine=None):
     """
-    Виконує повний аналіз символу та виводить результат у структурованому вигляді.
+    Розраховує останні значення індикаторів інкрементальним рушієм (analysis/incremental.py)
+    одним проходом по свічках, без pandas_ta.
+    :param engine: Рушій з уже накопиченим станом, опційно (до нього додаються лише свічки з df).
+    :return: pd.Series з колонками pandas_ta та ціною закриття; name - час останньої свічки.
     """
-    logging.info(f"Починаю розширений технічний аналіз для символу: {symbol}")
-    
-    df = get_historical_data(client, symbol)
-    if df is None:
-        return
-        
+    if df is None or df.empty:
+        return None
+    engine = engine or IncrementalIndicatorEngine()
+    open_times = df.index.as_unit('ms').asi8
+    columns = [df[col].to_numpy() for col in ['open', 'high', 'low', 'close', 'volume']]
+    latest = engine.update_many(
+        {'open_time': open_time, 'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+        for open_time, open_, high, low, close, volume in zip(open_times, *columns)
+    )
+    return pd.Series({'close': df['close'].iloc[-1], **latest}, name=df.index[-1])
+
+def indicator_frame(df, engine=None):
+    """
+    Повні ряди індикаторів (значення на кожній свічці) інкрементальним рушієм, без pandas_ta.
+    :return: Копія df з доданими колонками індикаторів (назви pandas_ta).
+    """
+    engine = engine or IncrementalIndicatorEngine()
+    open_times = df.index.as_unit('ms').asi8
+    columns = [df[col].to_numpy() for col in ['open', 'high', 'low', 'close', 'volume']]
+    rows = [
+        engine.update({'open_time': open_time, 'open': open_, 'high': high, 'low': low,
+                       'close': close, 'volume': volume})
+        for open_time, open_, high, low, close, volume in zip(open_times, *columns)
+    ]
+    return pd.concat([df, pd.DataFrame(rows, index=df.index)], axis=1)
+
+def _expected_groups(incremental):
+    """Колонки, які має створити обраний спосіб розрахунку індикаторів."""
+    return INCREMENTAL_INDICATOR_GROUPS if incremental else INDICATOR_GROUPS
+
+def _latest_row(df, incremental):
+    """Останній рядок з індикаторами: pandas_ta або інкрементальний рушій."""
+    if incremental:
+        return latest_indicators(df)
     df_with_indicators = add_technical_indicators(df)
     if df_with_indicators is None:
-        logging.error("Не вдалося розрахувати індикатори.")
-        return
-        
-    last_row = df_with_indicators.iloc[-1]
+        return None
+    return df_with_indicators.iloc[-1]
+
+def analyze_symbol(client, symbol, incremental=False, interval=KLINE_INTERVAL_1DAY, print_result=True, kline_store=None,
+                   limit=300):
+    """
+    Виконує повний аналіз символу.
+    :param limit: Кількість свічок для розрахунку індикаторів.
+    :param incremental: Розрахувати індикатори інкрементальним рушієм замість pandas_ta.
+    :param print_result: Вивести результат у структурованому текстовому вигляді.
+    :param kline_store: Сховище свічок (за замовчуванням - config.KLINE_STORE_DIR).
+    :return: TechnicalAnalysisResult або None у разі помилки.
+    """
+    logging.info(f"Починаю розширений технічний аналіз для символу: {symbol}")
     
-    # Групуємо індикатори для кращої читабельності
-    momentum_indicators = ['RSI_14', 'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9', 'STOCHk_14_3_3', 'STOCHd_14_3_3', 'WILLR_14', 'AO', 'CCI_20_0.015', 'ROC_10', 'TRIX_15_9', 'CMO_14', 'KST_10_15_20_30_10_10_10_15', 'KSTs_9', 'COPC_11_14_10', 'TSI_13_25_13', 'UOS_7_14_28', 'DPO_20']
-    trend_indicators = ['EMA_20', 'EMA_50', 'EMA_200', 'SMA_20', 'SMA_50', 'SMA_200', 'ADX_14', 'AROOND_14', 'AROONU_14', 'AROONOSC_14', 'VORTEX_14_plus', 'VORTEX_14_minus', 'PSARl_0.02_0.2', 'PSARs_0.02_0.2', 'ITS_9', 'IKS_26', 'ISA_26', 'ISB_52', 'ICS_26', 'SUPERT_7_3.0', 'SUPERTd_7_3.0', 'SUPERTl_7_3.0', 'SUPERTs_7_3.0']
-    volatility_indicators = ['BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0', 'BBP_20_2.0', 'ATRr_14', 'STDEV_20', 'DCL_20_20', 'DCM_20_20', 'DCU_20_20']
-    volume_indicators = ['OBV', 'CMF_20', 'MFI_14', 'VWAP_D']
+    df = get_historical_data(client, symbol, interval, limit, kline_store=kline_store)
+    if df is None:
+        return None
 
-    print(f"\n--- Розширений Технічний Аналіз для {symbol} (останні дані) ---")
-    print(f"Дата: {last_row.name.strftime('%Y-%m-%d')}")
-    print(f"Ціна закриття: {last_row['close']:.2f}\n")
+    last_row = _latest_row(df, incremental)
+    if last_row is None:
+        logging.error("Не вдалося розрахувати індикатори.")
+        return None
+    result = TechnicalAnalysisResult.from_row(symbol, last_row, interval, _expected_groups(incremental))
+    if print_result:
+        print(result.format_text())
+    return result
 
-    def print_section(title, indicators):
-        print(f"--- {title} ---")
-        # Вибираємо тільки ті індикатори, які є в DataFrame
-        valid_indicators = [ind for ind in indicators if ind in last_row.index]
-        if valid_indicators:
-            print(last_row[valid_indicators].to_string())
-        else:
-            print("Немає даних для цієї категорії.")
-        print("")
+def analyze_timeframes(client, symbol, base_interval=DEFAULT_BASE_INTERVAL, timeframes=DEFAULT_TIMEFRAMES,
+                       limit=300, kline_store=None, incremental=False):
+    """
+    Мультитаймфреймовий аналіз: свічки base_interval завантажуються один раз, старші таймфрейми
+    будуються ресемплінгом (analysis/timeframes.py), індикатори розраховуються для кожного таймфрейму.
+    :return: Словник {таймфрейм: pd.Series останніх значень індикаторів} (None для таймфрейму без даних).
+    """
+    logging.info(f"Мультитаймфреймовий аналіз {symbol}: база {base_interval}, таймфрейми {', '.join(timeframes)}")
+    try:
+        candles = load_timeframes(client, symbol, base_interval, timeframes, limit, kline_store)
+    except Exception as e:
+        logging.error(f"Помилка при отриманні історичних даних для {symbol}: {e}")
+        return None
+    results = {}
+    for timeframe, records in candles.items():
+        if len(records) == 0:
+            logging.warning(f"Немає свічок {symbol} для таймфрейму {timeframe}")
+            results[timeframe] = None
+            continue
+        results[timeframe] = _latest_row(klines_frame(records), incremental)
+    return results
 
-    print_section("Індикатори Моментуму", momentum_indicators)
-    print_section("Трендові Індикатори", trend_indicators)
-    print_section("Індикатори Волатильності", volatility_indicators)
-    print_section("Індикатори Об'єму", volume_indicators)
-    
-    print("--- Кінець аналізу ---")
+def analyze_symbol_timeframes(client, symbol, base_interval=DEFAULT_BASE_INTERVAL, timeframes=DEFAULT_TIMEFRAMES,
+                              incremental=False, print_result=True, limit=300):
+    """
+    Виконує мультитаймфреймовий аналіз.
+    :return: Словник {таймфрейм: TechnicalAnalysisResult} (без таймфреймів, для яких аналіз не вдався).
+    """
+    rows = analyze_timeframes(client, symbol, base_interval, timeframes, limit, incremental=incremental)
+    if rows is None:
+        return {}
+    results = {}
+    for timeframe, last_row in rows.items():
+        if last_row is None:
+            logging.error(f"Не вдалося розрахувати індикатори для таймфрейму {timeframe}.")
+            continue
+        results[timeframe] = TechnicalAnalysisResult.from_row(symbol, last_row, timeframe,
+                                                              _expected_groups(incremental))
+        if print_result:
+            print(results[timeframe].format_text())
+    return results
@@ -0,0 +1,95 @@
+# analysis/timeframes.py
+"""
+Мультитаймфреймовий аналіз з одного базового інтервалу: свічки найменшого інтервалу
+завантажуються один раз (через локальне сховище свічок), а старші таймфрейми будуються
+локально векторизованим ресемплінгом OHLCV. Усі таймфрейми узгоджені між собою,
+бо походять з тих самих базових свічок.
+"""
+import numpy as np
+from analysis.kline_store import KLINE_DTYPE
+
+MINUTE_MS = 60_000
+HOUR_MS = 60 * MINUTE_MS
+DAY_MS = 24 * HOUR_MS
+# Тривалість інтервалів Binance у мс (місячний інтервал має змінну довжину і не підтримується)
+INTERVAL_MS = {
+    '1m': MINUTE_MS, '3m': 3 * MINUTE_MS, '5m': 5 * MINUTE_MS, '15m': 15 * MINUTE_MS, '30m': 30 * MINUTE_MS,
+    '1h': HOUR_MS, '2h': 2 * HOUR_MS, '4h': 4 * HOUR_MS, '6h': 6 * HOUR_MS, '8h': 8 * HOUR_MS, '12h': 12 * HOUR_MS,
+    '1d': DAY_MS, '3d': 3 * DAY_MS, '1w': 7 * DAY_MS,
+}
+# Тижневі свічки Binance починаються в понеділок 00:00 UTC (1970-01-01 - четвер, понеділок - 1970-01-05)
+WEEK_ORIGIN_MS = 4 * DAY_MS
+
+DEFAULT_BASE_INTERVAL = '1h'
+DEFAULT_TIMEFRAMES = ('4h', '1d', '1w')
+# Максимальна кількість базових свічок, що завантажується для мультитаймфреймового аналізу
+MAX_BASE_CANDLES = 20_000
+
+def interval_ms(interval):
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Непідтримуваний інтервал: {interval}") from None
+
+def resample_klines(records, target_interval, base_interval=None):
+    """
+    Ресемплінг свічок KLINE_DTYPE у старший інтервал одним проходом по масивах numpy:
+    open - перша свічка кошика, close - остання, high/low - екстремуми, обсяги та кількість угод - суми.
+    Остання (ще не завершена) свічка старшого інтервалу включається, як і у відповіді Binance,
+    а перша відкидається, якщо базові свічки починаються не з її початку (неповна історія).
+    :param base_interval: Базовий інтервал (для перевірки кратності), опційно.
+    :return: Масив KLINE_DTYPE старшого інтервалу.
+    """
+    target_ms = interval_ms(target_interval)
+    if base_interval is not None and target_ms % interval_ms(base_interval):
+        raise ValueError(f"Інтервал {target_interval} не кратний базовому {base_interval}")
+    if len(records) == 0:
+        return np.empty(0, dtype=KLINE_DTYPE)
+
+    origin = WEEK_ORIGIN_MS if target_interval == '1w' else 0
+    open_times = records['open_time']
+    buckets = (open_times - origin) // target_ms
+    # Записи відсортовані за часом, тож початок кожного кошика - перша зміна номера кошика
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(records)] - 1
+    if open_times[0] != buckets[0] * target_ms + origin:
+        starts, ends = starts[1:], ends[1:]
+        if len(starts) == 0:
+            return np.empty(0, dtype=KLINE_DTYPE)
+
+    result = np.empty(len(starts), dtype=KLINE_DTYPE)
+    result['open_time'] = buckets[starts] * target_ms + origin
+    result['close_time'] = result['open_time'] + target_ms - 1
+    result['open'] = records['open'][starts]
+    result['close'] = records['close'][ends]
+    result['high'] = np.maximum.reduceat(records['high'], starts)
+    result['low'] = np.minimum.reduceat(records['low'], starts)
+    for field in ('volume', 'quote_asset_volume', 'number_of_trades',
+                  'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume'):
+        result[field] = np.add.reduceat(records[field], starts)
+    return result
+
+def base_candles_needed(base_interval, timeframes, limit):
+    """Кількість базових свічок, щоб кожен таймфрейм мав `limit` свічок (не більше MAX_BASE_CANDLES)."""
+    base_ms = interval_ms(base_interval)
+    ratio = max(interval_ms(timeframe) // base_ms for timeframe in timeframes)
+    return min(limit * ratio, MAX_BASE_CANDLES)
+
+def load_timeframes(client, symbol, base_interval=DEFAULT_BASE_INTERVAL, timeframes=DEFAULT_TIMEFRAMES,
+                    limit=300, kline_store=None):
+    """
+    Завантажує базові свічки один раз і будує з них усі таймфрейми.
+    :return: Словник {таймфрейм: масив KLINE_DTYPE} (не більше `limit` останніх свічок кожного).
+    """
+    if kline_store is None:
+        from analysis.kline_store import KlineStore
+        from balance import config
+        kline_store = KlineStore(config.KLINE_STORE_DIR)
+    for timeframe in timeframes:
+        if interval_ms(timeframe) % interval_ms(base_interval):
+            raise ValueError(f"Інтервал {timeframe} не кратний базовому {base_interval}")
+    base = kline_store.update(client, symbol, base_interval, base_candles_needed(base_interval, timeframes, limit))
+    return {
+        timeframe: base[-limit:] if timeframe == base_interval else resample_klines(base, timeframe)[-limit:]
+        for timeframe in timeframes
+    }
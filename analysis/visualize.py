@@ -1,37 +1,55 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 import os
 import logging
+from balance.history_store import BalanceHistoryStore
 
-def plot_balance_history(history_file_path, output_image_path):
+def _load_history(history_path, start=None, end=None):
     """
-    Читає історію балансу з CSV файлу та генерує графік.
+    Повертає (дати, загальний баланс у USD) зі сховища історії (папка)
+    або з CSV файлу старого формату.
+    """
+    if os.path.isdir(history_path):
+        return BalanceHistoryStore(history_path).total_series(start, end)
+
+    import pandas as pd
+    df = pd.read_csv(history_path)
+    # Перетворюємо колонку 'timestamp' у формат дати
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    if start is not None:
+        df = df[df['timestamp'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['timestamp'] < pd.Timestamp(end)]
+    return df['timestamp'], df['total_balance_usd']
+
+def plot_balance_history(history_path, output_image_path, start=None, end=None):
+    """
+    Читає історію балансу (папка сховища історії або CSV файл) та генерує графік.
+    :param start: Початок періоду (datetime), опційно.
+    :param end: Кінець періоду (datetime), опційно.
     """
     try:
-        if not os.path.exists(history_file_path):
-            logging.warning(f"Файл історії '{history_file_path}' не знайдено. Графік не буде створено.")
+        if not os.path.exists(history_path):
+            logging.warning(f"Історію '{history_path}' не знайдено. Графік не буде створено.")
             return
 
-        df = pd.read_csv(history_file_path)
+        timestamps, totals = _load_history(history_path, start, end)
 
-        if df.empty:
-            logging.warning(f"Файл історії '{history_file_path}' порожній. Графік не буде створено.")
+        if len(timestamps) == 0:
+            logging.warning(f"Історія '{history_path}' порожня. Графік не буде створено.")
             return
 
-        # Перетворюємо колонку 'timestamp' у формат дати
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(12, 6))
-        plt.plot(df['timestamp'], df['total_balance_usd'], marker='o', linestyle='-')
-        
+        plt.plot(timestamps, totals, marker='o', linestyle='-')
+
         plt.title('Історія Загального Балансу (USD)')
         plt.xlabel('Дата')
         plt.ylabel('Загальний Баланс (USD)')
         plt.grid(True)
         plt.xticks(rotation=45)
         plt.tight_layout()
-        
+
         plt.savefig(output_image_path)
+        plt.close()
         logging.info(f"Графік історії балансу збережено: {output_image_path}")
 
     except Exception as e:
@@ -41,7 +59,6 @@ if __name__ == '__main__':
     # Для самостійного тестування
     # Переконуємось, що ми працюємо з кореневої папки проекту
     # Це для прикладу, основний виклик буде з main.py
-    from balance.config import OUTPUT_DIR
-    history_file = os.path.join(OUTPUT_DIR, 'balance_history.csv')
+    from balance.config import OUTPUT_DIR, HISTORY_DIR
     output_image = os.path.join(OUTPUT_DIR, 'history_chart.png')
-    plot_balance_history(history_file, output_image)
+    plot_balance_history(HISTORY_DIR, output_image)
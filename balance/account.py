@@ -1,13 +1,46 @@
 # balance/account.py
+import asyncio
+import functools
+import inspect
 import logging
+import threading
 import time
+import numpy as np
 from binance.client import Client
 from binance.exceptions import BinanceAPIException, BinanceRequestException
 from requests.exceptions import ConnectionError, Timeout, TooManyRedirects
+from .metrics import METRICS
+from .price_cache import CachedPriceLookupMixin
+from .prices import PriceSnapshot, USD_STABLECOINS, STABLECOIN_QUOTES, CONVERSION_ASSETS
+from .settings import get_settings, resolve_dust_threshold
+from .valuation import parse_column, value_positions
+from .rate_limit import (
+    DEFAULT_RATE_LIMITER,
+    DEFAULT_RATE_LIMIT_BACKOFF,
+    CircuitBreaker,
+    api_family,
+    capture_response_headers,
+    compute_backoff_delay,
+    get_retry_after,
+    is_rate_limit_error,
+    record_response_headers,
+)
 
-def retry_on_exception(retries=3, delay=5, allowed_exceptions_tuple=None):
+# Мережеві помилки синхронного клієнта, що вважаються збоями сервісу для запобіжника
+NETWORK_EXCEPTIONS = (BinanceRequestException, ConnectionError, Timeout, TooManyRedirects)
+
+def default_circuit_breaker():
+    """Запобіжник акаунту з порогом помилок та часом відновлення з налаштувань (розділ rate_limit)."""
+    rate_settings = get_settings().rate_limit
+    return CircuitBreaker(rate_settings.circuit_failure_threshold, rate_settings.circuit_reset_timeout)
+
+def retry_on_exception(retries=None, delay=None, allowed_exceptions_tuple=None, max_delay=None):
     """
     Декоратор для повторного виконання функції у разі виникнення певних винятків.
+    Затримка між спробами зростає експоненційно від `delay` (з випадковим відхиленням, не більше `max_delay`).
+    Не вказані retries, delay та max_delay беруться з налаштувань (розділ retry) під час виклику.
+    Для відповідей 429/418 (перевищення ліміту) використовується час із заголовка Retry-After.
+    Підтримує як звичайні функції, так і корутини (для асинхронного клієнта).
     """
     if allowed_exceptions_tuple is None:
         effective_allowed_exceptions = (
@@ -19,58 +52,278 @@ def retry_on_exception(retries=3, delay=5, allowed_exceptions_tuple=None):
     else:
         effective_allowed_exceptions = allowed_exceptions_tuple
 
+    def get_retry_delay(func, error, attempt):
+        """
+        Логує невдалу спробу та повертає затримку перед повтором у секундах
+        або None, якщо виклик повторювати не варто.
+        """
+        if isinstance(error, BinanceAPIException):
+            if error.code == -1121 and "Invalid symbol" in str(error):
+                return None
+            error_description = f"помилку Binance API: {error}"
+            final_description = f"Binance API Error: {error}"
+        else:
+            error_description = f"мережеву помилку: {error}"
+            final_description = f"Мережева помилка: {error}"
+
+        retry_settings = get_settings().retry
+        max_retries = retries if retries is not None else retry_settings.retries
+        remaining_retries = max_retries - attempt
+        if remaining_retries <= 0:
+            logging.error(
+                f"Функція {func.__name__} не виконалася успішно ({final_description}) після {max_retries} спроб."
+            )
+            return None
+
+        if is_rate_limit_error(error):
+            retry_delay = get_retry_after(error)
+            if retry_delay is None:
+                retry_delay = DEFAULT_RATE_LIMIT_BACKOFF
+        else:
+            retry_delay = compute_backoff_delay(
+                attempt,
+                delay if delay is not None else retry_settings.delay,
+                max_delay if max_delay is not None else retry_settings.max_delay,
+            )
+        METRICS.increment('api_retries_total', function=func.__name__)
+        logging.warning(
+            f"Функція {func.__name__} викликала {error_description}. "
+            f"Залишилося спроб: {remaining_retries}. Повторна спроба через {retry_delay:.2f} сек."
+        )
+        return retry_delay
+
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                attempt = 0
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+                    except (BinanceAPIException, *effective_allowed_exceptions) as e:
+                        attempt += 1
+                        retry_delay = get_retry_delay(func, e, attempt)
+                        if retry_delay is None:
+                            raise
+                        await asyncio.sleep(retry_delay)
+            return async_wrapper
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            current_retries = retries
-            while current_retries > 0:
+            attempt = 0
+            while True:
                 try:
                     return func(*args, **kwargs)
-                except BinanceAPIException as e_api:
-                    if e_api.code == -1121 and "Invalid symbol" in str(e_api):
-                        raise
-                    current_retries -= 1
-                    logging.warning(
-                        f"Функція {func.__name__} викликала помилку Binance API: {e_api}. "
-                        f"Залишилося спроб: {current_retries}. Повторна спроба через {delay} сек."
-                    )
-                    if current_retries == 0:
-                        logging.error(
-                            f"Функція {func.__name__} не виконалася успішно (Binance API Error: {e_api}) після {retries} спроб."
-                        )
-                        raise
-                    time.sleep(delay)
-                except effective_allowed_exceptions as e_net:
-                    current_retries -= 1
-                    logging.warning(
-                        f"Функція {func.__name__} викликала мережеву помилку: {e_net}. "
-                        f"Залишилося спроб: {current_retries}. Повторна спроба через {delay} сек."
-                    )
-                    if current_retries == 0:
-                        logging.error(
-                            f"Функція {func.__name__} не виконалася успішно (Мережева помилка: {e_net}) після {retries} спроб."
-                        )
+                except (BinanceAPIException, *effective_allowed_exceptions) as e:
+                    attempt += 1
+                    retry_delay = get_retry_delay(func, e, attempt)
+                    if retry_delay is None:
                         raise
-                    time.sleep(delay)
-            return None
+                    time.sleep(retry_delay)
         return wrapper
     return decorator
 
-class BinanceAccount:
+def build_spot_balance(account_info, get_price, dust_threshold=None):
+    """
+    Розраховує спотовий баланс із відповіді get_account.
+    :param get_price: Функція, що повертає ціну активу в USD (0.0, якщо ціна невідома).
+    :return: (список активів, загальна вартість у USD, вартість 'пилу' в USD).
+    """
+    rows = (account_info or {}).get('balances') or []
+    if not rows:
+        return [], 0.0, 0.0
+    assets = [row['asset'] for row in rows]
+    free = parse_column(rows, 'free')
+    locked = parse_column(rows, 'locked')
+    indices, prices, values, total_spot_value_usd, total_dust_value_usd = value_positions(
+        assets, free + locked, get_price, resolve_dust_threshold(dust_threshold)
+    )
+    spot_balances_list = [
+        {
+            'Актив': assets[index],
+            'Вільний': free_balance,
+            'Заблокований': locked_balance,
+            'Всього': free_balance + locked_balance,
+            'Вартість (USD)': value if price > 0 else "N/A"
+        }
+        for index, free_balance, locked_balance, price, value in zip(
+            indices, free[indices].tolist(), locked[indices].tolist(), prices.tolist(), values.tolist()
+        )
+    ]
+    return spot_balances_list, total_spot_value_usd, total_dust_value_usd
+
+def build_earn_balance(flexible_response, locked_response, get_price, dust_threshold=None):
+    """
+    Розраховує Earn баланс із відповідей по Flexible та Locked продуктах Simple Earn.
+    :return: (список активів, загальна вартість у USD, вартість 'пилу' в USD).
+    """
+    rows = []
+    products = []
+    for response, product in ((flexible_response, 'Flexible Simple Earn'), (locked_response, 'Locked Simple Earn')):
+        if response and 'rows' in response:
+            for position in response.get('rows', []):
+                if position.get('asset'):
+                    rows.append(position)
+                    products.append(product)
+    if not rows:
+        return [], 0.0, 0.0
+
+    assets = [row['asset'] for row in rows]
+    amounts = parse_column(rows, 'totalAmount')
+    indices, prices, values, total_earn_value_usd, total_dust_value_usd = value_positions(
+        assets, amounts, get_price, resolve_dust_threshold(dust_threshold)
+    )
+    earn_balances_list = []
+    for index, total_amount, price, value in zip(indices, amounts[indices].tolist(), prices.tolist(), values.tolist()):
+        earn_item = {
+            'Актив': assets[index],
+            'Продукт': products[index],
+            'Всього': total_amount,
+            'Вартість (USD)': value if price > 0 else "N/A"
+        }
+        end_date = rows[index].get('endDate') if products[index] == 'Locked Simple Earn' else None
+        if end_date:
+            earn_item['Дата закінчення'] = end_date
+        earn_balances_list.append(earn_item)
+    return earn_balances_list, total_earn_value_usd, total_dust_value_usd
+
+def build_futures_balance(futures_account_info, get_price):
+    """
+    Розраховує USDT-M ф'ючерсний баланс із відповіді futures_account.
+    Оцінюються всі маржинальні активи (USDT, USDC, BNB, FDUSD тощо; режим мультиактивної маржі),
+    а відкриті позиції беруться з тієї самої відповіді - без окремих запитів по символах.
+    :param get_price: Функція, що повертає ціну активу в USD (0.0, якщо ціна невідома).
+    :return: (загальна вартість у USD, словник з підсумком, активами та позиціями або None).
+    """
+    rows = (futures_account_info or {}).get('assets') or []
+    assets = [row.get('asset') for row in rows]
+    wallet_balances = parse_column(rows, 'walletBalance')
+    unrealized_pnls = parse_column(rows, 'unrealizedProfit')
+    indices, prices, values, total_futures_usd, _ = value_positions(
+        assets, wallet_balances + unrealized_pnls, get_price, min_abs_amount=1e-9
+    )
+    futures_assets_list = [
+        {
+            'Актив': assets[index],
+            'Баланс гаманця': wallet_balance,
+            'Нереалізований PNL': unrealized_pnl,
+            'Загалом в монеті': wallet_balance + unrealized_pnl,
+            'Ціна (USD)': price if price > 0 else "N/A",
+            'Вартість (USD)': value if price > 0 else "N/A"
+        }
+        for index, wallet_balance, unrealized_pnl, price, value in zip(
+            indices, wallet_balances[indices].tolist(), unrealized_pnls[indices].tolist(),
+            prices.tolist(), values.tolist()
+        )
+    ]
+    positions_list = build_futures_positions(futures_account_info)
+    if not futures_assets_list and not positions_list:
+        return 0.0, None
+    # Підсумок по всіх маржинальних активах, оцінених у USD (не лише USDT)
+    futures_info = {
+        'Актив': 'USD',
+        'Баланс гаманця': float((wallet_balances[indices] * prices).sum()),
+        'Нереалізований PNL': float((unrealized_pnls[indices] * prices).sum()),
+        'Загалом (USD)': total_futures_usd,
+        'Активи': futures_assets_list,
+        'Позиції': positions_list,
+    }
+    return total_futures_usd, futures_info
+
+def build_futures_positions(futures_account_info):
+    """
+    Відкриті USDT-M позиції з поля 'positions' відповіді futures_account.
+    Маркувальна ціна виводиться з номіналу (notional = кількість * маркувальна ціна).
+    :return: Список позицій, відсортований за абсолютним номіналом (спадання).
+    """
+    rows = (futures_account_info or {}).get('positions') or []
+    amounts = parse_column(rows, 'positionAmt')
+    open_indices = np.flatnonzero(amounts != 0)
+    if len(open_indices) == 0:
+        return []
+    open_rows = [rows[index] for index in open_indices]
+    amounts = amounts[open_indices]
+    notionals = parse_column(open_rows, 'notional')
+    mark_prices = np.abs(notionals / amounts)
+    entry_prices = parse_column(open_rows, 'entryPrice', np.nan)
+    unrealized_pnls = parse_column(open_rows, 'unrealizedProfit')
+    order = np.argsort(-np.abs(notionals), kind='stable')
+    positions_list = []
+    for index in order.tolist():
+        row = open_rows[index]
+        amount = float(amounts[index])
+        side = row.get('positionSide') or 'BOTH'
+        entry_price = float(entry_prices[index])
+        positions_list.append({
+            'Символ': row.get('symbol'),
+            'Сторона': side if side != 'BOTH' else ('LONG' if amount > 0 else 'SHORT'),
+            'Кількість': amount,
+            'Ціна входу': entry_price if entry_price == entry_price else "N/A",
+            'Маркувальна ціна': float(mark_prices[index]),
+            'Номінал': float(notionals[index]),
+            'Нереалізований PNL': float(unrealized_pnls[index]),
+            'Плече': row.get('leverage'),
+        })
+    return positions_list
+
+def build_coin_m_futures_balance(account_info, get_price):
+    """
+    Розраховує COIN-M ф'ючерсний баланс із відповіді futures_coin_account.
+    :return: (список активів, загальна вартість у USD).
+    """
+    rows = (account_info or {}).get('assets') or []
+    if not rows:
+        return [], 0.0
+    assets = [row.get('asset') for row in rows]
+    wallet_balances = parse_column(rows, 'walletBalance')
+    unrealized_pnls = parse_column(rows, 'unrealizedProfit')
+    indices, prices, values, total_coin_m_value_usd, _ = value_positions(
+        assets, wallet_balances + unrealized_pnls, get_price, min_abs_amount=1e-9
+    )
+    coin_m_balances_list = [
+        {
+            'Актив': assets[index],
+            'Баланс гаманця': wallet_balance,
+            'Нереалізований PNL': unrealized_pnl,
+            'Загалом в монеті': wallet_balance + unrealized_pnl,
+            'Ціна (USD)': price if price > 0 else "N/A",
+            'Вартість (USD)': value if price > 0 else "N/A"
+        }
+        for index, wallet_balance, unrealized_pnl, price, value in zip(
+            indices, wallet_balances[indices].tolist(), unrealized_pnls[indices].tolist(),
+            prices.tolist(), values.tolist()
+        )
+    ]
+    return coin_m_balances_list, total_coin_m_value_usd
+
+class BinanceAccount(CachedPriceLookupMixin):
     """
     Клас для представлення акаунту Binance та взаємодії з ним.
     Інкапсулює клієнт API та логіку роботи з ним.
     """
-    def __init__(self, api_key: str, secret_key: str):
+    def __init__(self, api_key: str, secret_key: str, request_budget=None, rate_limiter=None, circuit_breaker=None,
+                 persistent_price_cache=None):
         """
         Ініціалізує акаунт з API ключами та створює клієнт.
+        :param request_budget: Спільний бюджет запитів (RequestBudget) для кількох акаунтів, опційно.
+        :param rate_limiter: Обмежувач за вагою запитів (за замовчуванням спільний для процесу).
+        :param circuit_breaker: Запобіжник для серії помилок API (за замовчуванням окремий для акаунту).
+        :param persistent_price_cache: Постійний кеш цін між запусками (PersistentPriceCache), опційно.
         """
         if not api_key or not secret_key:
             raise ValueError("API ключ та секретний ключ не можуть бути порожніми.")
             
         self.api_key = api_key
         self.secret_key = secret_key
+        self.request_budget = request_budget
+        self.rate_limiter = rate_limiter or DEFAULT_RATE_LIMITER
+        self.circuit_breaker = circuit_breaker or default_circuit_breaker()
         self.client = self._initialize_client()
-        self.price_cache = {}
+        # Кеш цін може використовуватися з кількох потоків (паралельне отримання гаманців)
+        self._init_price_cache(persistent_price_cache)
+        self.price_snapshot = None
+        self._price_snapshot_attempted = False
+        self._snapshot_lock = threading.Lock()
 
     def _initialize_client(self) -> Client | None:
         """
@@ -78,6 +331,10 @@ class BinanceAccount:
         """
         try:
             client = Client(self.api_key, self.secret_key)
+            # Заголовки ваги читаються з відповіді кожного запиту, а не зі спільного client.response
+            client.session.hooks['response'].append(
+                lambda response, *args, **kwargs: record_response_headers(response.headers)
+            )
             client.ping()
             logging.info("Успішно підключено до Binance API.")
             return client
@@ -88,14 +345,99 @@ class BinanceAccount:
             logging.error(f"Загальна помилка під час ініціалізації клієнта: {e}")
             return None
 
-    @retry_on_exception(retries=3, delay=2, allowed_exceptions_tuple=(BinanceAPIException, BinanceRequestException, ConnectionError, Timeout, TooManyRedirects))
+    def _call_api(self, method_name, **params):
+        """
+        Виконує метод клієнта Binance API через спільний шар обмеження запитів:
+        бюджет запитів, обмежувач за вагою (X-MBX-USED-WEIGHT-1M) та запобіжник.
+        """
+        method = getattr(self.client, method_name)
+        family = api_family(method_name)
+        self.circuit_breaker.before_call()
+        self.rate_limiter.throttle(family)
+        try:
+            with METRICS.timer('api_call_seconds', method=method_name), capture_response_headers() as response:
+                if self.request_budget is None:
+                    result = method(**params)
+                else:
+                    with self.request_budget:
+                        result = method(**params)
+        except BinanceAPIException as e:
+            METRICS.increment('api_errors_total', method=method_name)
+            if is_rate_limit_error(e):
+                retry_after = get_retry_after(e)
+                self.rate_limiter.block_for(retry_after if retry_after is not None else DEFAULT_RATE_LIMIT_BACKOFF)
+            if is_rate_limit_error(e) or (e.status_code or 0) >= 500:
+                self.circuit_breaker.record_failure()
+            raise
+        except NETWORK_EXCEPTIONS:
+            METRICS.increment('api_errors_total', method=method_name)
+            self.circuit_breaker.record_failure()
+            raise
+        finally:
+            self.rate_limiter.update_from_headers(response.get('headers'), family)
+        self.circuit_breaker.record_success()
+        return result
+
+    @retry_on_exception(allowed_exceptions_tuple=(BinanceAPIException, BinanceRequestException, ConnectionError, Timeout, TooManyRedirects))
     def _get_ticker_price_raw(self, symbol_pair):
         """
         Базова функція для отримання ціни, до якої застосовується retry.
         """
-        ticker = self.client.get_symbol_ticker(symbol=symbol_pair)
+        ticker = self._call_api('get_symbol_ticker', symbol=symbol_pair)
         return float(ticker['price'])
 
+    @retry_on_exception()
+    def _load_price_snapshot_raw(self):
+        """
+        Базова функція для завантаження знімка цін, до якої застосовується retry.
+        """
+        tickers = self._call_api('get_all_tickers')
+        exchange_info = self._call_api('get_exchange_info')
+        return PriceSnapshot.from_responses(tickers, exchange_info)
+
+    def refresh_price_snapshot(self):
+        """
+        Завантажує знімок цін усіх пар одним пакетним запитом.
+        Якщо знімок отримати не вдалося, ціни шукаються окремими запитами по кожній парі.
+        """
+        try:
+            snapshot = self._load_price_snapshot_raw()
+        except Exception as e:
+            logging.warning(f"Не вдалося завантажити знімок цін, буде використано запити по окремих парах: {e}")
+            snapshot = None
+
+        if snapshot is not None and snapshot.is_empty():
+            logging.warning("Знімок цін порожній, буде використано запити по окремих парах.")
+            snapshot = None
+
+        self.price_snapshot = snapshot
+        self._price_snapshot_attempted = True
+        # Ціни, знайдені до оновлення знімка, могли застаріти
+        self.clear_price_cache()
+        if snapshot is not None:
+            logging.info(f"Завантажено знімок цін: {len(snapshot.prices)} пар.")
+        return snapshot
+
+    def set_price_snapshot(self, snapshot):
+        """
+        Встановлює готовий знімок цін (наприклад, спільний для кількох акаунтів),
+        щоб акаунт не завантажував власний.
+        """
+        with self._snapshot_lock:
+            self.price_snapshot = snapshot
+            self._price_snapshot_attempted = True
+
+    def ensure_price_snapshot(self):
+        """
+        Повертає знімок цін, завантажуючи його лише один раз.
+        Безпечно для виклику з кількох потоків: інші потоки чекають на завершення завантаження.
+        """
+        if not self._price_snapshot_attempted:
+            with self._snapshot_lock:
+                if not self._price_snapshot_attempted:
+                    self.refresh_price_snapshot()
+        return self.price_snapshot
+
     def _try_get_price_via_stablecoin(self, symbol, stablecoin):
         stablecoin_symbol = f"{symbol}{stablecoin}"
         try:
@@ -140,165 +482,71 @@ class BinanceAccount:
         """
         Отримує поточну оціночну ціну символу в USD.
         """
-        if symbol in self.price_cache:
-            return self.price_cache[symbol]
+        cached_price = self._lookup_cached_price(symbol)
+        if cached_price is not None:
+            return cached_price
+        with METRICS.timer('price_resolution_seconds'):
+            return self._resolve_price_in_usd(symbol)
+
+    def _resolve_price_in_usd(self, symbol):
+        """Пошук ціни символу, якої немає в кеші (знімок цін або запити пар)."""
+        if symbol in USD_STABLECOINS:
+            return self._store_price(symbol, 1.0, persist=False)
 
-        if symbol in ['USDT', 'BUSD', 'USDC', 'TUSD', 'DAI', 'USD']:
-            self.price_cache[symbol] = 1.0
-            return 1.0
+        snapshot = self.ensure_price_snapshot()
+        if snapshot is not None:
+            price = snapshot.resolve_usd(symbol)
+            if price is not None:
+                return self._store_price(symbol, price)
+            logging.error(f"ПОВНА ПОМИЛКА: Не вдалося отримати ціну для '{symbol}' зі знімка цін.")
+            return self._store_price(symbol, 0.0)
 
         logging.debug(f"Пошук ціни для {symbol}...")
 
-        stablecoins_to_try = ['USDT', 'BUSD', 'USDC', 'TUSD']
-        for stablecoin in stablecoins_to_try:
+        for stablecoin in STABLECOIN_QUOTES:
             price = self._try_get_price_via_stablecoin(symbol, stablecoin)
             if price is not None:
-                self.price_cache[symbol] = price
-                return price
+                return self._store_price(symbol, price)
 
-        price = self._try_get_price_via_conversion(symbol, 'BTC')
-        if price is not None:
-            self.price_cache[symbol] = price
-            return price
+        for conversion_asset in CONVERSION_ASSETS:
+            price = self._try_get_price_via_conversion(symbol, conversion_asset)
+            if price is not None:
+                return self._store_price(symbol, price)
 
-        price = self._try_get_price_via_conversion(symbol, 'BNB')
-        if price is not None:
-            self.price_cache[symbol] = price
-            return price
-        
         logging.error(f"ПОВНА ПОМИЛКА: Не вдалося отримати ціну для '{symbol}' жодним зі способів.")
-        self.price_cache[symbol] = 0.0
-        return 0.0
+        return self._store_price(symbol, 0.0)
 
     @retry_on_exception()
-    def get_spot_balance(self, dust_threshold=0.01):
-        spot_balances_list = []
-        total_spot_value_usd = 0.0
-        total_dust_value_usd = 0.0
-        account_info = self.client.get_account()
-        if account_info and 'balances' in account_info:
-            for balance in account_info['balances']:
-                asset = balance['asset']
-                free_balance = float(balance['free'])
-                locked_balance = float(balance['locked'])
-                total_asset_balance = free_balance + locked_balance
-                if total_asset_balance > 0:
-                    price_in_usd = self.get_price_in_usd(asset)
-                    asset_value_in_usd = 0.0
-                    if price_in_usd > 0:
-                        asset_value_in_usd = total_asset_balance * price_in_usd
-                    if price_in_usd > 0 and asset_value_in_usd < dust_threshold:
-                        total_dust_value_usd += asset_value_in_usd
-                        continue
-                    if price_in_usd > 0:
-                        total_spot_value_usd += asset_value_in_usd
-                    spot_balances_list.append({
-                        'Актив': asset,
-                        'Вільний': free_balance,
-                        'Заблокований': locked_balance,
-                        'Всього': total_asset_balance,
-                        'Вартість (USD)': asset_value_in_usd if price_in_usd > 0 else "N/A"
-                    })
-        return spot_balances_list, total_spot_value_usd, total_dust_value_usd
+    def get_account_info(self):
+        """Сира відповідь get_account (спотові залишки)."""
+        return self._call_api('get_account')
 
     @retry_on_exception()
-    def get_earn_balance(self, dust_threshold=0.01):
-        earn_balances_list = []
-        total_earn_value_usd = 0.0
-        total_dust_value_usd = 0.0
-        # Flexible
-        flexible_response = self.client.get_simple_earn_flexible_product_position()
-        if flexible_response and 'rows' in flexible_response:
-            for position in flexible_response.get('rows', []):
-                asset = position.get('asset')
-                total_amount = float(position.get('totalAmount', 0))
-                if total_amount > 0 and asset:
-                    price_in_usd = self.get_price_in_usd(asset)
-                    asset_value_in_usd = 0.0
-                    if price_in_usd > 0:
-                        asset_value_in_usd = total_amount * price_in_usd
-                    if price_in_usd > 0 and asset_value_in_usd < dust_threshold:
-                        total_dust_value_usd += asset_value_in_usd
-                        continue
-                    if price_in_usd > 0:
-                        total_earn_value_usd += asset_value_in_usd
-                    earn_balances_list.append({
-                        'Актив': asset,
-                        'Продукт': 'Flexible Simple Earn',
-                        'Всього': total_amount,
-                        'Вартість (USD)': asset_value_in_usd if price_in_usd > 0 else "N/A"
-                    })
-        # Locked
-        locked_response = self.client.get_simple_earn_locked_product_position()
-        if locked_response and 'rows' in locked_response:
-            for position in locked_response.get('rows', []):
-                asset = position.get('asset')
-                total_amount = float(position.get('totalAmount', 0))
-                end_date = position.get('endDate')
-                if total_amount > 0 and asset:
-                    price_in_usd = self.get_price_in_usd(asset)
-                    asset_value_in_usd = 0.0
-                    if price_in_usd > 0:
-                        asset_value_in_usd = total_amount * price_in_usd
-                    if price_in_usd > 0 and asset_value_in_usd < dust_threshold:
-                        total_dust_value_usd += asset_value_in_usd
-                        continue
-                    if price_in_usd > 0:
-                        total_earn_value_usd += asset_value_in_usd
-                    earn_item = {
-                        'Актив': asset,
-                        'Продукт': 'Locked Simple Earn',
-                        'Всього': total_amount,
-                        'Вартість (USD)': asset_value_in_usd if price_in_usd > 0 else "N/A"
-                    }
-                    if end_date:
-                        earn_item['Дата закінчення'] = end_date
-                    earn_balances_list.append(earn_item)
-        return earn_balances_list, total_earn_value_usd, total_dust_value_usd
+    def get_earn_positions(self):
+        """Сирі відповіді Simple Earn: (Flexible позиції, Locked позиції)."""
+        flexible_response = self._call_api('get_simple_earn_flexible_product_position')
+        locked_response = self._call_api('get_simple_earn_locked_product_position')
+        return flexible_response, locked_response
 
     @retry_on_exception()
-    def get_futures_balance(self):
-        futures_total_usdt = 0.0
-        futures_usdt_info = None
-        futures_account_info = self.client.futures_account()
-        if futures_account_info and 'assets' in futures_account_info:
-            for asset_info in futures_account_info['assets']:
-                if asset_info['asset'] == 'USDT':
-                    wallet_balance = float(asset_info['walletBalance'])
-                    unrealized_pnl = float(asset_info['unrealizedProfit'])
-                    futures_total_usdt = wallet_balance + unrealized_pnl
-                    futures_usdt_info = {
-                        'Актив': asset_info['asset'],
-                        'Баланс гаманця': wallet_balance,
-                        'Нереалізований PNL': unrealized_pnl,
-                        'Загалом (USDT)': futures_total_usdt
-                    }
-                    break
-        return futures_total_usdt, futures_usdt_info
+    def get_futures_account_info(self):
+        """Сира відповідь futures_account (USDT-M)."""
+        return self._call_api('futures_account')
 
     @retry_on_exception()
+    def get_coin_m_account_info(self):
+        """Сира відповідь futures_coin_account (COIN-M)."""
+        return self._call_api('futures_coin_account')
+
+    def get_spot_balance(self, dust_threshold=None):
+        return build_spot_balance(self.get_account_info(), self.get_price_in_usd, dust_threshold)
+
+    def get_earn_balance(self, dust_threshold=None):
+        flexible_response, locked_response = self.get_earn_positions()
+        return build_earn_balance(flexible_response, locked_response, self.get_price_in_usd, dust_threshold)
+
+    def get_futures_balance(self):
+        return build_futures_balance(self.get_futures_account_info(), self.get_price_in_usd)
+
     def get_coin_m_futures_balance(self):
-        coin_m_balances_list = []
-        total_coin_m_value_usd = 0.0
-        account_info = self.client.futures_coin_account()
-        if account_info and 'assets' in account_info:
-            for asset_data in account_info.get('assets', []):
-                asset_symbol = asset_data.get('asset')
-                wallet_balance = float(asset_data.get('walletBalance'))
-                unrealized_pnl = float(asset_data.get('unrealizedProfit'))
-                total_asset_coin_balance = wallet_balance + unrealized_pnl
-                if abs(total_asset_coin_balance) > 1e-9:
-                    price_in_usd = self.get_price_in_usd(asset_symbol)
-                    asset_value_in_usd = 0.0
-                    if price_in_usd > 0:
-                        asset_value_in_usd = total_asset_coin_balance * price_in_usd
-                        total_coin_m_value_usd += asset_value_in_usd
-                    coin_m_balances_list.append({
-                        'Актив': asset_symbol,
-                        'Баланс гаманця': wallet_balance,
-                        'Нереалізований PNL': unrealized_pnl,
-                        'Загалом в монеті': total_asset_coin_balance,
-                        'Ціна (USD)': price_in_usd if price_in_usd > 0 else "N/A",
-                        'Вартість (USD)': asset_value_in_usd if price_in_usd > 0 else "N/A"
-                    })
-        return coin_m_balances_list, total_coin_m_value_usd
+        return build_coin_m_futures_balance(self.get_coin_m_account_info(), self.get_price_in_usd)
@@ -1,5 +1,6 @@
 # pro1/balance/api.py
 import os
+import json
 import logging
 from dotenv import load_dotenv
 
@@ -20,3 +21,47 @@ def load_api_keys(dotenv_file_path):
 
     logging.info("API ключі завантажено.")
     return api_key, secret_key
+
+
+def load_accounts(accounts_file_path, dotenv_file_path=None):
+    """
+    Завантажує облікові дані кількох акаунтів з JSON файлу.
+    Формат файлу: [{"name": "main", "api_key": "...", "secret_key": "..."}, ...]
+    Якщо файл відсутній, а вказано dotenv_file_path, повертає єдиний акаунт 'main' з файлу .env.
+    :return: Список кортежів (назва акаунту, api_key, secret_key).
+    """
+    if not os.path.exists(accounts_file_path):
+        if dotenv_file_path:
+            logging.info(f"Файл акаунтів не знайдено ({os.path.abspath(accounts_file_path)}), використовується .env.")
+            api_key, secret_key = load_api_keys(dotenv_file_path)
+            return [('main', api_key, secret_key)] if api_key and secret_key else []
+        logging.error(f"Помилка: Файл акаунтів не знайдено за шляхом: {os.path.abspath(accounts_file_path)}")
+        return []
+
+    try:
+        with open(accounts_file_path, 'r', encoding='utf-8') as f:
+            raw_accounts = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.error(f"Помилка читання файлу акаунтів ({accounts_file_path}): {e}")
+        return []
+
+    accounts = []
+    seen_names = set()
+    for index, entry in enumerate(raw_accounts if isinstance(raw_accounts, list) else []):
+        if not isinstance(entry, dict):
+            logging.error(f"Запис акаунту №{index + 1} пропущено: очікується об'єкт JSON, отримано {type(entry).__name__}.")
+            continue
+        name = str(entry.get('name') or f"account_{index + 1}")
+        api_key = entry.get('api_key')
+        secret_key = entry.get('secret_key')
+        if not api_key or not secret_key:
+            logging.error(f"Акаунт '{name}' пропущено: не вказано 'api_key' або 'secret_key'.")
+            continue
+        if name in seen_names:
+            logging.error(f"Акаунт '{name}' пропущено: назва акаунту повторюється.")
+            continue
+        seen_names.add(name)
+        accounts.append((name, api_key, secret_key))
+
+    logging.info(f"Завантажено облікові дані для {len(accounts)} акаунтів.")
+    return accounts
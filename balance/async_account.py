@@ -0,0 +1,253 @@
+# balance/async_account.py
+import asyncio
+import logging
+import aiohttp
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from .account import (
+    default_circuit_breaker,
+    retry_on_exception,
+    build_spot_balance,
+    build_earn_balance,
+    build_futures_balance,
+    build_coin_m_futures_balance,
+)
+from .metrics import METRICS
+from .price_cache import CachedPriceLookupMixin
+from .prices import PriceSnapshot, USD_STABLECOINS, STABLECOIN_QUOTES, CONVERSION_ASSETS
+from .rate_limit import (
+    DEFAULT_RATE_LIMITER,
+    DEFAULT_RATE_LIMIT_BACKOFF,
+    api_family,
+    capture_response_headers,
+    get_retry_after,
+    is_rate_limit_error,
+    record_response_headers,
+)
+
+# Мережеві помилки асинхронного клієнта, при яких запит повторюється
+ASYNC_RETRY_EXCEPTIONS = (BinanceRequestException, aiohttp.ClientError, asyncio.TimeoutError)
+
+async def _on_request_end(session, trace_config_ctx, params):
+    """Трасування aiohttp: заголовки відповіді потрапляють до виклику API, що виконується в цій корутині."""
+    record_response_headers(params.response.headers)
+
+def _response_trace_config():
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+class AsyncBinanceAccount(CachedPriceLookupMixin):
+    """
+    Асинхронний аналог BinanceAccount на основі binance.AsyncClient.
+    Усі запити йдуть через одну aiohttp-сесію з пулом з'єднань,
+    а ціни активів кожного гаманця запитуються одночасно.
+    Створюється через `await AsyncBinanceAccount.create(...)` і має бути закритий через `close()`
+    (або використаний як `async with`).
+    """
+    def __init__(self, client, rate_limiter=None, circuit_breaker=None, persistent_price_cache=None):
+        self.client = client
+        self.rate_limiter = rate_limiter or DEFAULT_RATE_LIMITER
+        self.circuit_breaker = circuit_breaker or default_circuit_breaker()
+        self._init_price_cache(persistent_price_cache)
+        self.price_snapshot = None
+        self._price_snapshot_attempted = False
+        self._snapshot_lock = asyncio.Lock()
+
+    @classmethod
+    async def create(cls, api_key: str, secret_key: str, connection_limit=20, persistent_price_cache=None):
+        """
+        Створює акаунт та асинхронний клієнт з єдиною сесією з пулом з'єднань.
+        :param connection_limit: Максимальна кількість одночасних з'єднань у пулі.
+        :param persistent_price_cache: Постійний кеш цін між запусками (PersistentPriceCache), опційно.
+        """
+        if not api_key or not secret_key:
+            raise ValueError("API ключ та секретний ключ не можуть бути порожніми.")
+
+        connector = aiohttp.TCPConnector(limit=connection_limit, ttl_dns_cache=300)
+        try:
+            client = await AsyncClient.create(api_key, secret_key, session_params={
+                'connector': connector, 'trace_configs': [_response_trace_config()],
+            })
+        except BinanceAPIException as e:
+            await connector.close()
+            logging.error(f"Помилка Binance API під час ініціалізації асинхронного клієнта: {e}")
+            raise
+        except BaseException:
+            # Мережеві помилки чи скасування задачі теж не повинні залишати відкритий пул з'єднань
+            await connector.close()
+            raise
+        logging.info("Успішно підключено до Binance API (асинхронний клієнт).")
+        return cls(client, persistent_price_cache=persistent_price_cache)
+
+    async def close(self):
+        await self.client.close_connection()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _call_api(self, method_name, **params):
+        """
+        Виконує метод асинхронного клієнта через спільний обмежувач за вагою та запобіжник,
+        не блокуючи цикл подій під час очікування.
+        """
+        family = api_family(method_name)
+        self.circuit_breaker.before_call()
+        wait_seconds = self.rate_limiter.wait_time(family)
+        if wait_seconds > 0:
+            logging.info(f"Використана вага запитів ({family}) близька до ліміту, очікування {wait_seconds:.2f} сек.")
+            await asyncio.sleep(wait_seconds)
+        try:
+            with METRICS.timer('api_call_seconds', method=method_name), capture_response_headers() as response:
+                result = await getattr(self.client, method_name)(**params)
+        except BinanceAPIException as e:
+            METRICS.increment('api_errors_total', method=method_name)
+            if is_rate_limit_error(e):
+                retry_after = get_retry_after(e)
+                self.rate_limiter.block_for(retry_after if retry_after is not None else DEFAULT_RATE_LIMIT_BACKOFF)
+            if is_rate_limit_error(e) or (e.status_code or 0) >= 500:
+                self.circuit_breaker.record_failure()
+            raise
+        except ASYNC_RETRY_EXCEPTIONS:
+            METRICS.increment('api_errors_total', method=method_name)
+            self.circuit_breaker.record_failure()
+            raise
+        finally:
+            self.rate_limiter.update_from_headers(response.get('headers'), family)
+        self.circuit_breaker.record_success()
+        return result
+
+    @retry_on_exception(allowed_exceptions_tuple=ASYNC_RETRY_EXCEPTIONS)
+    async def _load_price_snapshot_raw(self):
+        tickers, exchange_info = await asyncio.gather(
+            self._call_api('get_all_tickers'),
+            self._call_api('get_exchange_info'),
+        )
+        return PriceSnapshot.from_responses(tickers, exchange_info)
+
+    async def ensure_price_snapshot(self):
+        """
+        Повертає знімок цін, завантажуючи його лише один раз для всіх корутин.
+        """
+        if self._price_snapshot_attempted:
+            return self.price_snapshot
+        async with self._snapshot_lock:
+            if not self._price_snapshot_attempted:
+                try:
+                    snapshot = await self._load_price_snapshot_raw()
+                except Exception as e:
+                    logging.warning(f"Не вдалося завантажити знімок цін, буде використано запити по окремих парах: {e}")
+                    snapshot = None
+                if snapshot is not None and snapshot.is_empty():
+                    snapshot = None
+                self.price_snapshot = snapshot
+                self._price_snapshot_attempted = True
+                if snapshot is not None:
+                    logging.info(f"Завантажено знімок цін: {len(snapshot.prices)} пар.")
+        return self.price_snapshot
+
+    @retry_on_exception(allowed_exceptions_tuple=(BinanceAPIException, *ASYNC_RETRY_EXCEPTIONS))
+    async def _get_ticker_price_raw(self, symbol_pair):
+        ticker = await self._call_api('get_symbol_ticker', symbol=symbol_pair)
+        return float(ticker['price'])
+
+    async def _try_get_pair_price(self, pair_symbol):
+        try:
+            return await self._get_ticker_price_raw(pair_symbol)
+        except BinanceAPIException as e:
+            if e.code == -1121 and "Invalid symbol" in str(e):
+                logging.debug(f"Пари {pair_symbol} не існує.")
+            else:
+                logging.warning(f"Не вдалося отримати ціну для {pair_symbol} після спроб (інша помилка API): {e}")
+            return None
+        except Exception as e:
+            logging.error(f"Неочікувана помилка при отриманні ціни для {pair_symbol}: {e}")
+            return None
+
+    async def get_price_in_usd(self, symbol):
+        """
+        Отримує поточну оціночну ціну символу в USD.
+        Без знімка цін пари зі стейблкоїнами запитуються одночасно, а не по черзі.
+        """
+        cached_price = self._lookup_cached_price(symbol)
+        if cached_price is not None:
+            return cached_price
+        with METRICS.timer('price_resolution_seconds'):
+            return await self._resolve_price_in_usd(symbol)
+
+    async def _resolve_price_in_usd(self, symbol):
+        """Пошук ціни символу, якої немає в кеші (знімок цін або одночасні запити пар)."""
+        if symbol in USD_STABLECOINS:
+            return self._store_price(symbol, 1.0, persist=False)
+
+        snapshot = await self.ensure_price_snapshot()
+        if snapshot is not None:
+            price = snapshot.resolve_usd(symbol)
+            if price is None:
+                logging.error(f"ПОВНА ПОМИЛКА: Не вдалося отримати ціну для '{symbol}' зі знімка цін.")
+                price = 0.0
+            return self._store_price(symbol, price)
+
+        stablecoin_prices = await asyncio.gather(
+            *(self._try_get_pair_price(f"{symbol}{stablecoin}") for stablecoin in STABLECOIN_QUOTES)
+        )
+        for price in stablecoin_prices:
+            if price is not None:
+                return self._store_price(symbol, price)
+
+        for conversion_asset in CONVERSION_ASSETS:
+            price_in_conversion_asset = await self._try_get_pair_price(f"{symbol}{conversion_asset}")
+            if price_in_conversion_asset is None:
+                continue
+            conversion_asset_usd_price = await self.get_price_in_usd(conversion_asset)
+            if conversion_asset_usd_price > 0:
+                return self._store_price(symbol, price_in_conversion_asset * conversion_asset_usd_price)
+
+        logging.error(f"ПОВНА ПОМИЛКА: Не вдалося отримати ціну для '{symbol}' жодним зі способів.")
+        return self._store_price(symbol, 0.0)
+
+    async def prefetch_prices(self, assets):
+        """Одночасно отримує ціни для всіх переданих активів і заповнює кеш."""
+        await asyncio.gather(*(self.get_price_in_usd(asset) for asset in set(assets) if asset))
+
+    def _cached_price(self, asset):
+        return self.price_cache.get(asset, 0.0)
+
+    @retry_on_exception(allowed_exceptions_tuple=ASYNC_RETRY_EXCEPTIONS)
+    async def get_spot_balance(self, dust_threshold=None):
+        account_info = await self._call_api('get_account')
+        await self.prefetch_prices(
+            balance['asset'] for balance in (account_info or {}).get('balances', [])
+            if float(balance['free']) + float(balance['locked']) > 0
+        )
+        return build_spot_balance(account_info, self._cached_price, dust_threshold)
+
+    @retry_on_exception(allowed_exceptions_tuple=ASYNC_RETRY_EXCEPTIONS)
+    async def get_earn_balance(self, dust_threshold=None):
+        flexible_response, locked_response = await asyncio.gather(
+            self._call_api('get_simple_earn_flexible_product_position'),
+            self._call_api('get_simple_earn_locked_product_position'),
+        )
+        await self.prefetch_prices(
+            position.get('asset')
+            for response in (flexible_response, locked_response) if response
+            for position in response.get('rows', [])
+        )
+        return build_earn_balance(flexible_response, locked_response, self._cached_price, dust_threshold)
+
+    @retry_on_exception(allowed_exceptions_tuple=ASYNC_RETRY_EXCEPTIONS)
+    async def get_futures_balance(self):
+        futures_account_info = await self._call_api('futures_account')
+        await self.prefetch_prices(
+            asset_data.get('asset') for asset_data in (futures_account_info or {}).get('assets', [])
+        )
+        return build_futures_balance(futures_account_info, self._cached_price)
+
+    @retry_on_exception(allowed_exceptions_tuple=ASYNC_RETRY_EXCEPTIONS)
+    async def get_coin_m_futures_balance(self):
+        account_info = await self._call_api('futures_coin_account')
+        await self.prefetch_prices(asset_data.get('asset') for asset_data in (account_info or {}).get('assets', []))
+        return build_coin_m_futures_balance(account_info, self._cached_price)
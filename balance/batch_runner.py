@@ -0,0 +1,144 @@
+# balance/batch_runner.py
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from . import config
+from . import api
+from . import data_processing
+from . import report_generator
+from . import script_runner
+from .account import BinanceAccount
+from .history_store import open_history_store
+from .metrics import METRICS_FILE_NAME, record_run
+from .rate_limit import RequestBudget
+from .settings import get_settings, resolve_dust_threshold
+
+def _account_output_dir(account_name):
+    """Папка для звітів окремого акаунту: output/accounts/<назва>."""
+    safe_name = re.sub(r'[^\w.-]', '_', account_name)
+    return os.path.join(config.OUTPUT_DIR, 'accounts', safe_name)
+
+def _create_account(account_name, api_key, secret_key, request_budget, price_cache):
+    try:
+        account = BinanceAccount(api_key, secret_key, request_budget=request_budget,
+                                 persistent_price_cache=price_cache)
+    except ValueError as e:
+        logging.error(f"[{account_name}] Помилка створення об'єкту BinanceAccount: {e}")
+        return None
+    if not account.client:
+        logging.error(f"[{account_name}] Не вдалося ініціалізувати клієнт Binance.")
+        return None
+    return account
+
+def _snapshot_account(account_name, account, dust_threshold):
+    logging.info(f"[{account_name}] Отримання повного балансу...")
+    balances = script_runner.collect_full_balances(account, dust_threshold, concurrent=True)
+    script_runner.save_balance_report(
+        "full", balances, f"batch_runner ({account_name})", output_dir=_account_output_dir(account_name)
+    )
+    return balances
+
+def _snapshot_accounts(credentials, dust_threshold, max_parallel_accounts, request_budget, price_cache):
+    """
+    Створює клієнти акаунтів та паралельно отримує їхні баланси.
+    :return: (словник {назва акаунту: дані гаманців} або None, якщо жоден акаунт не створено;
+              список акаунтів, дані яких отримати не вдалося).
+    """
+    with ThreadPoolExecutor(max_workers=max_parallel_accounts, thread_name_prefix="account") as executor:
+        created = list(executor.map(
+            lambda entry: _create_account(*entry, request_budget, price_cache), credentials
+        ))
+
+        accounts = {}
+        failed_accounts = []
+        for (account_name, _, _), account in zip(credentials, created):
+            if account is None:
+                failed_accounts.append(account_name)
+            else:
+                accounts[account_name] = account
+
+        if not accounts:
+            logging.error("Пакетний режим: не вдалося ініціалізувати жоден акаунт.")
+            return None, failed_accounts
+
+        # Один знімок цін на всі акаунти замість окремого завантаження для кожного
+        shared_snapshot = next(iter(accounts.values())).ensure_price_snapshot()
+        if shared_snapshot is not None:
+            for account in accounts.values():
+                account.set_price_snapshot(shared_snapshot)
+
+        futures = {
+            account_name: executor.submit(_snapshot_account, account_name, account, dust_threshold)
+            for account_name, account in accounts.items()
+        }
+        account_balances = {}
+        for account_name, future in futures.items():
+            try:
+                account_balances[account_name] = future.result()
+            except Exception as e:
+                logging.error(f"[{account_name}] Не вдалося отримати баланс акаунту: {e}")
+                failed_accounts.append(account_name)
+    return account_balances, failed_accounts
+
+def run_batch_balance_script(credentials, dust_threshold=None, max_parallel_accounts=None, max_in_flight_requests=None,
+                             max_requests_per_minute=None):
+    """
+    Отримує повні звіти для кількох акаунтів паралельно та формує зведений звіт по портфелю.
+    Усі акаунти використовують один знімок цін (завантажується один раз), спільний постійний кеш цін
+    та спільний бюджет запитів.
+    :param credentials: Список кортежів (назва акаунту, api_key, secret_key), див. api.load_accounts.
+    :param max_parallel_accounts: Кількість акаунтів, що обробляються одночасно.
+    :param max_in_flight_requests: Глобальний ліміт одночасних запитів до API для всіх акаунтів.
+    :param max_requests_per_minute: Глобальний ліміт запитів за хвилину (None - без ліміту).
+    Не вказані параметри беруться з налаштувань (розділи report, concurrency та rate_limit).
+    :return: Словник {назва акаунту: дані гаманців} для успішно оброблених акаунтів.
+    """
+    settings = get_settings()
+    dust_threshold = resolve_dust_threshold(dust_threshold)
+    max_parallel_accounts = max_parallel_accounts or settings.concurrency.parallel_accounts
+    max_in_flight_requests = max_in_flight_requests or settings.concurrency.max_in_flight_requests
+    max_requests_per_minute = max_requests_per_minute or settings.rate_limit.max_requests_per_minute
+    with record_run(os.path.join(config.OUTPUT_DIR, METRICS_FILE_NAME), report_type='portfolio', mode='batch'):
+        return _run_batch_balance_script(credentials, dust_threshold, max_parallel_accounts, max_in_flight_requests,
+                                         max_requests_per_minute, settings.history.backend)
+
+def _run_batch_balance_script(credentials, dust_threshold, max_parallel_accounts, max_in_flight_requests,
+                              max_requests_per_minute, history_backend):
+    if not credentials:
+        logging.error("Пакетний режим: не передано жодного акаунту.")
+        return {}
+
+    logging.info(f"Пакетний режим: {len(credentials)} акаунтів, до {max_parallel_accounts} одночасно, "
+                 f"до {max_in_flight_requests} одночасних запитів.")
+    request_budget = RequestBudget(max_in_flight_requests, max_requests_per_minute)
+    price_cache = script_runner.open_report_price_cache()
+    try:
+        account_balances, failed_accounts = _snapshot_accounts(
+            credentials, dust_threshold, max_parallel_accounts, request_budget, price_cache
+        )
+    finally:
+        if price_cache is not None:
+            price_cache.close()
+    if account_balances is None:
+        return {}
+
+    json_data, txt_data, report_file_suffix = report_generator.prepare_portfolio_report_data(
+        account_balances, failed_accounts
+    )
+    data_processing.save_to_json(json_data, output_dir_path=config.OUTPUT_DIR, file_name=f'{report_file_suffix}.json')
+    data_processing.save_to_txt(txt_data, output_dir_path=config.OUTPUT_DIR, file_name=f'{report_file_suffix}.txt')
+    if account_balances and history_backend == 'binary':
+        open_history_store(
+            config.OUTPUT_DIR, 'portfolio_history', 'portfolio_balance_history.csv'
+        ).append_total(json_data['total_balance_estimated_usd'])
+
+    logging.info(f"Пакетний режим завершено: оброблено {len(account_balances)} акаунтів, "
+                 f"помилок: {len(failed_accounts)}. Загальний баланс портфеля: "
+                 f"{json_data['total_balance_estimated_usd']:.2f} USD")
+    return account_balances
+
+def run_batch_from_file(accounts_file_path=None, **kwargs):
+    """Завантажує облікові дані з файлу акаунтів і запускає пакетний режим."""
+    credentials = api.load_accounts(accounts_file_path or config.ACCOUNTS_PATH, dotenv_file_path=config.DOTENV_PATH)
+    return run_batch_balance_script(credentials, **kwargs)
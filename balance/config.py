@@ -1,8 +1,19 @@
 # pro1/balance/config.py
-import os
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import time
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows: блокування між процесами недоступне, ротація як у стандартних обробниках
+    fcntl = None
+
 # --- Визначення шляхів відносно директорії пакета balance ---
 # Директорія, де знаходиться цей файл config.py (тобто balance/)
 PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,21 +22,165 @@ PROJECT_ROOT_DIR = os.path.dirname(PACKAGE_DIR)
 
 SERVICE_DIR = os.path.join(PROJECT_ROOT_DIR, 'service')
 DOTENV_PATH = os.path.join(SERVICE_DIR, '.env')
+# Список облікових даних кількох акаунтів для пакетного режиму
+ACCOUNTS_PATH = os.path.join(SERVICE_DIR, 'accounts.json')
 
 # Папки logs та output всередині пакета balance
 LOG_DIR = os.path.join(PACKAGE_DIR, 'logs')
 OUTPUT_DIR = os.path.join(PACKAGE_DIR, 'output')
+# Постійний кеш цін між запусками
+PRICE_CACHE_PATH = os.path.join(OUTPUT_DIR, 'price_cache.sqlite3')
+# Історія балансу (бінарний журнал, розбитий по днях), див. balance/history_store.py
+HISTORY_DIR = os.path.join(OUTPUT_DIR, 'history')
+# Архів знімків позицій з дельта-стисненням, див. balance/snapshot_archive.py
+SNAPSHOT_ARCHIVE_DIR = os.path.join(OUTPUT_DIR, 'snapshots')
+# Локальне сховище свічок (klines) для технічного аналізу, див. analysis/kline_store.py
+KLINE_STORE_DIR = os.path.join(OUTPUT_DIR, 'klines')
+
+# Вбудовані профілі налаштувань (значення профілів - balance/settings.py PROFILES);
+# назви тут, щоб довідка main.py не імпортувала pydantic
+SETTINGS_PROFILE_NAMES = ('cron-fast', 'daemon', 'deep-audit')
+
+# Ротація файлів логу: 'size' - за розміром, 'time' - щодня опівночі, None - без ротації
+LOG_ROTATION = 'size'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+# Кількість збережених ротованих файлів кожного логу
+LOG_BACKUP_COUNT = 5
+# Файли логів, старші за цю кількість днів, видаляються під час налаштування логування
+LOG_RETENTION_DAYS = 30
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
 
 _LOGGING_INITIALIZED = False # Прапорець, що показує, чи було вже налаштовано логування
+_LOG_LISTENER = None # QueueListener, що пише записи логу у файл і консоль у фоновому потоці
+_ATEXIT_REGISTERED = False # shutdown_logging зареєстровано в atexit (один раз на процес)
+
+class JsonLogFormatter(logging.Formatter):
+    """Один запис логу - один рядок JSON (для збору логів та розбору без регулярних виразів)."""
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.filename,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class _LogQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, що лише підставляє аргументи повідомлення в потоці, який логує:
+    форматування (текст або JSON) та запис виконуються в потоці QueueListener.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def cleanup_old_logs(log_dir, retention_days=LOG_RETENTION_DAYS, keep=()):
+    """
+    Видаляє файли логів (*.log та ротовані *.log.N / *.log.ДАТА), старші за retention_days днів.
+    :param keep: Шляхи файлів, які не видаляються (наприклад, відкритий файл логу поточного запуску).
+    :return: Кількість видалених файлів.
+    """
+    if retention_days is None or not os.path.isdir(log_dir):
+        return 0
+    cutoff = time.time() - retention_days * 86400
+    keep = {os.path.abspath(path) for path in keep}
+    removed = 0
+    for entry in os.scandir(log_dir):
+        if not entry.is_file() or '.log' not in entry.name or os.path.abspath(entry.path) in keep:
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError as e:
+            logging.warning(f"Не вдалося видалити старий файл логу {entry.path}: {e}")
+    return removed
+
+class _InterProcessRotationMixin:
+    """
+    Ротація одного файлу логу кількома процесами (наприклад, запуск з cron під час роботи демона
+    з тим самим файлом): запис і ротація виконуються під блокуванням файлу <лог>.lock (fcntl.flock),
+    а якщо файл уже ротував інший процес, обробник спершу перевідкриває новий файл.
+    """
+    def _open_lock(self):
+        self._lock_path = os.path.splitext(self.baseFilename)[0] + '.lock'
+        self._lock_file = open(self._lock_path, 'a') if fcntl is not None else None
+
+    def _reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.stream.close()
+            self.stream = self._open()
+            if hasattr(self, 'rolloverAt'):
+                self.rolloverAt = self.computeRollover(time.time())
+
+    def emit(self, record):
+        if self._lock_file is None:
+            return super().emit(record)
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            self._reopen_if_rotated()
+            super().emit(record)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def close(self):
+        super().close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+class _RotatingFileHandler(_InterProcessRotationMixin, logging.handlers.RotatingFileHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._open_lock()
+
+class _TimedRotatingFileHandler(_InterProcessRotationMixin, logging.handlers.TimedRotatingFileHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._open_lock()
 
-def setup_logging(log_file_suffix='_general'):
+def _file_handler(log_file_path, rotation, max_bytes, backup_count):
+    if rotation == 'size':
+        return _RotatingFileHandler(log_file_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    if rotation == 'time':
+        return _TimedRotatingFileHandler(log_file_path, when='midnight', backupCount=backup_count, encoding='utf-8')
+    # Без ротації кожен процес лише дописує рядки в кінець файлу - блокування не потрібне
+    return logging.FileHandler(log_file_path, encoding='utf-8')
+
+def setup_logging(log_file_suffix='_general', use_queue=True, json_format=False, rotation=LOG_ROTATION,
+                  max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT, retention_days=LOG_RETENTION_DAYS,
+                  level=logging.INFO):
     """
     Налаштовує логування.
-    Використовує LOG_DIR для збереження файлів логів.
-    Додає суфікс до імені файлу логу для розрізнення.
+    Використовує LOG_DIR для збереження файлів логів; суфікс визначає назву файлу логу
+    (один файл на суфікс з ротацією замість нового файлу на кожен запуск).
     Налаштовує обробники лише один раз за сесію.
+    :param use_queue: Записи передаються через чергу (QueueHandler), а файл і консоль пише фоновий
+                      потік QueueListener - виклики logging.* не чекають на введення-виведення.
+    :param json_format: Файл логу у форматі JSON lines (консоль лишається текстовою).
+    :param rotation: 'size' (max_bytes), 'time' (щодня опівночі) або None.
+    :param retention_days: Видаляти файли логів, старші за цю кількість днів (None - не видаляти).
     """
-    global _LOGGING_INITIALIZED
+    global _LOGGING_INITIALIZED, _LOG_LISTENER, _ATEXIT_REGISTERED
 
     if _LOGGING_INITIALIZED:
         logging.debug(f"Логування вже було ініціалізовано. Поточний виклик setup_logging з суфіксом '{log_file_suffix}' не буде переналаштовувати обробники.")
@@ -34,8 +189,7 @@ def setup_logging(log_file_suffix='_general'):
     if not os.path.exists(LOG_DIR):
         os.makedirs(LOG_DIR)
 
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-    log_file_name = f"{timestamp}{log_file_suffix}.log"
+    log_file_name = f"{log_file_suffix.strip('_') or 'general'}.log"
     log_file_path = os.path.join(LOG_DIR, log_file_name)
 
     # Видаляємо всі попередні обробники, щоб уникнути дублювання, якщо вони якось залишились
@@ -43,15 +197,44 @@ def setup_logging(log_file_suffix='_general'):
         logging.root.removeHandler(handler)
         handler.close()
 
-    logging.basicConfig(level=logging.INFO,
-                        format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
-                        handlers=[
-                            logging.FileHandler(log_file_path, encoding='utf-8'),
-                            logging.StreamHandler() # Вивід у консоль
-                        ])
-    
+    file_handler = _file_handler(log_file_path, rotation, max_bytes, backup_count)
+    file_handler.setFormatter(JsonLogFormatter() if json_format else logging.Formatter(LOG_FORMAT))
+    console_handler = logging.StreamHandler() # Вивід у консоль
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logging.root.setLevel(level)
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        logging.root.addHandler(_LogQueueHandler(log_queue))
+        _LOG_LISTENER = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                                       respect_handler_level=True)
+        _LOG_LISTENER.start()
+        # Записи, що лишилися в черзі, дописуються перед завершенням процесу
+        if not _ATEXIT_REGISTERED:
+            atexit.register(shutdown_logging)
+            _ATEXIT_REGISTERED = True
+    else:
+        logging.root.addHandler(file_handler)
+        logging.root.addHandler(console_handler)
+
     _LOGGING_INITIALIZED = True
     logging.info(f"Логування налаштовано. Основний файл логу для цього запуску: {log_file_path}")
+    # Старі логи видаляються після встановлення обробників, щоб попередження про помилки видалення потрапили в лог
+    removed_logs = cleanup_old_logs(LOG_DIR, retention_days, keep=[log_file_path])
+    if removed_logs:
+        logging.info(f"Видалено старих файлів логу (старших за {retention_days} дн.): {removed_logs}")
+
+def shutdown_logging():
+    """Зупиняє фоновий потік логування (дописавши чергу) та знімає обробники; повторне налаштування можливе."""
+    global _LOGGING_INITIALIZED, _LOG_LISTENER
+    listener, _LOG_LISTENER = _LOG_LISTENER, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+        handler.close()
+    _LOGGING_INITIALIZED = False
 
 # Приклад виклику для тестування (можна видалити або закоментувати)
 if __name__ == '__main__':
@@ -59,8 +242,13 @@ if __name__ == '__main__':
     print(f"Package Dir: {PACKAGE_DIR}")
     print(f"Service Dir: {SERVICE_DIR}")
     print(f"Dotenv Path: {DOTENV_PATH}")
+    print(f"Accounts Path: {ACCOUNTS_PATH}")
     print(f"Log Dir: {LOG_DIR}")
     print(f"Output Dir: {OUTPUT_DIR}")
+    print(f"Price Cache Path: {PRICE_CACHE_PATH}")
+    print(f"History Dir: {HISTORY_DIR}")
+    print(f"Snapshot Archive Dir: {SNAPSHOT_ARCHIVE_DIR}")
+    print(f"Kline Store Dir: {KLINE_STORE_DIR}")
 
     setup_logging("_config_test_1")
     logging.info("Перше тестове повідомлення з config.py")
@@ -0,0 +1,253 @@
+# balance/daemon.py
+import logging
+import os
+import threading
+import time
+from binance import ThreadedWebsocketManager
+from . import api
+from . import config
+from . import script_runner
+from .metrics import METRICS_FILE_NAME, record_run
+from .settings import get_settings, resolve_dust_threshold
+from .account import (
+    BinanceAccount,
+    build_spot_balance,
+    build_earn_balance,
+    build_futures_balance,
+    build_coin_m_futures_balance,
+)
+
+class LivePortfolio:
+    """
+    Стан портфеля в пам'яті, який оновлюється подіями websocket:
+    ціни пар - з потоку !miniTicker@arr, спотові залишки - з подій outboundAccountPosition.
+    Оцінка в USD виконується з поточного стану без запитів до API.
+    Потокобезпечний: події надходять з потоку websocket-менеджера, звіти формуються в основному потоці.
+    """
+    def __init__(self, snapshot, dust_threshold=None):
+        self.dust_threshold = resolve_dust_threshold(dust_threshold)
+        self._lock = threading.Lock()
+        self.snapshot = snapshot
+        self._usd_prices_stale = False
+        # Актив -> {'asset', 'free', 'locked'} у форматі відповіді get_account
+        self.spot_balances = {}
+        self.earn_positions = (None, None)
+        self.futures_account_info = None
+        self.coin_m_account_info = None
+        self.last_event_time = None
+
+    def set_snapshot(self, snapshot):
+        with self._lock:
+            self.snapshot = snapshot
+            self._usd_prices_stale = False
+
+    def load_spot(self, account_info):
+        """Замінює спотові залишки відповіддю get_account."""
+        balances = {}
+        for balance in (account_info or {}).get('balances', []):
+            balances[balance['asset']] = {
+                'asset': balance['asset'], 'free': balance['free'], 'locked': balance['locked']
+            }
+        with self._lock:
+            self.spot_balances = balances
+
+    def load_wallets(self, earn_positions, futures_account_info, coin_m_account_info):
+        """Замінює сирі дані Earn та ф'ючерсних гаманців (з REST-синхронізації)."""
+        with self._lock:
+            self.earn_positions = earn_positions
+            self.futures_account_info = futures_account_info
+            self.coin_m_account_info = coin_m_account_info
+
+    def apply_miniticker(self, events):
+        """
+        Застосовує пакет подій !miniTicker@arr (ціна закриття 'c' для символу 's').
+        Ціни активів у USD перераховуються ліниво - під час наступної оцінки.
+        :return: Кількість оновлених пар.
+        """
+        updates = {}
+        for event in events:
+            try:
+                updates[event['s']] = float(event['c'])
+            except (KeyError, TypeError, ValueError):
+                continue
+        with self._lock:
+            if self.snapshot is None:
+                return 0
+            updated = self.snapshot.update_prices(updates, revalue=False)
+            if updated:
+                self._usd_prices_stale = True
+                self.last_event_time = time.time()
+        return updated
+
+    def apply_user_event(self, event):
+        """
+        Застосовує подію спотового user data stream.
+        outboundAccountPosition містить нові залишки всіх змінених активів.
+        :return: True, якщо стан змінено.
+        """
+        if event.get('e') != 'outboundAccountPosition':
+            return False
+        with self._lock:
+            for balance in event.get('B', []):
+                self.spot_balances[balance['a']] = {'asset': balance['a'], 'free': balance['f'], 'locked': balance['l']}
+            self.last_event_time = time.time()
+        return True
+
+    def _get_price(self, asset):
+        if self.snapshot is None:
+            return 0.0
+        return self.snapshot.resolve_usd(asset) or 0.0
+
+    def balances(self):
+        """
+        Оцінює всі гаманці з поточного стану.
+        :return: Словник у форматі script_runner.collect_full_balances.
+        """
+        with self._lock:
+            if self._usd_prices_stale:
+                self.snapshot.revalue()
+                self._usd_prices_stale = False
+            flexible_response, locked_response = self.earn_positions
+            return {
+                'spot': build_spot_balance(
+                    {'balances': list(self.spot_balances.values())}, self._get_price, self.dust_threshold
+                ),
+                'earn': build_earn_balance(flexible_response, locked_response, self._get_price, self.dust_threshold),
+                'futures': build_futures_balance(self.futures_account_info, self._get_price),
+                'coin_m_futures': build_coin_m_futures_balance(self.coin_m_account_info, self._get_price),
+            }
+
+class BalanceDaemon:
+    """
+    Довготривалий режим: один відкритий акаунт, потоки websocket для цін та спотових залишків,
+    звіти та рядки історії балансу за розкладом з поточного стану в пам'яті.
+    REST використовується лише для початкового завантаження та періодичної синхронізації
+    (Earn та ф'ючерсні гаманці не мають потоку подій, а синхронізація виправляє пропущені події).
+    Не вказані інтервали беруться з налаштувань (settings.daemon); resync_interval=0 - синхронізація
+    лише після помилки потоку акаунту.
+    """
+    def __init__(self, account, dust_threshold=None, report_interval=None, resync_interval=None,
+                 websocket_manager_factory=ThreadedWebsocketManager):
+        daemon_settings = get_settings().daemon
+        self.account = account
+        self.report_interval = daemon_settings.report_interval if report_interval is None else report_interval
+        self.resync_interval = daemon_settings.resync_interval if resync_interval is None else resync_interval
+        self.websocket_manager_factory = websocket_manager_factory
+        self.portfolio = LivePortfolio(None, dust_threshold)
+        self.websocket_manager = None
+        self._resync_requested = threading.Event()
+        self._last_resync = None
+
+    def resync(self):
+        """Повністю оновлює знімок цін і всі гаманці через REST."""
+        logging.info("Демон: синхронізація знімка цін та гаманців через REST...")
+        snapshot = self.account.refresh_price_snapshot()
+        if snapshot is not None:
+            self.portfolio.set_snapshot(snapshot)
+        self.portfolio.load_spot(self.account.get_account_info())
+        self.portfolio.load_wallets(
+            self.account.get_earn_positions(),
+            self.account.get_futures_account_info(),
+            self.account.get_coin_m_account_info(),
+        )
+        self._last_resync = time.monotonic()
+        self._resync_requested.clear()
+
+    def _on_miniticker(self, message):
+        if isinstance(message, dict):
+            if message.get('e') == 'error':
+                logging.warning(f"Демон: помилка потоку цін: {message.get('m')}")
+            return
+        self.portfolio.apply_miniticker(message)
+
+    def _on_user_event(self, message):
+        if message.get('e') == 'error':
+            logging.warning(f"Демон: помилка потоку акаунту, буде виконано синхронізацію: {message.get('m')}")
+            self._resync_requested.set()
+            return
+        self.portfolio.apply_user_event(message)
+
+    def start_streams(self):
+        self.websocket_manager = self.websocket_manager_factory(
+            api_key=self.account.api_key, api_secret=self.account.secret_key
+        )
+        self.websocket_manager.start()
+        self.websocket_manager.start_miniticker_socket(callback=self._on_miniticker)
+        self.websocket_manager.start_user_socket(callback=self._on_user_event)
+        logging.info("Демон: підключено потоки !miniTicker@arr та user data stream.")
+
+    def stop_streams(self):
+        if self.websocket_manager is not None:
+            self.websocket_manager.stop()
+            self.websocket_manager = None
+
+    def emit_report(self):
+        """
+        Зберігає повний звіт та рядок історії балансу з поточного стану.
+        Без знімка цін усі активи оцінилися б у 0 USD, тож звіт пропускається, щоб не псувати історію.
+        :return: True, якщо звіт збережено.
+        """
+        if self.portfolio.snapshot is None:
+            logging.warning("Демон: знімок цін ще не отримано, звіт пропущено.")
+            return False
+        script_runner.save_balance_report("full", self.portfolio.balances(), "balance.daemon")
+        return True
+
+    def _resync_due(self):
+        if self._resync_requested.is_set():
+            return True
+        return self.resync_interval and time.monotonic() - self._last_resync >= self.resync_interval
+
+    def run(self, stop_event=None, max_reports=None):
+        """
+        Запускає демон до встановлення stop_event (або KeyboardInterrupt).
+        :param max_reports: Зупинитися після вказаної кількості звітів (None - без обмеження).
+        """
+        stop_event = stop_event or threading.Event()
+        reports = 0
+        try:
+            try:
+                self.resync()
+            except Exception as e:
+                logging.error(f"Демон: не вдалося завантажити початковий стан гаманців через REST, зупинка: {e}")
+                return reports
+            self.start_streams()
+            while not stop_event.is_set():
+                # Метрики кожного циклу (синхронізація та звіт) - окремий рядок у файлі метрик
+                with record_run(os.path.join(config.OUTPUT_DIR, METRICS_FILE_NAME), report_type='full', mode='daemon'):
+                    if self._resync_due():
+                        try:
+                            self.resync()
+                        except Exception as e:
+                            logging.error(f"Демон: не вдалося синхронізувати гаманці, продовжуємо з поточним станом: {e}")
+                    self.emit_report()
+                reports += 1
+                if max_reports is not None and reports >= max_reports:
+                    break
+                stop_event.wait(self.report_interval)
+        except KeyboardInterrupt:
+            logging.info("Демон: отримано сигнал зупинки.")
+        finally:
+            self.stop_streams()
+        return reports
+
+def run_daemon(dust_threshold=None, report_interval=None, resync_interval=None):
+    """Точка входу режиму демона (main.py --daemon). Не вказані параметри беруться з налаштувань."""
+    api_key, secret_key = api.load_api_keys(dotenv_file_path=config.DOTENV_PATH)
+    if not api_key or not secret_key:
+        logging.error("Зупинка демона через відсутність API ключів.")
+        return
+
+    try:
+        account = BinanceAccount(api_key, secret_key)
+    except ValueError as e:
+        logging.error(f"Помилка створення об'єкту BinanceAccount: {e}")
+        return
+    if not account.client:
+        logging.error("Зупинка демона: не вдалося ініціалізувати клієнт Binance.")
+        return
+
+    balance_daemon = BalanceDaemon(account, dust_threshold, report_interval, resync_interval)
+    logging.info(f"Демон запущено: звіт кожні {balance_daemon.report_interval} сек., "
+                 f"синхронізація через REST кожні {balance_daemon.resync_interval} сек.")
+    balance_daemon.run()
@@ -2,37 +2,101 @@
 import os
 import logging
 import json
-import pandas as pd
-import csv
-from datetime import datetime
+import tempfile
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Необов'язкова залежність для компактного JSON
+    orjson = None
 
 # Припустимо, логування вже налаштовано в головному скрипті (main.py)
 # Функції тут просто використовують існуючий логер
 
+# Формати числових колонок таблиць: 8 знаків для кількостей, 2 - для сум у USD
+AMOUNT_FORMAT = '%.8f'
+USD_FORMAT = '%.2f'
+
+def _format_column(values, number_format):
+    """
+    Форматує колонку цілим масивом: числа - за number_format, решта - 'N/A'.
+    """
+    is_number = np.fromiter(
+        (isinstance(value, (int, float)) and value == value for value in values), dtype=bool, count=len(values)
+    )
+    numbers = np.array([value if number else 0.0 for value, number in zip(values, is_number)], dtype=float)
+    return np.where(is_number, np.char.mod(number_format, numbers), 'N/A')
+
+def _text_column(values, missing=''):
+    return np.array([missing if value is None or value != value else str(value) for value in values], dtype=str)
+
+class TableRenderer:
+    """
+    Рендерер текстових таблиць звітів у форматі DataFrame.to_string(index=False)
+    (колонки вирівняні праворуч, розділені пробілом), але без pandas: клітинки форматуються
+    за колонками через np.char, а ширина кожної колонки рахується один раз.
+    """
+    @staticmethod
+    def _build_columns(rows, columns):
+        """
+        :param columns: Список (назва колонки, формат числа або None для тексту).
+        :return: Список (заголовок, масив рядків клітинок).
+        """
+        built = []
+        for name, number_format in columns:
+            values = [row.get(name) for row in rows]
+            cells = _text_column(values) if number_format is None else _format_column(values, number_format)
+            built.append((name, cells))
+        return built
+
+    def iter_lines(self, rows, columns):
+        """Генерує рядки таблиці по одному: заголовок, потім рядки даних."""
+        built = self._build_columns(rows, columns)
+        widths = [max(len(name), int(np.char.str_len(cells).max())) for name, cells in built]
+        yield ' '.join(name.rjust(width) for (name, _), width in zip(built, widths))
+        justified = [np.char.rjust(cells, width) for (_, cells), width in zip(built, widths)]
+        for cells in zip(*justified):
+            yield ' '.join(cells)
+
+    def render(self, rows, columns):
+        """Повертає таблицю одним рядком."""
+        return '\n'.join(self.iter_lines(rows, columns))
+
+# Спільний для процесу рендерер таблиць
+TABLE_RENDERER = TableRenderer()
+
+SPOT_TABLE_COLUMNS = [
+    ('Актив', None), ('Вільний', AMOUNT_FORMAT), ('Заблокований', AMOUNT_FORMAT),
+    ('Всього', AMOUNT_FORMAT), ('Вартість (USD)', USD_FORMAT),
+]
+COIN_M_TABLE_COLUMNS = [
+    ('Актив', None), ('Баланс гаманця', AMOUNT_FORMAT), ('Нереалізований PNL', AMOUNT_FORMAT),
+    ('Загалом в монеті', AMOUNT_FORMAT), ('Ціна (USD)', USD_FORMAT), ('Вартість (USD)', USD_FORMAT),
+]
+FUTURES_POSITIONS_TABLE_COLUMNS = [
+    ('Символ', None), ('Сторона', None), ('Кількість', AMOUNT_FORMAT), ('Ціна входу', AMOUNT_FORMAT),
+    ('Маркувальна ціна', AMOUNT_FORMAT), ('Номінал', USD_FORMAT), ('Нереалізований PNL', AMOUNT_FORMAT),
+    ('Плече', None),
+]
+PORTFOLIO_ACCOUNTS_TABLE_COLUMNS = [
+    ('Акаунт', None), ('Спот (USD)', USD_FORMAT), ('Earn (USD)', USD_FORMAT),
+    ('USDT-M (USD)', USD_FORMAT), ('COIN-M (USD)', USD_FORMAT), ('Всього (USD)', USD_FORMAT),
+]
+PORTFOLIO_ASSETS_TABLE_COLUMNS = [('Актив', None), ('Всього', AMOUNT_FORMAT), ('Вартість (USD)', USD_FORMAT)]
+
+def earn_table_columns(earn_list):
+    """Колонки Earn таблиці: 'Дата закінчення' показується, лише якщо є хоча б одна дата."""
+    columns = [('Актив', None), ('Продукт', None), ('Всього', AMOUNT_FORMAT)]
+    if any(item.get('Дата закінчення') is not None for item in earn_list):
+        columns.append(('Дата закінчення', None))
+    columns.append(('Вартість (USD)', USD_FORMAT))
+    return columns
+
 def format_spot_balance_table(spot_balances_list):
     """Форматує список спотових балансів у рядок таблиці."""
     if not spot_balances_list:
         return "На спотовому гаманці немає активів з балансом > 0."
-
-    df_spot = pd.DataFrame(spot_balances_list)
-
-    # Форматуємо числові стовбці для вигляду в таблиці
-    if 'Вільний' in df_spot.columns:
-        df_spot['Вільний'] = df_spot['Вільний'].map('{:.8f}'.format)
-    if 'Заблокований' in df_spot.columns:
-        df_spot['Заблокований'] = df_spot['Заблокований'].map('{:.8f}'.format)
-    if 'Всього' in df_spot.columns:
-        df_spot['Всього'] = df_spot['Всього'].map('{:.8f}'.format)
-    
-    # Обробка стовпця "Вартість (USD)" для виводу (N/A або число)
-    if 'Вартість (USD)' in df_spot.columns:
-        df_spot['Вартість (USD)'] = df_spot['Вартість (USD)'].apply(lambda x: f'{x:.2f}' if pd.notna(x) and isinstance(x, (int, float)) else 'N/A')
-
-    # Переконуємося, що основні колонки існують для виводу
-    columns_to_show = ['Актив', 'Вільний', 'Заблокований', 'Всього', 'Вартість (USD)']
-    existing_columns = [col for col in columns_to_show if col in df_spot.columns]
-    
-    return df_spot[existing_columns].to_string(index=False, na_rep='N/A')
+    return TABLE_RENDERER.render(spot_balances_list, SPOT_TABLE_COLUMNS)
 
 
 def format_earn_balance_table(earn_list):
@@ -45,37 +109,7 @@ def format_earn_balance_table(earn_list):
     """
     if not earn_list:
         return "На рахунку Binance Earn немає активів з балансом > 0."
-
-    # Створюємо DataFrame
-    df_earn = pd.DataFrame(earn_list)
-
-    # Визначаємо, чи є хоча б один Locked продукт з датою закінчення, щоб вирішити, чи показувати колонку
-    has_end_date = 'Дата закінчення' in df_earn.columns and df_earn['Дата закінчення'].notna().any()
-
-    # Визначаємо колонки для відображення
-    columns_to_display = ['Актив', 'Продукт', 'Всього']
-    if has_end_date:
-        columns_to_display.append('Дата закінчення')
-    columns_to_display.append('Вартість (USD)')
-    
-    # Переконуємося, що всі потрібні колонки існують, заповнюючи відсутні NaN
-    for col in columns_to_display:
-        if col not in df_earn.columns:
-            df_earn[col] = pd.NA # Або None, або відповідне значення за замовчуванням
-
-    df_display = df_earn[columns_to_display].copy() # Працюємо з копією
-
-    # Форматування числових значень
-    if 'Всього' in df_display.columns:
-        df_display['Всього'] = df_display['Всього'].apply(lambda x: f"{x:.8f}" if pd.notna(x) else 'N/A')
-    if 'Вартість (USD)' in df_display.columns:
-        df_display['Вартість (USD)'] = df_display['Вартість (USD)'].apply(lambda x: f"{x:.2f}" if pd.notna(x) and isinstance(x, (int, float)) else 'N/A')
-    
-    # Заповнюємо NA для текстових колонок, якщо потрібно
-    if 'Дата закінчення' in df_display.columns:
-        df_display['Дата закінчення'] = df_display['Дата закінчення'].fillna('') # Пустий рядок для Flexible або якщо дати немає
-            
-    return df_display.to_string(index=False, na_rep='N/A')
+    return TABLE_RENDERER.render(earn_list, earn_table_columns(earn_list))
 
 def format_coin_m_futures_balance_table(coin_m_futures_list):
     """
@@ -88,51 +122,124 @@ def format_coin_m_futures_balance_table(coin_m_futures_list):
     """
     if not coin_m_futures_list:
         return "На COIN-M ф'ючерсному рахунку немає активів для відображення."
+    return TABLE_RENDERER.render(coin_m_futures_list, COIN_M_TABLE_COLUMNS)
+
+def format_futures_assets_table(futures_assets_list):
+    """
+    Форматує маржинальні активи USDT-M ф'ючерсного балансу (колонки як у COIN-M таблиці).
+    """
+    if not futures_assets_list:
+        return "На USDT-M ф'ючерсному рахунку немає активів для відображення."
+    return TABLE_RENDERER.render(futures_assets_list, COIN_M_TABLE_COLUMNS)
+
+def format_futures_positions_table(positions_list):
+    """
+    Форматує відкриті USDT-M позиції у вигляді текстової таблиці.
+    :param positions_list: Список словників з ключами FUTURES_POSITIONS_TABLE_COLUMNS.
+    """
+    if not positions_list:
+        return "Відкритих позицій немає."
+    return TABLE_RENDERER.render(positions_list, FUTURES_POSITIONS_TABLE_COLUMNS)
+
+def format_portfolio_accounts_table(accounts_rows):
+    """
+    Форматує зведення по акаунтах портфеля у вигляді текстової таблиці.
+    :param accounts_rows: Список словників з ключами 'Акаунт', 'Спот (USD)', 'Earn (USD)',
+                          'USDT-M (USD)', 'COIN-M (USD)', 'Всього (USD)'.
+    """
+    if not accounts_rows:
+        return "Немає даних по жодному акаунту."
+    return TABLE_RENDERER.render(accounts_rows, PORTFOLIO_ACCOUNTS_TABLE_COLUMNS)
 
-    df_coin_m = pd.DataFrame(coin_m_futures_list)
-
-    # Визначаємо колонки для відображення
-    columns_to_display = [
-        'Актив', 
-        'Баланс гаманця', 
-        'Нереалізований PNL', 
-        'Загалом в монеті', 
-        'Ціна (USD)', 
-        'Вартість (USD)'
-    ]
-    
-    # Переконуємося, що всі потрібні колонки існують, заповнюючи відсутні pd.NA
-    for col in columns_to_display:
-        if col not in df_coin_m.columns:
-            df_coin_m[col] = pd.NA 
-
-    df_display = df_coin_m[columns_to_display].copy()
-
-    # Форматування числових значень
-    numeric_8_decimals = ['Баланс гаманця', 'Нереалізований PNL', 'Загалом в монеті']
-    numeric_2_decimals_usd = ['Ціна (USD)', 'Вартість (USD)']
-
-    for col in numeric_8_decimals:
-        if col in df_display.columns:
-            df_display[col] = df_display[col].apply(lambda x: f"{x:.8f}" if pd.notna(x) and isinstance(x, (int, float)) else 'N/A')
-    
-    for col in numeric_2_decimals_usd:
-        if col in df_display.columns:
-            df_display[col] = df_display[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) and isinstance(x, (int, float)) else 'N/A')
-            
-    return df_display.to_string(index=False, na_rep='N/A')
-
-
-def save_to_json(data, output_dir_path, file_name):
-    """Зберігає дані у файл JSON з вказаним іменем у вказаній вихідній директорії."""
+def format_portfolio_assets_table(assets_rows):
+    """
+    Форматує зведення по активах портфеля (сума по всіх акаунтах та гаманцях).
+    :param assets_rows: Список словників з ключами 'Актив', 'Всього', 'Вартість (USD)'.
+    """
+    if not assets_rows:
+        return "У портфелі немає активів для відображення."
+    return TABLE_RENDERER.render(assets_rows, PORTFOLIO_ASSETS_TABLE_COLUMNS)
+
+
+class AtomicFileWriter:
+    """
+    Контекстний менеджер для атомарного запису текстового файлу: дані пишуться в тимчасовий файл
+    у тій самій папці, який після успішного завершення замінює цільовий файл (os.replace).
+    Читачі ніколи не бачать наполовину записаного файлу; у разі помилки старий файл лишається без змін.
+    """
+    def __init__(self, file_path, encoding='utf-8'):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.temp_path = None
+        self.file = None
+
+    def __enter__(self):
+        output_dir_path = os.path.dirname(self.file_path) or '.'
+        os.makedirs(output_dir_path, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=output_dir_path, prefix=f".{os.path.basename(self.file_path)}.", suffix='.tmp'
+        )
+        self.file = os.fdopen(fd, 'w', encoding=self.encoding, newline='')
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            self.file.close()
+            if exc_type is None:
+                os.replace(self.temp_path, self.file_path)
+        finally:
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+        return False
+
+def dumps_json(data, compact=False):
+    """
+    Серіалізує дані в JSON: з відступами (як раніше) або компактно.
+    Компактний режим використовує orjson, якщо він встановлений.
+    """
+    if not compact:
+        return json.dumps(data, indent=4, ensure_ascii=False)
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+class JsonObjectStreamWriter:
+    """
+    Записує JSON об'єкт у відкритий файл по одному полю: кожна секція звіту серіалізується
+    та пишеться, щойно вона готова, а не після побудови всього словника.
+    Результат ідентичний json.dump(..., indent=4) (або компактному запису).
+    """
+    def __init__(self, file, compact=False):
+        self.file = file
+        self.compact = compact
+        self._members = 0
+        self.file.write('{')
+
+    def write_member(self, key, value):
+        separator = ',' if self._members else ''
+        if self.compact:
+            self.file.write(f"{separator}{dumps_json(key, compact=True)}:{dumps_json(value, compact=True)}")
+        else:
+            # Рядки JSON не містять символів нового рядка, тож вкладений рівень отримує додатковий відступ
+            value_json = dumps_json(value).replace('\n', '\n    ')
+            self.file.write(f"{separator}\n    {json.dumps(key, ensure_ascii=False)}: {value_json}")
+        self._members += 1
+
+    def close(self):
+        self.file.write('}' if self.compact or not self._members else '\n}')
+
+def save_to_json(data, output_dir_path, file_name, compact=False):
+    """
+    Зберігає дані у файл JSON з вказаним іменем у вказаній вихідній директорії (атомарно).
+    :param compact: Компактний JSON без відступів (швидший серіалізатор orjson, якщо встановлений).
+    """
     output_file_path = os.path.join(output_dir_path, file_name)
     try:
-        # Перевіряємо та створюємо папку output, якщо її немає
-        if not os.path.exists(output_dir_path):
-             os.makedirs(output_dir_path)
-             
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        with AtomicFileWriter(output_file_path) as f:
+            f.write(dumps_json(data, compact=compact))
         logging.info(f"Дані збережено у файл JSON: {output_file_path}")
         return True
     except Exception as e:
@@ -140,44 +247,13 @@ def save_to_json(data, output_dir_path, file_name):
         return False
 
 def save_to_txt(data_string, output_dir_path, file_name):
-    """Зберігає рядок даних у файл TXT з вказаним іменем у вказаній вихідній директорії."""
+    """Зберігає рядок даних у файл TXT з вказаним іменем у вказаній вихідній директорії (атомарно)."""
     output_file_path = os.path.join(output_dir_path, file_name)
     try:
-        # Перевіряємо та створюємо папку output, якщо її немає
-        if not os.path.exists(output_dir_path):
-             os.makedirs(output_dir_path)
-             
-        with open(output_file_path, 'w', encoding='utf-8') as f:
+        with AtomicFileWriter(output_file_path) as f:
             f.write(data_string)
         logging.info(f"Дані збережено у файл TXT: {output_file_path}")
         return True
     except Exception as e:
         logging.error(f"Помилка при збереженні у файл TXT ({output_file_path}): {e}")
         return False
-
-def save_balance_history(total_balance_usd, history_file_path):
-    """
-    Додає запис про поточний загальний баланс у CSV файл.
-    Створює файл з заголовками, якщо він не існує.
-    """
-    # Перевіряємо, чи існує папка, і створюємо її, якщо ні
-    output_dir = os.path.dirname(history_file_path)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    file_exists = os.path.exists(history_file_path)
-    try:
-        with open(history_file_path, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            # Якщо файл новий, записуємо заголовки
-            if not file_exists:
-                writer.writerow(['timestamp', 'total_balance_usd'])
-            
-            # Записуємо нові дані
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            writer.writerow([timestamp, f"{total_balance_usd:.2f}"]) # Зберігаємо з 2 знаками після коми
-        logging.info(f"Історію балансу оновлено. Файл: {history_file_path}")
-        return True
-    except Exception as e:
-        logging.error(f"Помилка при збереженні історії балансу у файл ({history_file_path}): {e}")
-        return False
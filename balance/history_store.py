@@ -0,0 +1,221 @@
+# balance/history_store.py
+import csv
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+# Гаманці в записах історії; 'total' - загальний баланс усіх гаманців
+WALLETS = ('total', 'spot', 'earn', 'futures', 'coin_m_futures')
+WALLET_CODES = {name: code for code, name in enumerate(WALLETS)}
+
+# Формат запису історії (41 байт, little-endian). asset порожній для підсумкових рядків гаманців.
+HISTORY_DTYPE = np.dtype([
+    ('timestamp', '<f8'),   # Unix-час (UTC), секунди
+    ('wallet', 'u1'),       # Код гаманця з WALLET_CODES
+    ('asset', 'S16'),       # Тікер активу (ASCII)
+    ('amount', '<f8'),      # Кількість активу (NaN для підсумкових рядків)
+    ('value_usd', '<f8'),   # Вартість у USD (NaN, якщо ціна невідома)
+])
+
+PARTITION_SUFFIX = '.bin'
+# Назви папки історії та файлу історії старого формату (CSV) всередині папки звітів
+HISTORY_DIR_NAME = 'history'
+LEGACY_HISTORY_FILE_NAME = 'balance_history.csv'
+
+def _partition_day(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).date()
+
+def _to_float(value):
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+def balance_rows(balances, timestamp, total_balance_usd=None):
+    """
+    Перетворює дані гаманців (формат script_runner.collect_full_balances) на записи історії:
+    підсумок по кожному гаманцю, загальний підсумок та окремий запис для кожного активу.
+    """
+    rows = []
+
+    def add(wallet, asset, amount, value_usd):
+        rows.append((timestamp, WALLET_CODES[wallet], asset.encode('ascii', 'replace')[:16], amount, value_usd))
+
+    spot_list, total_spot_usd, _ = balances.get('spot', ([], 0.0, 0.0))
+    earn_list, total_earn_usd, _ = balances.get('earn', ([], 0.0, 0.0))
+    total_futures_usd, futures_info = balances.get('futures', (0.0, None))
+    coin_m_list, total_coin_m_usd = balances.get('coin_m_futures', ([], 0.0))
+
+    for wallet, items, amount_key in (('spot', spot_list, 'Всього'), ('earn', earn_list, 'Всього'),
+                                      ('coin_m_futures', coin_m_list, 'Загалом в монеті')):
+        for item in items:
+            add(wallet, item['Актив'], _to_float(item.get(amount_key)), _to_float(item.get('Вартість (USD)')))
+    for item in (futures_info or {}).get('Активи', []):
+        add('futures', item['Актив'], _to_float(item.get('Загалом в монеті')), _to_float(item.get('Вартість (USD)')))
+
+    wallet_totals = {
+        'spot': total_spot_usd, 'earn': total_earn_usd,
+        'futures': total_futures_usd, 'coin_m_futures': total_coin_m_usd,
+    }
+    for wallet, total_usd in wallet_totals.items():
+        if wallet in balances:
+            add(wallet, '', np.nan, total_usd)
+    if total_balance_usd is None:
+        total_balance_usd = sum(total_usd for wallet, total_usd in wallet_totals.items() if wallet in balances)
+    add('total', '', np.nan, total_balance_usd)
+    return np.array(rows, dtype=HISTORY_DTYPE)
+
+class BalanceHistoryStore:
+    """
+    Історія балансу у вигляді append-only бінарного журналу, розбитого на файли по днях (UTC).
+    Кожен файл - масив записів HISTORY_DTYPE фіксованого розміру, тож дописування -
+    один write у кінець файлу, а читання діапазону часу зачіпає лише файли потрібних днів
+    і читає їх напряму в масив numpy без розбору тексту.
+    """
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+    def _partition_path(self, day):
+        return os.path.join(self.root_dir, f"{day.isoformat()}{PARTITION_SUFFIX}")
+
+    def partitions(self):
+        """Повертає відсортований список днів, для яких є записи."""
+        if not os.path.isdir(self.root_dir):
+            return []
+        days = []
+        for file_name in os.listdir(self.root_dir):
+            if not file_name.endswith(PARTITION_SUFFIX):
+                continue
+            try:
+                days.append(datetime.strptime(file_name[:-len(PARTITION_SUFFIX)], '%Y-%m-%d').date())
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def append_rows(self, rows):
+        """Дописує записи (масив HISTORY_DTYPE) у файли відповідних днів."""
+        rows = np.asarray(rows, dtype=HISTORY_DTYPE)
+        if rows.size == 0:
+            return
+        os.makedirs(self.root_dir, exist_ok=True)
+        days = np.array([_partition_day(timestamp) for timestamp in rows['timestamp']])
+        with self._lock:
+            for day in sorted(set(days)):
+                with open(self._partition_path(day), 'ab') as f:
+                    # Незавершений останній запис (аварійна зупинка під час запису) відкидається,
+                    # інакше всі наступні записи файлу були б зміщені
+                    size = f.seek(0, os.SEEK_END)
+                    complete_size = size // HISTORY_DTYPE.itemsize * HISTORY_DTYPE.itemsize
+                    if complete_size != size:
+                        f.truncate(complete_size)
+                    f.write(rows[days == day].tobytes())
+
+    def append(self, balances, timestamp=None, total_balance_usd=None):
+        """
+        Зберігає знімок балансу (по гаманцях та активах).
+        :param balances: Дані гаманців у форматі script_runner.collect_full_balances.
+        :param total_balance_usd: Загальний баланс, якщо він відрізняється від суми гаманців, опційно.
+        :return: True у разі успіху.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        try:
+            self.append_rows(balance_rows(balances, timestamp, total_balance_usd))
+        except OSError as e:
+            logging.error(f"Помилка при збереженні історії балансу ({self.root_dir}): {e}")
+            return False
+        logging.info(f"Історію балансу оновлено. Папка: {self.root_dir}")
+        return True
+
+    def append_total(self, total_balance_usd, timestamp=None):
+        """Зберігає лише загальний баланс (наприклад, зведений баланс портфеля кількох акаунтів)."""
+        return self.append({}, timestamp, total_balance_usd=total_balance_usd)
+
+    def _read_partition(self, day):
+        path = self._partition_path(day)
+        # Незавершений останній запис (наприклад, після аварійної зупинки) ігнорується
+        count = os.path.getsize(path) // HISTORY_DTYPE.itemsize
+        return np.fromfile(path, dtype=HISTORY_DTYPE, count=count)
+
+    def read(self, start=None, end=None, wallet=None, asset=None):
+        """
+        Читає записи за діапазон часу [start, end).
+        :param start: Початок діапазону (datetime або Unix-час), None - з початку історії.
+        :param end: Кінець діапазону (datetime або Unix-час), None - до кінця історії.
+        :param wallet: Назва гаманця з WALLETS для фільтрації, опційно.
+        :param asset: Тікер активу для фільтрації ('' - лише підсумкові рядки), опційно.
+        :return: Масив numpy з dtype HISTORY_DTYPE.
+        """
+        start_ts = start.timestamp() if isinstance(start, datetime) else start
+        end_ts = end.timestamp() if isinstance(end, datetime) else end
+        first_day = _partition_day(start_ts) if start_ts is not None else None
+        last_day = _partition_day(end_ts) if end_ts is not None else None
+
+        chunks = [
+            self._read_partition(day) for day in self.partitions()
+            if (first_day is None or day >= first_day) and (last_day is None or day <= last_day)
+        ]
+        if not chunks:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+        rows = np.concatenate(chunks)
+
+        mask = np.ones(len(rows), dtype=bool)
+        if start_ts is not None:
+            mask &= rows['timestamp'] >= start_ts
+        if end_ts is not None:
+            mask &= rows['timestamp'] < end_ts
+        if wallet is not None:
+            mask &= rows['wallet'] == WALLET_CODES[wallet]
+        if asset is not None:
+            mask &= rows['asset'] == asset.encode('ascii', 'replace')
+        return rows[mask]
+
+    def read_frame(self, start=None, end=None, wallet=None, asset=None):
+        """Те саме, що read, але як pandas DataFrame з датою, назвою гаманця та тікером."""
+        import pandas as pd
+
+        rows = self.read(start, end, wallet, asset)
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(rows['timestamp'], unit='s'),
+            'wallet': np.array(WALLETS, dtype=object)[rows['wallet']],
+            'asset': np.char.decode(rows['asset'], 'ascii'),
+            'amount': rows['amount'],
+            'value_usd': rows['value_usd'],
+        })
+
+    def total_series(self, start=None, end=None):
+        """Повертає (масив datetime64, масив загального балансу в USD) для побудови графіків."""
+        rows = self.read(start, end, wallet='total', asset='')
+        return rows['timestamp'].astype('datetime64[s]'), rows['value_usd']
+
+    def import_csv(self, csv_path):
+        """
+        Імпортує історію загального балансу зі старого формату balance_history.csv
+        (колонки timestamp, total_balance_usd; час - локальний).
+        :return: Кількість імпортованих записів.
+        """
+        rows = []
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for record in csv.DictReader(f):
+                try:
+                    timestamp = datetime.strptime(record['timestamp'], '%Y-%m-%d %H:%M:%S').timestamp()
+                    rows.append((timestamp, WALLET_CODES['total'], b'', np.nan, float(record['total_balance_usd'])))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        self.append_rows(np.array(rows, dtype=HISTORY_DTYPE))
+        logging.info(f"Імпортовано {len(rows)} записів історії з {csv_path}")
+        return len(rows)
+
+def open_history_store(output_dir, dir_name=HISTORY_DIR_NAME, legacy_file_name=LEGACY_HISTORY_FILE_NAME):
+    """
+    Відкриває сховище історії в папці звітів. Якщо сховище ще порожнє, а поруч є
+    історія старого формату (CSV), вона одноразово імпортується.
+    """
+    store = BalanceHistoryStore(os.path.join(output_dir, dir_name))
+    legacy_path = os.path.join(output_dir, legacy_file_name)
+    if not store.partitions() and os.path.exists(legacy_path):
+        try:
+            store.import_csv(legacy_path)
+        except (OSError, csv.Error) as e:
+            logging.warning(f"Не вдалося імпортувати історію балансу з {legacy_path}: {e}")
+    return store
@@ -3,6 +3,7 @@ import logging
 import argparse 
 from . import config
 from . import script_runner 
+from .settings import resolve_dust_threshold
 
 def main():
     parser = argparse.ArgumentParser(description="Отримання звітів про баланс Binance.")
@@ -35,8 +36,14 @@ def main():
     parser.add_argument(
         '--dust-threshold',
         type=float,
-        default=0.01, 
-        help="Поріг для фільтрації 'пилу' в USD (для Spot та Earn). (За замовчуванням: 0.01)"
+        default=None,
+        help="Поріг для фільтрації 'пилу' в USD (для Spot та Earn). (За замовчуванням: report.dust_threshold з налаштувань)"
+    )
+
+    parser.add_argument(
+        '--sequential',
+        action='store_true',
+        help="Отримувати гаманці повного звіту послідовно, без паралельних запитів."
     )
 
     args = parser.parse_args()
@@ -58,20 +65,20 @@ def main():
 
     logging.info(f"Розпочато виконання головного модуля balance.main з аргументами: {args}")
     logging.info(f"Файл логу для цього запуску буде мати суфікс: {final_log_suffix}")
-    logging.info(f"Поріг для фільтрації 'пилу' встановлено на: {args.dust_threshold:.2f} USD")
+    dust_threshold = resolve_dust_threshold(args.dust_threshold)
+    logging.info(f"Поріг для фільтрації 'пилу' встановлено на: {dust_threshold:.2f} USD")
 
     run_spot = args.spot
     run_usdtm_futures = args.usdtm # Оновлено
     run_coinm_futures = args.coinm # Додано
     run_earn = args.earn
     run_full = args.full
-    dust_threshold = args.dust_threshold
 
     is_any_specific_report_requested = run_spot or run_usdtm_futures or run_coinm_futures or run_earn
     
     if run_full or not is_any_specific_report_requested:
         logging.info("Запускається генерація повного звіту про баланс.")
-        script_runner.run_balance_script("full", "balance.main (модуль, повний звіт)", dust_threshold=dust_threshold)
+        script_runner.run_balance_script("full", "balance.main (модуль, повний звіт)", dust_threshold=dust_threshold, concurrent=not args.sequential)
     else:
         if run_spot:
             logging.info("Запускається генерація звіту про спотовий баланс.")
@@ -0,0 +1,200 @@
+# balance/metrics.py
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Префікс назв метрик у форматі Prometheus
+PROMETHEUS_PREFIX = 'binance_balance_'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Назва файлу записів метрик запусків (JSON lines) всередині папки звітів
+METRICS_FILE_NAME = 'metrics.jsonl'
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(label_key):
+    if not label_key:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in label_key)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(label_key, escaped)) + '}'
+
+class MetricsRegistry:
+    """
+    Лічильники та таймери гарячих шляхів (виклики API, повтори, пошук цін, збір гаманців, звіти).
+    Значення накопичуються за весь час роботи процесу (як очікує Prometheus), а запис для окремого
+    запуску - це різниця між станом до та після запуску (record_run).
+    Безпечний для використання з кількох потоків; накладні витрати - один замок на вимір.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (назва, мітки) -> значення
+        self._counters = {}
+        # (назва, мітки) -> [кількість вимірів, сума секунд]
+        self._timers = {}
+
+    def increment(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                self._timers[key] = [1, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Вимірює час виконання блоку (враховується і тоді, коли блок завершився винятком)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """Декоратор: вимірює час кожного виклику функції."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Копія поточного стану: ({(назва, мітки): значення}, {(назва, мітки): (кількість, сума)})."""
+        with self._lock:
+            return dict(self._counters), {key: tuple(timer) for key, timer in self._timers.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def to_records(self, since=None):
+        """
+        Стан (або різниця від знімка since) у вигляді словників для JSON.
+        :return: (лічильники, таймери) - списки з 'name', 'labels' та значеннями.
+        """
+        counters, timers = self.snapshot()
+        previous_counters, previous_timers = since or ({}, {})
+        counter_records = []
+        for (name, label_key), value in sorted(counters.items()):
+            delta = value - previous_counters.get((name, label_key), 0)
+            if delta:
+                counter_records.append({'name': name, 'labels': dict(label_key), 'value': delta})
+        timer_records = []
+        for (name, label_key), (count, total) in sorted(timers.items()):
+            previous_count, previous_total = previous_timers.get((name, label_key), (0, 0.0))
+            if count > previous_count:
+                timer_records.append({'name': name, 'labels': dict(label_key), 'count': count - previous_count,
+                                      'total_seconds': round(total - previous_total, 6)})
+        return counter_records, timer_records
+
+    def to_prometheus(self):
+        """Текстовий формат експозиції Prometheus: лічильники як counter, таймери як summary (_count/_sum)."""
+        counters, timers = self.snapshot()
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            metric = PROMETHEUS_PREFIX + name
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, label_key), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{_format_labels(label_key)} {value}")
+        for name in sorted({name for name, _ in timers}):
+            metric = PROMETHEUS_PREFIX + name
+            lines.append(f"# TYPE {metric} summary")
+            for (timer_name, label_key), (count, total) in sorted(timers.items()):
+                if timer_name == name:
+                    labels = _format_labels(label_key)
+                    lines.append(f"{metric}_count{labels} {count}")
+                    lines.append(f"{metric}_sum{labels} {total:.6f}")
+        return '\n'.join(lines) + '\n'
+
+# Спільний для процесу реєстр метрик
+METRICS = MetricsRegistry()
+
+def append_jsonl(record, file_path):
+    """Дописує запис одним рядком JSON у кінець файлу. :return: True у разі успіху."""
+    try:
+        output_dir = os.path.dirname(file_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError as e:
+        logging.error(f"Не вдалося записати метрики у файл {file_path}: {e}")
+        return False
+    return True
+
+@contextmanager
+def record_run(file_path, registry=None, **run_info):
+    """
+    Записує метрики одного запуску (різниця лічильників і таймерів за час блоку) рядком JSON у file_path.
+    :param run_info: Додаткові поля запису (тип звіту, режим тощо).
+    """
+    registry = registry or METRICS
+    since = registry.snapshot()
+    started_at = datetime.now()
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        duration = time.perf_counter() - start
+        counters, timers = registry.to_records(since)
+        record = {
+            'timestamp': started_at.isoformat(),
+            **run_info,
+            'status': status,
+            'duration_seconds': round(duration, 6),
+            'counters': counters,
+            'timers': timers,
+        }
+        if append_jsonl(record, file_path):
+            logging.info(f"Метрики запуску ({duration:.2f} сек.) записано у {file_path}")
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Метрики: {self.address_string()} {format % args}")
+
+def serve_prometheus(port, host='127.0.0.1', registry=None):
+    """
+    Запускає локальний HTTP сервер метрик (GET /metrics) у фоновому потоці.
+    :return: Сервер (зупинка - server.shutdown()) або None, якщо порт зайнятий.
+    """
+    handler = type('PrometheusHandler', (_PrometheusHandler,), {'registry': registry or METRICS})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logging.error(f"Не вдалося запустити сервер метрик на {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logging.info(f"Метрики Prometheus доступні на http://{host}:{server.server_address[1]}/metrics")
+    return server
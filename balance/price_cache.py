@@ -0,0 +1,179 @@
+# balance/price_cache.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from .metrics import METRICS
+
+# Час життя записів кешу цін за замовчуванням (секунди)
+DEFAULT_PRICE_TTL = 300
+# Час життя "негативних" записів (ціну не вдалося визначити) - коротший, щоб швидше повторити пошук
+DEFAULT_NEGATIVE_PRICE_TTL = 60
+# Максимальна кількість записів у кеші; найстаріші записи видаляються першими
+DEFAULT_MAX_ENTRIES = 5000
+
+class PersistentPriceCache:
+    """
+    Постійний кеш цін активів у USD на основі SQLite.
+    Дозволяє запускам за розкладом (cron) стартувати з "теплим" кешем замість повторного
+    пошуку цін усіх активів. Кожен запис має власний час життя; записи про невдалий пошук
+    ціни (0.0) зберігаються з коротшим часом життя. Розмір кешу обмежений.
+    Безпечний для використання з кількох потоків.
+    """
+    def __init__(self, db_path, ttl=DEFAULT_PRICE_TTL, negative_ttl=DEFAULT_NEGATIVE_PRICE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            "symbol TEXT PRIMARY KEY, price REAL NOT NULL, "
+            "expires_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+        self.evict()
+
+    def get(self, symbol):
+        """
+        Повертає збережену ціну символу, якщо запис ще не застарів.
+        :return: Ціна (0.0 для негативного запису) або None, якщо запису немає чи він застарів.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT price, expires_at FROM prices WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    def set(self, symbol, price):
+        """Зберігає ціну символу. Ціни <= 0 зберігаються як негативні записи з коротшим TTL."""
+        self.set_many({symbol: price})
+
+    def set_many(self, prices):
+        """Зберігає кілька цін однією транзакцією."""
+        if not prices:
+            return
+        now = time.time()
+        rows = [
+            (symbol, price, now + (self.ttl if price > 0 else self.negative_ttl), now)
+            for symbol, price in prices.items()
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO prices (symbol, price, expires_at, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._connection.commit()
+
+    def evict(self):
+        """Видаляє застарілі записи та найстаріші записи понад max_entries."""
+        with self._lock:
+            self._connection.execute("DELETE FROM prices WHERE expires_at <= ?", (time.time(),))
+            self._connection.execute(
+                "DELETE FROM prices WHERE symbol NOT IN "
+                "(SELECT symbol FROM prices ORDER BY updated_at DESC LIMIT ?)", (self.max_entries,)
+            )
+            self._connection.commit()
+
+    def close(self):
+        try:
+            self.evict()
+        except sqlite3.Error as e:
+            logging.warning(f"Не вдалося очистити кеш цін ({self.db_path}): {e}")
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def open_price_cache(db_path, **kwargs):
+    """
+    Відкриває постійний кеш цін. У разі помилки SQLite повертає None,
+    і ціни шукаються без постійного кешу.
+    """
+    try:
+        return PersistentPriceCache(db_path, **kwargs)
+    except sqlite3.Error as e:
+        logging.warning(f"Не вдалося відкрити кеш цін ({db_path}), продовжуємо без нього: {e}")
+        return None
+
+class CachedPriceLookupMixin:
+    """
+    Спільна логіка кешування цін для BinanceAccount та AsyncBinanceAccount:
+    кеш у пам'яті (price_cache), негативні записи з обмеженим часом життя
+    та опційний постійний кеш (PersistentPriceCache) між запусками.
+    Ціни в пам'яті живуть стільки ж, скільки в постійному кеші, тож довготривалий акаунт
+    (демон, пакетний режим) не віддає назавжди першу знайдену ціну.
+    """
+    def _init_price_cache(self, persistent_price_cache=None, negative_ttl=DEFAULT_NEGATIVE_PRICE_TTL,
+                          price_ttl=DEFAULT_PRICE_TTL):
+        self.price_cache = {}
+        self.persistent_price_cache = persistent_price_cache
+        self._price_ttl = persistent_price_cache.ttl if persistent_price_cache else price_ttl
+        self._negative_price_ttl = persistent_price_cache.negative_ttl if persistent_price_cache else negative_ttl
+        # Символ -> момент (time.monotonic), до якого ціна з price_cache вважається свіжою
+        self._price_expires_at = {}
+        # Символ -> момент (time.monotonic), до якого невдалий пошук ціни не повторюється
+        self._negative_price_cache = {}
+        self._price_lock = threading.Lock()
+
+    def _lookup_cached_price(self, symbol):
+        """Повертає ціну з кешу (0.0 для свіжого негативного запису) або None, якщо її треба шукати."""
+        with self._price_lock:
+            if symbol in self.price_cache:
+                if self._price_expires_at.get(symbol, 0.0) > time.monotonic():
+                    METRICS.increment('price_cache_hits_total', source='memory')
+                    return self.price_cache[symbol]
+                del self.price_cache[symbol]
+                self._price_expires_at.pop(symbol, None)
+            negative_expires_at = self._negative_price_cache.get(symbol)
+            if negative_expires_at is not None:
+                if negative_expires_at > time.monotonic():
+                    METRICS.increment('price_cache_hits_total', source='negative')
+                    return 0.0
+                del self._negative_price_cache[symbol]
+
+        price = None if self.persistent_price_cache is None else self.persistent_price_cache.get(symbol)
+        if price is None:
+            METRICS.increment('price_cache_misses_total')
+            return None
+        METRICS.increment('price_cache_hits_total', source='persistent')
+        logging.debug(f"Ціну для {symbol} взято з постійного кешу: {price}")
+        self._store_price(symbol, price, persist=False)
+        return price
+
+    def _store_price(self, symbol, price, persist=True):
+        """Зберігає ціну в кеші; невдалий пошук (0.0) зберігається лише на час negative TTL."""
+        with self._price_lock:
+            if price > 0:
+                self.price_cache[symbol] = price
+                self._price_expires_at[symbol] = time.monotonic() + self._price_ttl
+            else:
+                self._negative_price_cache[symbol] = time.monotonic() + self._negative_price_ttl
+        if persist and self.persistent_price_cache is not None:
+            try:
+                self.persistent_price_cache.set(symbol, price)
+            except sqlite3.Error as e:
+                logging.warning(f"Не вдалося зберегти ціну {symbol} у постійний кеш: {e}")
+        return price
+
+    def clear_price_cache(self):
+        """Очищає ціни в пам'яті (постійний кеш не змінюється), наприклад після оновлення знімка цін."""
+        with self._price_lock:
+            self.price_cache.clear()
+            self._price_expires_at.clear()
+            self._negative_price_cache.clear()
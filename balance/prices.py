@@ -0,0 +1,169 @@
+# balance/prices.py
+import logging
+import time
+
+# Активи, вартість яких вважається рівною 1 USD
+USD_STABLECOINS = ['USDT', 'BUSD', 'USDC', 'TUSD', 'DAI', 'USD']
+# Стейблкоїни, через пари з якими шукається пряма ціна активу (у порядку пріоритету)
+STABLECOIN_QUOTES = ['USDT', 'BUSD', 'USDC', 'TUSD']
+# Активи для непрямої конвертації, якщо прямої пари зі стейблкоїном немає
+CONVERSION_ASSETS = ['BTC', 'BNB']
+# Пріоритет проміжних активів при виборі маршруту конвертації (наближення до ліквідності ринку):
+# серед маршрутів однакової довжини обирається той, що веде через актив, вищий у списку
+QUOTE_PRIORITY = ['USDT', 'USDC', 'BUSD', 'TUSD', 'DAI', 'USD', 'FDUSD', 'BTC', 'ETH', 'BNB', 'EUR', 'TRY']
+
+
+class ConversionGraph:
+    """
+    Граф конвертації активів, побудований з торгових пар біржі.
+    Кожна пара base/quote дає ребро в обидва боки. Для кожного активу заздалегідь
+    обчислюється маршрут до USD з найменшою кількістю кроків (пошук у ширину від стейблкоїнів),
+    а серед рівних маршрутів - через найліквідніший проміжний актив згідно з QUOTE_PRIORITY.
+    """
+    def __init__(self, symbols: dict, prices: dict, anchors=None):
+        """
+        :param symbols: Словник {символ пари: (базовий актив, котирувальний актив)}.
+        :param prices: Словник {символ пари: ціна}.
+        :param anchors: Активи з фіксованою ціною 1 USD (за замовчуванням USD_STABLECOINS).
+        """
+        self.anchors = list(anchors) if anchors is not None else list(USD_STABLECOINS)
+        # Суміжність: актив -> список (сусідній актив, символ пари, чи треба інвертувати ціну)
+        self.edges = {}
+        for symbol, (base, quote) in symbols.items():
+            price = prices.get(symbol)
+            if price is None or price <= 0:
+                continue
+            self.edges.setdefault(base, []).append((quote, symbol, False))
+            self.edges.setdefault(quote, []).append((base, symbol, True))
+        # Маршрут: актив -> (наступний актив ближче до USD, символ пари, інверсія)
+        self.routes = self._build_routes()
+
+    @staticmethod
+    def _priority(asset):
+        try:
+            return QUOTE_PRIORITY.index(asset)
+        except ValueError:
+            return len(QUOTE_PRIORITY)
+
+    def _build_routes(self):
+        routes = {}
+        visited = set(self.anchors)
+        frontier = sorted(self.anchors, key=self._priority)
+        while frontier:
+            # Кандидати наступного рівня: актив -> (ранг, наступний крок маршруту)
+            candidates = {}
+            for parent in frontier:
+                parent_rank = self._priority(parent)
+                for neighbor, symbol, invert in self.edges.get(parent, []):
+                    if neighbor in visited:
+                        continue
+                    # Ребро parent -> neighbor інвертоване, тож для neighbor -> parent інверсія протилежна
+                    rank = (parent_rank, not invert)
+                    current = candidates.get(neighbor)
+                    if current is None or rank < current[0]:
+                        candidates[neighbor] = (rank, (parent, symbol, not invert))
+            for asset, (_, route) in candidates.items():
+                routes[asset] = route
+            visited.update(candidates)
+            frontier = sorted(candidates, key=self._priority)
+        return routes
+
+    def get_route(self, asset):
+        """Повертає повний маршрут активу до USD як список символів пар."""
+        path = []
+        while asset in self.routes:
+            asset, symbol, _ = self.routes[asset]
+            path.append(symbol)
+        return path
+
+    def price_all(self, prices: dict) -> dict:
+        """
+        Оцінює всі досяжні активи в USD за один прохід за маршрутами.
+        Маршрути впорядковані від стейблкоїнів, тож ціна наступного кроку вже відома.
+        """
+        usd_prices = {anchor: 1.0 for anchor in self.anchors}
+        for asset, (parent, symbol, invert) in self.routes.items():
+            pair_price = prices[symbol]
+            price_in_parent = 1.0 / pair_price if invert else pair_price
+            usd_prices[asset] = price_in_parent * usd_prices[parent]
+        return usd_prices
+
+
+class PriceSnapshot:
+    """
+    Знімок цін усіх торгових пар біржі, отриманий двома запитами:
+    get_all_tickers (ціни) та get_exchange_info (базовий/котирувальний актив пар).
+    Дозволяє оцінювати активи в USD без додаткових запитів до API: ціни всіх активів
+    розраховуються одразу за маршрутами графа конвертації.
+    """
+    def __init__(self, prices: dict, symbols: dict):
+        """
+        :param prices: Словник {символ пари: ціна}.
+        :param symbols: Словник {символ пари: (базовий актив, котирувальний актив)}.
+        """
+        self.prices = prices
+        self.symbols = symbols
+        self.created_at = time.time()
+        self.graph = ConversionGraph(symbols, prices)
+        self.usd_prices = self.graph.price_all(prices)
+
+    @classmethod
+    def from_responses(cls, tickers, exchange_info):
+        """Створює знімок із сирих відповідей get_all_tickers та get_exchange_info."""
+        prices = {}
+        if isinstance(tickers, list):
+            for ticker in tickers:
+                try:
+                    prices[ticker['symbol']] = float(ticker['price'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+        symbols = {}
+        if isinstance(exchange_info, dict) and isinstance(exchange_info.get('symbols'), list):
+            for symbol_info in exchange_info['symbols']:
+                if symbol_info.get('status', 'TRADING') != 'TRADING':
+                    continue
+                symbols[symbol_info['symbol']] = (symbol_info['baseAsset'], symbol_info['quoteAsset'])
+
+        return cls(prices, symbols)
+
+    def update_prices(self, updates: dict, revalue=True) -> int:
+        """
+        Оновлює ціни відомих пар (наприклад, з потоку !miniTicker@arr).
+        Маршрути графа конвертації не змінюються, тож ціни активів у USD
+        перераховуються одним проходом без повторного пошуку маршрутів.
+        :param updates: Словник {символ пари: нова ціна}.
+        :param revalue: Перерахувати usd_prices одразу (False - викликати revalue() пізніше).
+        :return: Кількість оновлених пар.
+        """
+        updated = 0
+        for symbol, price in updates.items():
+            if symbol in self.prices and price > 0:
+                self.prices[symbol] = price
+                updated += 1
+        if updated and revalue:
+            self.revalue()
+        return updated
+
+    def revalue(self):
+        """Перераховує ціни всіх активів у USD за поточними цінами пар."""
+        self.usd_prices = self.graph.price_all(self.prices)
+
+    def is_empty(self) -> bool:
+        """Знімок без жодної пари з відомою ціною та активами (граф конвертації порожній)."""
+        return not self.graph.edges
+
+    def resolve_usd(self, asset):
+        """
+        Оцінює ціну активу в USD лише за даними знімка.
+        Повертає None, якщо актив не має маршруту до USD.
+        """
+        if asset in USD_STABLECOINS:
+            return 1.0
+
+        price = self.usd_prices.get(asset)
+        if price is None:
+            logging.debug(f"Ціну для {asset} не знайдено у знімку цін.")
+            return None
+        logging.debug(f"Ціну для {asset} знайдено у знімку цін: {price}")
+        return price
@@ -0,0 +1,239 @@
+# balance/rate_limit.py
+import collections
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Ліміти ваги запитів за хвилину для різних API Binance (заголовок X-MBX-USED-WEIGHT-1M)
+DEFAULT_WEIGHT_LIMITS = {
+    'spot': 6000,
+    'futures': 2400,
+    'coin_m': 2400,
+}
+# Частка ліміту, після досягнення якої запити притримуються до наступної хвилини
+WEIGHT_SAFETY_RATIO = 0.9
+# Затримка за замовчуванням після відповіді 429/418 без заголовка Retry-After
+DEFAULT_RATE_LIMIT_BACKOFF = 60.0
+# Заголовки відповіді виклику API, що виконується в поточному потоці або корутині
+_CALL_RESPONSE = contextvars.ContextVar('binance_call_response', default=None)
+
+
+class CircuitOpenError(Exception):
+    """Виклик API заблоковано, оскільки запобіжник розімкнено після серії помилок."""
+
+
+def api_family(method_name):
+    """Визначає, до якого API (і відповідного ліміту ваги) належить метод клієнта."""
+    if method_name.startswith('futures_coin_'):
+        return 'coin_m'
+    if method_name.startswith('futures_'):
+        return 'futures'
+    return 'spot'
+
+
+def compute_backoff_delay(attempt, base_delay, max_delay=60.0):
+    """
+    Експоненційна затримка з випадковим відхиленням (jitter) для повторної спроби.
+    :param attempt: Номер невдалої спроби, починаючи з 1.
+    :return: Затримка в секундах у межах [d/2, d], де d = min(max_delay, base_delay * 2^(attempt-1)).
+    """
+    capped_delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+    return capped_delay / 2 + random.uniform(0, capped_delay / 2)
+
+
+def get_retry_after(error):
+    """Повертає значення заголовка Retry-After (у секундах) з відповіді помилки, якщо він є."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('Retry-After')
+    if not isinstance(value, (str, int, float)):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def is_rate_limit_error(error):
+    """Чи є помилка відповіддю про перевищення ліміту (429) або блокування IP (418)."""
+    return getattr(error, 'status_code', None) in (418, 429)
+
+
+@contextmanager
+def capture_response_headers():
+    """
+    Збирає заголовки відповідей, отриманих у межах блоку в поточному потоці або корутині.
+    Клієнт Binance зберігає лише останню відповідь (client.response), спільну для всіх
+    паралельних запитів, тож заголовки беруться з хука HTTP сесії (record_response_headers).
+    :return: Словник, у якому після блоку під ключем 'headers' - заголовки останньої відповіді.
+    """
+    captured = {}
+    token = _CALL_RESPONSE.set(captured)
+    try:
+        yield captured
+    finally:
+        _CALL_RESPONSE.reset(token)
+
+def record_response_headers(headers):
+    """Хук HTTP сесії: зберігає заголовки відповіді для виклику API, що виконується в цьому контексті."""
+    captured = _CALL_RESPONSE.get()
+    if captured is not None:
+        captured['headers'] = headers
+
+class WeightRateLimiter:
+    """
+    Обмежувач запитів за вагою, яку повертає Binance у заголовках X-MBX-USED-WEIGHT-1M.
+    Коли використана вага наближається до ліміту, запити притримуються до початку наступної
+    хвилини (вікна Binance вирівняні по хвилинах), щоб сервер не відповідав 429/418.
+    Після 429/418 усі запити чекають час, вказаний у Retry-After.
+    Один екземпляр має бути спільним для процесу, оскільки ліміти рахуються на IP.
+    """
+    def __init__(self, weight_limits=None, safety_ratio=WEIGHT_SAFETY_RATIO):
+        self.weight_limits = dict(weight_limits or DEFAULT_WEIGHT_LIMITS)
+        self.safety_ratio = safety_ratio
+        self._lock = threading.Lock()
+        # API -> (використана вага, номер хвилинного вікна)
+        self._used_weight = {}
+        self._blocked_until = 0.0
+
+    def update_from_headers(self, headers, family='spot'):
+        """Оновлює використану вагу із заголовків відповіді."""
+        if not headers:
+            return
+        value = headers.get('x-mbx-used-weight-1m')
+        if not isinstance(value, (str, int)):
+            return
+        try:
+            used_weight = int(value)
+        except ValueError:
+            return
+        with self._lock:
+            self._used_weight[family] = (used_weight, int(time.time() // 60))
+
+    def block_for(self, seconds):
+        """Забороняє всі запити на вказану кількість секунд (після 429/418)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+        logging.warning(f"Перевищено ліміт запитів Binance API. Запити призупинено на {seconds:.1f} сек.")
+
+    def wait_time(self, family='spot'):
+        """Скільки секунд потрібно зачекати перед наступним запитом до вказаного API."""
+        now = time.time()
+        with self._lock:
+            wait_seconds = max(0.0, self._blocked_until - now)
+            used_weight, window = self._used_weight.get(family, (0, None))
+            limit = self.weight_limits.get(family)
+            if limit and window == int(now // 60) and used_weight >= limit * self.safety_ratio:
+                wait_seconds = max(wait_seconds, 60 - now % 60)
+        return wait_seconds
+
+    def throttle(self, family='spot'):
+        """Блокує поточний потік, доки запит до API не стане безпечним."""
+        wait_seconds = self.wait_time(family)
+        if wait_seconds > 0:
+            logging.info(f"Використана вага запитів ({family}) близька до ліміту, очікування {wait_seconds:.2f} сек.")
+            time.sleep(wait_seconds)
+
+
+class CircuitBreaker:
+    """
+    Запобіжник для серії помилок API: після failure_threshold помилок поспіль
+    виклики відхиляються без запиту до сервера протягом reset_timeout секунд,
+    після чого дозволяється одна пробна спроба.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = None
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout:
+                raise CircuitOpenError(
+                    f"Запобіжник розімкнено після {self._consecutive_failures} помилок поспіль, "
+                    f"повтор можливий через {self.reset_timeout - elapsed:.1f} сек."
+                )
+            # Напіввідкритий стан: пропускаємо пробний запит
+            self._opened_at = None
+            self._consecutive_failures = self.failure_threshold - 1
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold and self._opened_at is None:
+                self._opened_at = time.monotonic()
+                logging.error(f"Запобіжник розімкнено: {self._consecutive_failures} помилок API поспіль.")
+
+
+class RequestBudget:
+    """
+    Глобальний бюджет запитів до Binance API, спільний для кількох акаунтів.
+    Обмежує кількість одночасних запитів та (опційно) кількість запитів за хвилину.
+    Використовується як контекстний менеджер навколо кожного виклику клієнта.
+    """
+    def __init__(self, max_in_flight=8, max_requests_per_minute=None):
+        """
+        :param max_in_flight: Максимальна кількість одночасних запитів.
+        :param max_requests_per_minute: Ліміт запитів за ковзне вікно в 60 секунд (None - без ліміту).
+        """
+        self.max_in_flight = max_in_flight
+        self.max_requests_per_minute = max_requests_per_minute
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._request_times = collections.deque()
+
+    def _wait_for_minute_window(self):
+        if not self.max_requests_per_minute:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._request_times and now - self._request_times[0] >= 60:
+                    self._request_times.popleft()
+                if len(self._request_times) < self.max_requests_per_minute:
+                    self._request_times.append(now)
+                    return
+                wait_seconds = 60 - (now - self._request_times[0])
+            logging.debug(f"Бюджет запитів вичерпано, очікування {wait_seconds:.2f} сек.")
+            time.sleep(wait_seconds)
+
+    def acquire(self):
+        self._semaphore.acquire()
+        try:
+            self._wait_for_minute_window()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self):
+        self._semaphore.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+# Спільний для процесу обмежувач (ліміти ваги Binance рахуються на IP)
+DEFAULT_RATE_LIMITER = WeightRateLimiter()
@@ -1,10 +1,73 @@
 # pro1/balance/report_generator.py
 import logging 
+import os
+import sys
 from datetime import datetime
 from . import data_processing
+from .metrics import METRICS
 
-# ... (prepare_spot_report_data, prepare_futures_report_data, prepare_earn_report_data - без змін) ...
-def prepare_spot_report_data(spot_list, total_spot_usd, total_dust_usd=0.0):
+# Гаманці повного звіту в порядку секцій TXT звіту
+FULL_REPORT_WALLETS = ('spot', 'earn', 'futures', 'coin_m_futures')
+# Порожні результати гаманців (якщо дані гаманця не отримано)
+EMPTY_WALLET_RESULTS = {
+    'spot': ([], 0.0, 0.0),
+    'earn': ([], 0.0, 0.0),
+    'futures': (0.0, None),
+    'coin_m_futures': ([], 0.0),
+}
+
+def _spot_section(spot_list, total_spot_usd, total_dust_usd, spot_table=None):
+    if spot_table is None:
+        spot_table = data_processing.format_spot_balance_table(spot_list)
+    lines = [
+        "--- Спотовий гаманець ---\n",
+        spot_table + "\n",
+        f"\nЗагальний спотовий баланс (без урахування пилу): {total_spot_usd:.2f} USD\n",
+    ]
+    if total_dust_usd > 0:
+        lines.append(f"Загальна вартість відфільтрованого 'пилу' на споті: {total_dust_usd:.2f} USD\n")
+    return ''.join(lines)
+
+def _earn_section(earn_list, total_earn_usd, total_dust_usd):
+    lines = [
+        "--- Binance Earn рахунок ---\n",
+        data_processing.format_earn_balance_table(earn_list) + "\n",
+        f"\nЗагальний Binance Earn баланс (без урахування пилу): {total_earn_usd:.2f} USD\n",
+    ]
+    if total_dust_usd > 0:
+        lines.append(f"Загальна вартість відфільтрованого 'пилу' на Earn: {total_dust_usd:.2f} USD\n")
+    return ''.join(lines)
+
+def _futures_section(futures_usdt_info, total_futures_usd):
+    lines = ["--- Ф'ючерсний гаманець (USDT-M) ---\n"]
+    if futures_usdt_info:
+        lines.append(data_processing.format_futures_assets_table(futures_usdt_info['Активи']) + "\n")
+        lines.append(f"  Баланс гаманця (USD): {futures_usdt_info['Баланс гаманця']:.8f}\n")
+        lines.append(f"  Нереалізований PNL (USD): {futures_usdt_info['Нереалізований PNL']:.8f}\n")
+        lines.append("\nВідкриті позиції:\n")
+        lines.append(data_processing.format_futures_positions_table(futures_usdt_info.get('Позиції', [])) + "\n")
+    else:
+        lines.append("Активи на ф'ючерсному гаманці USDT-M не знайдені.\n")
+    lines.append(f"\nЗагальний USDT-M ф'ючерсний баланс (оцінка в USD): {total_futures_usd:.2f} USD\n")
+    return ''.join(lines)
+
+def _coin_m_futures_section(coin_m_list, total_coin_m_usd):
+    return ''.join([
+        "--- Ф'ючерсний гаманець (COIN-M) ---\n",
+        data_processing.format_coin_m_futures_balance_table(coin_m_list) + "\n",
+        f"\nЗагальний COIN-M ф'ючерсний баланс (оцінка в USD): {total_coin_m_usd:.2f} USD\n",
+    ])
+
+def _single_wallet_report(title, current_time, section):
+    return ''.join([
+        f"{title} станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+        "="*40 + "\n\n",
+        section,
+        "="*40 + "\n",
+    ])
+
+def prepare_spot_report_data(spot_list, total_spot_usd, total_dust_usd=0.0, spot_table=None):
+    """:param spot_table: Уже відрендерена таблиця спотового балансу (щоб не форматувати її двічі), опційно."""
     current_time = datetime.now()
     report_name_suffix = "spot_account_binance_output"
     json_data = {
@@ -15,15 +78,9 @@ def prepare_spot_report_data(spot_list, total_spot_usd, total_dust_usd=0.0):
             'total_dust_estimated_usd': total_dust_usd 
         }
     }
-    spot_table_string = data_processing.format_spot_balance_table(spot_list)
-    txt_data = f"Звіт про спотовий баланс Binance станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-    txt_data += "="*40 + "\n\n"
-    txt_data += "--- Спотовий гаманець ---\n"
-    txt_data += spot_table_string + "\n"
-    txt_data += f"\nЗагальний спотовий баланс (без урахування пилу): {total_spot_usd:.2f} USD\n"
-    if total_dust_usd > 0:
-        txt_data += f"Загальна вартість відфільтрованого 'пилу' на споті: {total_dust_usd:.2f} USD\n"
-    txt_data += "="*40 + "\n"
+    txt_data = _single_wallet_report(
+        "Звіт про спотовий баланс Binance", current_time, _spot_section(spot_list, total_spot_usd, total_dust_usd, spot_table)
+    )
     return json_data, txt_data, report_name_suffix
 
 def prepare_futures_report_data(futures_usdt_info, total_futures_usd): # Це для USDT-M
@@ -33,18 +90,10 @@ def prepare_futures_report_data(futures_usdt_info, total_futures_usd): # Це д
         'timestamp': current_time.isoformat(),
         'futures_balance_usdt_m': futures_usdt_info
     }
-    txt_data = f"Звіт про ф'ючерсний баланс Binance (USDT-M) станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-    txt_data += "="*40 + "\n\n"
-    txt_data += "--- Ф'ючерсний гаманець (USDT-M) ---\n"
-    if futures_usdt_info:
-         txt_data += f"Актив: {futures_usdt_info['Актив']}\n"
-         txt_data += f"  Баланс гаманця: {futures_usdt_info['Баланс гаманця']:.8f}\n"
-         txt_data += f"  Нереалізований PNL: {futures_usdt_info['Нереалізований PNL']:.8f}\n"
-         txt_data += f"  Загальний баланс активу (в USDT): {futures_usdt_info['Загалом (USDT)']:.8f}\n"
-    else:
-         txt_data += "Інформація про актив USDT на ф'ючерсному гаманці USDT-M не знайдена.\n"
-    txt_data += f"\nЗагальний USDT-M ф'ючерсний баланс (оцінка в USD): {total_futures_usd:.2f} USD\n"
-    txt_data += "="*40 + "\n"
+    txt_data = _single_wallet_report(
+        "Звіт про ф'ючерсний баланс Binance (USDT-M)", current_time,
+        _futures_section(futures_usdt_info, total_futures_usd)
+    )
     return json_data, txt_data, report_name_suffix
 
 def prepare_earn_report_data(earn_list, total_earn_usd, total_dust_usd=0.0):
@@ -58,15 +107,9 @@ def prepare_earn_report_data(earn_list, total_earn_usd, total_dust_usd=0.0):
              'total_dust_estimated_usd': total_dust_usd 
         }
     }
-    earn_table_string = data_processing.format_earn_balance_table(earn_list)
-    txt_data = f"Звіт про Binance Earn баланс станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-    txt_data += "="*40 + "\n\n"
-    txt_data += "--- Binance Earn рахунок ---\n"
-    txt_data += earn_table_string + "\n" 
-    txt_data += f"\nЗагальний Binance Earn баланс (без урахування пилу): {total_earn_usd:.2f} USD\n"
-    if total_dust_usd > 0:
-        txt_data += f"Загальна вартість відфільтрованого 'пилу' на Earn: {total_dust_usd:.2f} USD\n"
-    txt_data += "="*40 + "\n"
+    txt_data = _single_wallet_report(
+        "Звіт про Binance Earn баланс", current_time, _earn_section(earn_list, total_earn_usd, total_dust_usd)
+    )
     return json_data, txt_data, report_name_suffix
 
 def prepare_coin_m_futures_report_data(coin_m_list, total_coin_m_usd):
@@ -81,18 +124,47 @@ def prepare_coin_m_futures_report_data(coin_m_list, total_coin_m_usd):
             'assets': coin_m_list
         }
     }
+    txt_data = _single_wallet_report(
+        "Звіт про ф'ючерсний баланс Binance (COIN-M)", current_time,
+        _coin_m_futures_section(coin_m_list, total_coin_m_usd)
+    )
+    return json_data, txt_data, report_name_suffix
 
-    coin_m_table_string = data_processing.format_coin_m_futures_balance_table(coin_m_list)
 
-    txt_data = f"Звіт про ф'ючерсний баланс Binance (COIN-M) станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-    txt_data += "="*40 + "\n\n"
-    txt_data += "--- Ф'ючерсний гаманець (COIN-M) ---\n"
-    txt_data += coin_m_table_string + "\n" 
-    txt_data += f"\nЗагальний COIN-M ф'ючерсний баланс (оцінка в USD): {total_coin_m_usd:.2f} USD\n"
-    txt_data += "="*40 + "\n"
-    
-    return json_data, txt_data, report_name_suffix
+def _full_report_header(current_time):
+    return f"Звіт про баланс Binance станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n" + "="*80 + "\n\n"
+
+def _full_report_wallet_section(wallet, result):
+    """
+    Секція одного гаманця повного звіту.
+    :return: (ключ JSON, значення JSON, текст секції TXT, вартість у USD, вартість 'пилу' в USD).
+    """
+    if wallet == 'spot':
+        spot_list, total_usd, dust_usd = result
+        json_value = {'total_estimated_usd': total_usd, 'assets': spot_list, 'total_dust_estimated_usd': dust_usd}
+        return 'spot_balance', json_value, _spot_section(spot_list, total_usd, dust_usd) + "\n\n", total_usd, dust_usd
+    if wallet == 'earn':
+        earn_list, total_usd, dust_usd = result
+        json_value = {'total_estimated_usd': total_usd, 'assets': earn_list, 'total_dust_estimated_usd': dust_usd}
+        return 'earn_balance', json_value, _earn_section(earn_list, total_usd, dust_usd) + "\n\n", total_usd, dust_usd
+    if wallet == 'futures':
+        total_usd, usdt_m_futures_info = result
+        # Зберігаємо інформацію про USDT як єдиний актив
+        return 'futures_balance_usdt_m', usdt_m_futures_info, \
+            _futures_section(usdt_m_futures_info, total_usd) + "\n", total_usd, 0.0
+    coin_m_list, total_usd = result
+    json_value = {'total_estimated_usd': total_usd, 'assets': coin_m_list}
+    return 'futures_balance_coin_m', json_value, _coin_m_futures_section(coin_m_list, total_usd) + "\n", total_usd, 0.0
 
+def _full_report_footer(total_estimated_balance_usd, total_overall_dust_usd):
+    lines = [
+        "="*80 + "\n",
+        f"ЗАГАЛЬНИЙ БАЛАНС (Спот + Earn + USDT-M + COIN-M, без урахування пилу): {total_estimated_balance_usd:.2f} USD\n",
+    ]
+    if total_overall_dust_usd > 0:
+        lines.append(f"Загальна вартість відфільтрованого 'пилу' (спот + Earn): {total_overall_dust_usd:.2f} USD\n")
+    lines.append("="*80 + "\n")
+    return ''.join(lines)
 
 def prepare_full_report_data(
     spot_list, total_spot_usd, total_spot_dust_usd,
@@ -103,81 +175,189 @@ def prepare_full_report_data(
     """Готує дані для повного звіту (JSON та TXT), включаючи всі типи балансів."""
     current_time = datetime.now()
     report_name_suffix = "balance_output" 
+    wallet_results = {
+        'spot': (spot_list, total_spot_usd, total_spot_dust_usd),
+        'earn': (earn_list, total_earn_usd, total_earn_dust_usd),
+        'futures': (total_usdt_m_futures_usd, usdt_m_futures_info),
+        'coin_m_futures': (coin_m_futures_list, total_coin_m_futures_usd),
+    }
 
-    total_estimated_balance_usd = (
-        total_spot_usd + 
-        total_earn_usd + 
-        total_usdt_m_futures_usd +
-        total_coin_m_futures_usd
-    )
-    total_overall_dust_usd = total_spot_dust_usd + total_earn_dust_usd
+    json_data = {'timestamp': current_time.isoformat()}
+    txt_parts = [_full_report_header(current_time)]
+    total_estimated_balance_usd = 0.0
+    total_overall_dust_usd = 0.0
+    for wallet in FULL_REPORT_WALLETS:
+        json_key, json_value, txt_section, total_usd, dust_usd = \
+            _full_report_wallet_section(wallet, wallet_results[wallet])
+        json_data[json_key] = json_value
+        txt_parts.append(txt_section)
+        total_estimated_balance_usd += total_usd
+        total_overall_dust_usd += dust_usd
+
+    json_data['total_balance_estimated_usd'] = total_estimated_balance_usd
+    json_data['total_dust_across_accounts_usd'] = total_overall_dust_usd
+    txt_parts.append(_full_report_footer(total_estimated_balance_usd, total_overall_dust_usd))
+    return json_data, ''.join(txt_parts), report_name_suffix
+
+class FullReportStream:
+    """
+    Потоковий запис повного звіту (balance_output.json / .txt).
+    Секція кожного гаманця записується у файли, щойно готові вона та всі попередні секції
+    (порядок секцій у TXT незмінний), тож у пам'яті не збирається весь звіт.
+    Обидва файли записуються атомарно (тимчасовий файл + перейменування): читачі бачать або старий,
+    або повністю записаний звіт. Якщо отримання гаманців завершилося помилкою, старі файли лишаються.
+    Використовується як контекстний менеджер; add_wallet можна передавати як on_wallet
+    у script_runner.collect_full_balances.
+    """
+    report_name_suffix = "balance_output"
+
+    def __init__(self, output_dir, compact_json=False):
+        self.output_dir = output_dir
+        self.compact_json = compact_json
+        self.total_balance_usd = 0.0
+        self.total_dust_usd = 0.0
+        self._pending = {}
+        self._next_wallet = 0
+
+    def __enter__(self):
+        current_time = datetime.now()
+        self._txt_sink = data_processing.AtomicFileWriter(os.path.join(self.output_dir, f'{self.report_name_suffix}.txt'))
+        self._json_sink = data_processing.AtomicFileWriter(os.path.join(self.output_dir, f'{self.report_name_suffix}.json'))
+        self._txt_file = self._txt_sink.__enter__()
+        try:
+            self._json_writer = data_processing.JsonObjectStreamWriter(self._json_sink.__enter__(), self.compact_json)
+        except BaseException as e:
+            self._txt_sink.__exit__(type(e), e, e.__traceback__)
+            raise
+        self._txt_file.write(_full_report_header(current_time))
+        self._json_writer.write_member('timestamp', current_time.isoformat())
+        return self
+
+    def add_wallet(self, wallet, result):
+        """Приймає результат гаманця (у будь-якому порядку) і записує всі секції, що вже можуть йти по черзі."""
+        self._pending[wallet] = result
+        while self._next_wallet < len(FULL_REPORT_WALLETS) and FULL_REPORT_WALLETS[self._next_wallet] in self._pending:
+            wallet_name = FULL_REPORT_WALLETS[self._next_wallet]
+            with METRICS.timer('report_section_seconds', wallet=wallet_name):
+                json_key, json_value, txt_section, total_usd, dust_usd = \
+                    _full_report_wallet_section(wallet_name, self._pending.pop(wallet_name))
+            self._json_writer.write_member(json_key, json_value)
+            self._txt_file.write(txt_section)
+            self._txt_file.flush()
+            self.total_balance_usd += total_usd
+            self.total_dust_usd += dust_usd
+            self._next_wallet += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                try:
+                    # Гаманці, дані яких не надійшли, записуються як порожні
+                    for wallet in FULL_REPORT_WALLETS[self._next_wallet:]:
+                        if wallet not in self._pending:
+                            self.add_wallet(wallet, EMPTY_WALLET_RESULTS[wallet])
+                    self._json_writer.write_member('total_balance_estimated_usd', self.total_balance_usd)
+                    self._json_writer.write_member('total_dust_across_accounts_usd', self.total_dust_usd)
+                    self._json_writer.close()
+                    self._txt_file.write(_full_report_footer(self.total_balance_usd, self.total_dust_usd))
+                except BaseException:
+                    # Незавершений звіт не замінює попередній: тимчасові файли відкидаються
+                    exc_type, exc, tb = sys.exc_info()
+                    raise
+        finally:
+            # TXT файл закривається на будь-якому шляху: якщо збереження JSON не вдалося, відкидається і він
+            try:
+                self._json_sink.__exit__(exc_type, exc, tb)
+            except BaseException:
+                exc_type, exc, tb = sys.exc_info()
+                raise
+            finally:
+                self._txt_sink.__exit__(exc_type, exc, tb)
+        if exc_type is None:
+            logging.info(f"Повний звіт збережено: {os.path.join(self.output_dir, self.report_name_suffix)}.json / .txt")
+        return False
+
+
+def _accumulate_asset(assets_totals, asset, amount, value_usd):
+    totals = assets_totals.setdefault(asset, {'Актив': asset, 'Всього': 0.0, 'Вартість (USD)': 0.0})
+    totals['Всього'] += amount
+    if isinstance(value_usd, (int, float)):
+        totals['Вартість (USD)'] += value_usd
+
+def prepare_portfolio_report_data(account_balances, failed_accounts=None):
+    """
+    Готує зведений звіт по портфелю з кількох акаунтів (JSON та TXT).
+    :param account_balances: Словник {назва акаунту: дані гаманців}, де дані гаманців мають ключі
+                             'spot', 'earn', 'futures', 'coin_m_futures' (як у повному звіті).
+    :param failed_accounts: Список назв акаунтів, дані яких отримати не вдалося.
+    """
+    current_time = datetime.now()
+    report_name_suffix = "portfolio_output"
+    failed_accounts = failed_accounts or []
+
+    accounts_rows = []
+    assets_totals = {}
+    total_portfolio_usd = 0.0
+    total_portfolio_dust_usd = 0.0
+
+    for account_name, balances in account_balances.items():
+        spot_list, total_spot_usd, total_spot_dust_usd = balances.get('spot', ([], 0.0, 0.0))
+        earn_list, total_earn_usd, total_earn_dust_usd = balances.get('earn', ([], 0.0, 0.0))
+        total_usdt_m_usd, usdt_m_info = balances.get('futures', (0.0, None))
+        coin_m_list, total_coin_m_usd = balances.get('coin_m_futures', ([], 0.0))
+
+        account_total_usd = total_spot_usd + total_earn_usd + total_usdt_m_usd + total_coin_m_usd
+        total_portfolio_usd += account_total_usd
+        total_portfolio_dust_usd += total_spot_dust_usd + total_earn_dust_usd
+        accounts_rows.append({
+            'Акаунт': account_name,
+            'Спот (USD)': total_spot_usd,
+            'Earn (USD)': total_earn_usd,
+            'USDT-M (USD)': total_usdt_m_usd,
+            'COIN-M (USD)': total_coin_m_usd,
+            'Всього (USD)': account_total_usd,
+        })
+
+        for item in spot_list:
+            _accumulate_asset(assets_totals, item['Актив'], item['Всього'], item['Вартість (USD)'])
+        for item in earn_list:
+            _accumulate_asset(assets_totals, item['Актив'], item['Всього'], item['Вартість (USD)'])
+        for item in (usdt_m_info or {}).get('Активи', []):
+            _accumulate_asset(assets_totals, item['Актив'], item['Загалом в монеті'], item['Вартість (USD)'])
+        for item in coin_m_list:
+            _accumulate_asset(assets_totals, item['Актив'], item['Загалом в монеті'], item['Вартість (USD)'])
+
+    assets_rows = sorted(assets_totals.values(), key=lambda row: row['Вартість (USD)'], reverse=True)
 
     json_data = {
         'timestamp': current_time.isoformat(),
-        'spot_balance': {
-            'total_estimated_usd': total_spot_usd,
-            'assets': spot_list,
-            'total_dust_estimated_usd': total_spot_dust_usd
-        },
-        'earn_balance': {
-             'total_estimated_usd': total_earn_usd,
-             'assets': earn_list,
-             'total_dust_estimated_usd': total_earn_dust_usd
-        },
-        'futures_balance_usdt_m': usdt_m_futures_info, # Зберігаємо інформацію про USDT як єдиний актив
-        'futures_balance_coin_m': { # Нова секція для COIN-M
-            'total_estimated_usd': total_coin_m_futures_usd,
-            'assets': coin_m_futures_list
-        },
-        'total_balance_estimated_usd': total_estimated_balance_usd,
-        'total_dust_across_accounts_usd': total_overall_dust_usd 
+        'accounts': accounts_rows,
+        'assets': assets_rows,
+        'failed_accounts': failed_accounts,
+        'total_balance_estimated_usd': total_portfolio_usd,
+        'total_dust_across_accounts_usd': total_portfolio_dust_usd,
     }
 
-    spot_table_string = data_processing.format_spot_balance_table(spot_list)
-    earn_table_string = data_processing.format_earn_balance_table(earn_list) 
-    coin_m_table_string = data_processing.format_coin_m_futures_balance_table(coin_m_futures_list)
-
-
-    txt_data = f"Звіт про баланс Binance станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-    txt_data += "="*80 + "\n\n" # Збільшимо ширину
-
-    # Spot
-    txt_data += "--- Спотовий гаманець ---\n"
-    txt_data += spot_table_string + "\n"
-    txt_data += f"\nЗагальний спотовий баланс (без урахування пилу): {total_spot_usd:.2f} USD\n"
-    if total_spot_dust_usd > 0:
-        txt_data += f"Загальна вартість відфільтрованого 'пилу' на споті: {total_spot_dust_usd:.2f} USD\n"
-    txt_data += "\n\n"
-
-    # Earn
-    txt_data += "--- Binance Earn рахунок ---\n"
-    txt_data += earn_table_string + "\n" 
-    txt_data += f"\nЗагальний Binance Earn баланс (без урахування пилу): {total_earn_usd:.2f} USD\n"
-    if total_earn_dust_usd > 0:
-        txt_data += f"Загальна вартість відфільтрованого 'пилу' на Earn: {total_earn_dust_usd:.2f} USD\n"
-    txt_data += "\n\n"
-    
-    # USDT-M Futures
-    txt_data += "--- Ф'ючерсний гаманець (USDT-M) ---\n"
-    if usdt_m_futures_info:
-        txt_data += f"Актив: {usdt_m_futures_info['Актив']}\n"
-        txt_data += f"  Баланс гаманця: {usdt_m_futures_info['Баланс гаманця']:.8f}\n"
-        txt_data += f"  Нереалізований PNL: {usdt_m_futures_info['Нереалізований PNL']:.8f}\n"
-        txt_data += f"  Загальний баланс активу (в USDT): {usdt_m_futures_info['Загалом (USDT)']:.8f}\n"
-    else:
-        txt_data += "Інформація про актив USDT на ф'ючерсному гаманці USDT-M не знайдена.\n"
-    txt_data += f"\nЗагальний USDT-M ф'ючерсний баланс (оцінка в USD): {total_usdt_m_futures_usd:.2f} USD\n\n"
-
-    # COIN-M Futures
-    txt_data += "--- Ф'ючерсний гаманець (COIN-M) ---\n"
-    txt_data += coin_m_table_string + "\n"
-    txt_data += f"\nЗагальний COIN-M ф'ючерсний баланс (оцінка в USD): {total_coin_m_futures_usd:.2f} USD\n\n"
-
+    accounts_table_string = data_processing.format_portfolio_accounts_table(accounts_rows)
+    assets_table_string = data_processing.format_portfolio_assets_table(assets_rows)
 
-    txt_data += "="*80 + "\n"
-    txt_data += f"ЗАГАЛЬНИЙ БАЛАНС (Спот + Earn + USDT-M + COIN-M, без урахування пилу): {total_estimated_balance_usd:.2f} USD\n"
-    if total_overall_dust_usd > 0:
-        txt_data += f"Загальна вартість відфільтрованого 'пилу' (спот + Earn): {total_overall_dust_usd:.2f} USD\n"
-    txt_data += "="*80 + "\n"
+    txt_parts = [
+        f"Зведений звіт по портфелю Binance станом на: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+        "="*80 + "\n\n",
+        "--- Акаунти ---\n",
+        accounts_table_string + "\n\n",
+        "--- Активи (Спот + Earn + USDT-M + COIN-M, усі акаунти) ---\n",
+        assets_table_string + "\n\n",
+    ]
+    if failed_accounts:
+        txt_parts.append(f"Не вдалося отримати дані акаунтів: {', '.join(failed_accounts)}\n\n")
+    txt_parts.append("="*80 + "\n")
+    txt_parts.append(
+        f"ЗАГАЛЬНИЙ БАЛАНС ПОРТФЕЛЯ ({len(accounts_rows)} акаунтів, без урахування пилу): {total_portfolio_usd:.2f} USD\n"
+    )
+    if total_portfolio_dust_usd > 0:
+        txt_parts.append(f"Загальна вартість відфільтрованого 'пилу' (спот + Earn): {total_portfolio_dust_usd:.2f} USD\n")
+    txt_parts.append("="*80 + "\n")
+    txt_data = ''.join(txt_parts)
 
-    return json_data, txt_data, report_name_suffix
\ No newline at end of file
+    return json_data, txt_data, report_name_suffix
@@ -1,93 +1,226 @@
 # pro1/balance/script_runner.py
+import asyncio
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from . import config 
 from . import api
 from . import data_processing
 from . import report_generator
-from .account import BinanceAccount
+from .metrics import METRICS, METRICS_FILE_NAME, record_run
+from .history_store import open_history_store
+from .snapshot_archive import SnapshotArchive, SNAPSHOT_ARCHIVE_DIR_NAME
+from .price_cache import open_price_cache
+from .settings import get_settings, resolve_dust_threshold
 
-def run_balance_script(report_type, calling_script_name="скрипта", dust_threshold=0.01):
-    logging.info(f"Функція run_balance_script викликана для звіту типу '{report_type}' зі скрипта '{calling_script_name}'")
-    if report_type in ["spot", "earn", "full", "coin_m_futures"]:
-        logging.info(f"Поріг фільтрації 'пилу' для цього запуску: {dust_threshold:.2f} USD (застосовується до Spot та Earn)")
+REPORT_TYPES = ["spot", "earn", "futures", "coin_m_futures", "full"]
 
-    api_key, secret_key = api.load_api_keys(dotenv_file_path=config.DOTENV_PATH)
-    if not api_key or not secret_key:
-        logging.error("Зупинка виконання run_balance_script через відсутність API ключів.")
-        return
+def _log_spot_totals(spot_result, dust_threshold):
+    _, total_spot_usd_data, total_dust_usd_spot = spot_result
+    logging.info(f"\nЗагальний спотовий баланс (без урахування пилу > {dust_threshold:.2f} USD): {total_spot_usd_data:.2f} USD")
+    if total_dust_usd_spot > 0:
+        logging.info(f"Загальна вартість відфільтрованого 'пилу' на споті: {total_dust_usd_spot:.2f} USD")
 
-    try:
-        account = BinanceAccount(api_key, secret_key)
-        if not account.client:
-            logging.error("Зупинка виконання: не вдалося ініціалізувати клієнт Binance.")
-            return
-    except ValueError as e:
-        logging.error(f"Помилка створення об'єкту BinanceAccount: {e}")
+def _log_earn_totals(earn_result, dust_threshold):
+    _, total_earn_usd_data, total_dust_usd_earn = earn_result
+    logging.info(f"\nЗагальний Binance Earn баланс (без урахування пилу > {dust_threshold:.2f} USD): {total_earn_usd_data:.2f} USD")
+    if total_dust_usd_earn > 0:
+        logging.info(f"Загальна вартість відфільтрованого 'пилу' на Earn: {total_dust_usd_earn:.2f} USD")
+
+def _log_futures_totals(futures_result, dust_threshold=None):
+    total_usdt_m_futures_usd_data, _ = futures_result
+    logging.info(f"\nЗагальний USDT-M ф'ючерсний баланс (оцінка в USD): {total_usdt_m_futures_usd_data:.2f} USD")
+
+def _log_coin_m_futures_totals(coin_m_result, dust_threshold=None):
+    _, total_coin_m_futures_usd_data = coin_m_result
+    logging.info(f"\nЗагальний COIN-M ф'ючерсний баланс (оцінка в USD): {total_coin_m_futures_usd_data:.2f} USD")
+
+_TOTALS_LOGGERS = {
+    'spot': _log_spot_totals,
+    'earn': _log_earn_totals,
+    'futures': _log_futures_totals,
+    'coin_m_futures': _log_coin_m_futures_totals,
+}
+
+@METRICS.timed('wallet_collect_seconds', wallet='spot')
+def _fetch_spot(account, dust_threshold):
+    logging.info("\nОтримання спотового балансу...")
+    spot_result = account.get_spot_balance(dust_threshold)
+    _log_spot_totals(spot_result, dust_threshold)
+    return spot_result
+
+@METRICS.timed('wallet_collect_seconds', wallet='earn')
+def _fetch_earn(account, dust_threshold):
+    logging.info("\nОтримання Earn балансу...")
+    earn_result = account.get_earn_balance(dust_threshold)
+    _log_earn_totals(earn_result, dust_threshold)
+    return earn_result
+
+@METRICS.timed('wallet_collect_seconds', wallet='futures')
+def _fetch_futures(account):
+    logging.info("\nОтримання USDT-M ф'ючерсного балансу...")
+    futures_result = account.get_futures_balance()
+    _log_futures_totals(futures_result)
+    return futures_result
+
+@METRICS.timed('wallet_collect_seconds', wallet='coin_m_futures')
+def _fetch_coin_m_futures(account):
+    logging.info("\nОтримання COIN-M ф'ючерсного балансу...")
+    coin_m_result = account.get_coin_m_futures_balance()
+    _log_coin_m_futures_totals(coin_m_result)
+    return coin_m_result
+
+def collect_full_balances(account, dust_threshold=None, concurrent=True, on_wallet=None):
+    """
+    Отримує дані всіх чотирьох гаманців для повного звіту.
+    У паралельному режимі гаманці та знімок цін запитуються одночасно в пулі потоків
+    зі спільним потокобезпечним кешем цін акаунту, тож загальний час визначається
+    найповільнішим гаманцем, а не сумою всіх.
+    :param on_wallet: Функція (назва гаманця, результат), що викликається, щойно гаманець отримано
+                      (наприклад, FullReportStream.add_wallet для потокового запису звіту).
+    :return: Словник з ключами 'spot', 'earn', 'futures', 'coin_m_futures'.
+    """
+    dust_threshold = resolve_dust_threshold(dust_threshold)
+    tasks = {
+        'spot': (_fetch_spot, (account, dust_threshold)),
+        'earn': (_fetch_earn, (account, dust_threshold)),
+        'futures': (_fetch_futures, (account,)),
+        'coin_m_futures': (_fetch_coin_m_futures, (account,)),
+    }
+
+    if not concurrent:
+        balances = {}
+        for name, (func, args) in tasks.items():
+            balances[name] = func(*args)
+            if on_wallet is not None:
+                on_wallet(name, balances[name])
+        return balances
+
+    logging.info("Паралельне отримання даних гаманців...")
+    with ThreadPoolExecutor(max_workers=len(tasks) + 1, thread_name_prefix="wallet") as executor:
+        # Знімок цін завантажується паралельно із запитами балансів гаманців
+        executor.submit(account.ensure_price_snapshot)
+        futures = {executor.submit(func, *args): name for name, (func, args) in tasks.items()}
+        balances = {}
+        for future in as_completed(futures):
+            name = futures[future]
+            balances[name] = future.result()
+            if on_wallet is not None:
+                on_wallet(name, balances[name])
+        return {name: balances[name] for name in tasks}
+
+def collect_balances(account, report_type, dust_threshold=None, concurrent=True):
+    """Отримує дані гаманців, потрібних для звіту вказаного типу (поріг 'пилу' за замовчуванням - з налаштувань)."""
+    dust_threshold = resolve_dust_threshold(dust_threshold)
+    if report_type == "full":
+        return collect_full_balances(account, dust_threshold, concurrent=concurrent)
+    if report_type == "spot":
+        return {'spot': _fetch_spot(account, dust_threshold)}
+    if report_type == "earn":
+        return {'earn': _fetch_earn(account, dust_threshold)}
+    if report_type == "futures":
+        return {'futures': _fetch_futures(account)}
+    if report_type == "coin_m_futures":
+        return {'coin_m_futures': _fetch_coin_m_futures(account)}
+    return {}
+
+async def collect_balances_async(account, report_type, dust_threshold=None):
+    """
+    Асинхронний аналог collect_balances для AsyncBinanceAccount:
+    усі потрібні гаманці запитуються одночасно в одному циклі подій.
+    """
+    dust_threshold = resolve_dust_threshold(dust_threshold)
+    wallet_calls = {
+        'spot': lambda: account.get_spot_balance(dust_threshold),
+        'earn': lambda: account.get_earn_balance(dust_threshold),
+        'futures': account.get_futures_balance,
+        'coin_m_futures': account.get_coin_m_futures_balance,
+    }
+    wallets = list(wallet_calls) if report_type == "full" else [report_type] if report_type in wallet_calls else []
+    if not wallets:
+        return {}
+
+    async def timed_call(name):
+        with METRICS.timer('wallet_collect_seconds', wallet=name):
+            return await wallet_calls[name]()
+
+    logging.info(f"Асинхронне отримання даних гаманців: {', '.join(wallets)}...")
+    results = await asyncio.gather(*(timed_call(name) for name in wallets))
+    balances = dict(zip(wallets, results))
+    for name, result in balances.items():
+        _TOTALS_LOGGERS[name](result, dust_threshold)
+    return balances
+
+def _save_full_report_history(balances, output_dir):
+    """Зберігає історію (по гаманцях та активах) та знімок позицій повного звіту згідно з налаштуваннями history."""
+    history_settings = get_settings().history
+    if history_settings.backend == 'binary':
+        open_history_store(output_dir).append(balances)
+    if history_settings.snapshot_archive:
+        SnapshotArchive(os.path.join(output_dir, SNAPSHOT_ARCHIVE_DIR_NAME)).append(balances)
+
+def open_report_price_cache():
+    """
+    Постійний кеш цін з часом життя та розміром з налаштувань (розділ prices).
+    :return: PersistentPriceCache або None, якщо кеш вимкнено чи його не вдалося відкрити.
+    """
+    price_settings = get_settings().prices
+    if not price_settings.persistent_cache:
+        return None
+    return open_price_cache(config.PRICE_CACHE_PATH, ttl=price_settings.cache_ttl,
+                            negative_ttl=price_settings.negative_ttl, max_entries=price_settings.cache_max_entries)
+
+def save_balance_report(report_type, balances, calling_script_name="скрипта", output_dir=None, compact_json=False):
+    """
+    Формує звіт вказаного типу з даних гаманців та зберігає його у JSON і TXT.
+    Для повного звіту також оновлює історію балансу.
+    :param output_dir: Папка для звітів (за замовчуванням config.OUTPUT_DIR).
+    :param compact_json: Компактний JSON без відступів.
+    """
+    with METRICS.timer('report_save_seconds', report_type=report_type):
+        _save_balance_report(report_type, balances, output_dir or config.OUTPUT_DIR, compact_json)
+    logging.info(f"\nЗавершено обробку звіту типу '{report_type}' для скрипта '{calling_script_name}'.")
+
+def _save_balance_report(report_type, balances, output_dir, compact_json):
+    if report_type == "full":
+        with report_generator.FullReportStream(output_dir, compact_json=compact_json) as report_stream:
+            for wallet in report_generator.FULL_REPORT_WALLETS:
+                if wallet in balances:
+                    report_stream.add_wallet(wallet, balances[wallet])
+        _save_full_report_history(balances, output_dir)
         return
 
     json_data_to_save = None
     txt_data_to_save = None
     report_file_suffix_from_generator = "" 
     
-    spot_list_data, total_spot_usd_data, total_dust_usd_spot = [], 0.0, 0.0
-    earn_list_data, total_earn_usd_data, total_dust_usd_earn = [], 0.0, 0.0
-    usdt_m_futures_info_data, total_usdt_m_futures_usd_data = None, 0.0
-    coin_m_futures_list_data, total_coin_m_futures_usd_data = [], 0.0
-
-
-    if report_type == "spot" or report_type == "full":
-        logging.info("\nОтримання спотового балансу...")
-        spot_list_data, total_spot_usd_data, total_dust_usd_spot = account.get_spot_balance(dust_threshold)
-        logging.info(f"\nЗагальний спотовий баланс (без урахування пилу > {dust_threshold:.2f} USD): {total_spot_usd_data:.2f} USD")
-        if total_dust_usd_spot > 0:
-            logging.info(f"Загальна вартість відфільтрованого 'пилу' на споті: {total_dust_usd_spot:.2f} USD")
-        
-        if report_type == "spot":
-            spot_table_string = data_processing.format_spot_balance_table(spot_list_data)
-            logging.info("\nДеталі спотового балансу:")
-            logging.info('\n' + spot_table_string)
-            json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
-                report_generator.prepare_spot_report_data(spot_list_data, total_spot_usd_data, total_dust_usd_spot)
-
-    if report_type == "earn" or report_type == "full":
-        logging.info("\nОтримання Earn балансу...")
-        earn_list_data, total_earn_usd_data, total_dust_usd_earn = account.get_earn_balance(dust_threshold)
-        logging.info(f"\nЗагальний Binance Earn баланс (без урахування пилу > {dust_threshold:.2f} USD): {total_earn_usd_data:.2f} USD")
-        if total_dust_usd_earn > 0:
-            logging.info(f"Загальна вартість відфільтрованого 'пилу' на Earn: {total_dust_usd_earn:.2f} USD")
-        if report_type == "earn":
-            json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
-                report_generator.prepare_earn_report_data(earn_list_data, total_earn_usd_data, total_dust_usd_earn)
-
-    if report_type == "futures" or report_type == "full":
-        logging.info("\nОтримання USDT-M ф'ючерсного балансу...")
-        total_usdt_m_futures_usd_data, usdt_m_futures_info_data = account.get_futures_balance()
-        logging.info(f"\nЗагальний USDT-M ф'ючерсний баланс (оцінка в USD): {total_usdt_m_futures_usd_data:.2f} USD")
-        if report_type == "futures":
-            json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
-                report_generator.prepare_futures_report_data(usdt_m_futures_info_data, total_usdt_m_futures_usd_data)
-
-    if report_type == "coin_m_futures" or report_type == "full":
-        logging.info("\nОтримання COIN-M ф'ючерсного балансу...")
-        coin_m_futures_list_data, total_coin_m_futures_usd_data = account.get_coin_m_futures_balance()
-        logging.info(f"\nЗагальний COIN-M ф'ючерсний баланс (оцінка в USD): {total_coin_m_futures_usd_data:.2f} USD")
-        if report_type == "coin_m_futures":
-            json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
-                report_generator.prepare_coin_m_futures_report_data(coin_m_futures_list_data, total_coin_m_futures_usd_data)
+    spot_list_data, total_spot_usd_data, total_dust_usd_spot = balances.get('spot', ([], 0.0, 0.0))
+    earn_list_data, total_earn_usd_data, total_dust_usd_earn = balances.get('earn', ([], 0.0, 0.0))
+    total_usdt_m_futures_usd_data, usdt_m_futures_info_data = balances.get('futures', (0.0, None))
+    coin_m_futures_list_data, total_coin_m_futures_usd_data = balances.get('coin_m_futures', ([], 0.0))
 
+    if report_type == "spot":
+        spot_table_string = data_processing.format_spot_balance_table(spot_list_data)
+        logging.info("\nДеталі спотового балансу:")
+        logging.info('\n' + spot_table_string)
+        json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
+            report_generator.prepare_spot_report_data(spot_list_data, total_spot_usd_data, total_dust_usd_spot,
+                                                      spot_table_string)
 
-    if report_type == "full":
+    if report_type == "earn":
         json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
-            report_generator.prepare_full_report_data(
-                spot_list_data, total_spot_usd_data, total_dust_usd_spot,
-                earn_list_data, total_earn_usd_data, total_dust_usd_earn,
-                usdt_m_futures_info_data, total_usdt_m_futures_usd_data,
-                coin_m_futures_list_data, total_coin_m_futures_usd_data
-            )
-    
+            report_generator.prepare_earn_report_data(earn_list_data, total_earn_usd_data, total_dust_usd_earn)
+
+    if report_type == "futures":
+        json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
+            report_generator.prepare_futures_report_data(usdt_m_futures_info_data, total_usdt_m_futures_usd_data)
+
+    if report_type == "coin_m_futures":
+        json_data_to_save, txt_data_to_save, report_file_suffix_from_generator = \
+            report_generator.prepare_coin_m_futures_report_data(coin_m_futures_list_data, total_coin_m_futures_usd_data)
+
     if not (json_data_to_save and txt_data_to_save and report_file_suffix_from_generator) and \
-       report_type not in ["spot", "futures", "earn", "full", "coin_m_futures"]:
+       report_type not in REPORT_TYPES:
         logging.error(f"Не вдалося згенерувати дані для звіту типу: {report_type}")
         return
 
@@ -95,13 +228,110 @@ def run_balance_script(report_type, calling_script_name="скрипта", dust_t
         json_output_file_name = f'{report_file_suffix_from_generator}.json'
         txt_output_file_name = f'{report_file_suffix_from_generator}.txt'
         
-        data_processing.save_to_json(json_data_to_save, output_dir_path=config.OUTPUT_DIR, file_name=json_output_file_name)
-        data_processing.save_to_txt(txt_data_to_save, output_dir_path=config.OUTPUT_DIR, file_name=txt_output_file_name)
+        data_processing.save_to_json(json_data_to_save, output_dir_path=output_dir, file_name=json_output_file_name,
+                                     compact=compact_json)
+        data_processing.save_to_txt(txt_data_to_save, output_dir_path=output_dir, file_name=txt_output_file_name)
+
+def stream_full_report(account, dust_threshold=None, concurrent=True, calling_script_name="скрипта",
+                       output_dir=None, compact_json=False):
+    """
+    Отримує повний звіт і записує секцію кожного гаманця у файли звіту, щойно гаманець отримано,
+    не чекаючи на найповільніший. Файли звіту замінюються атомарно після запису всіх секцій.
+    :return: Дані гаманців (як collect_full_balances).
+    """
+    output_dir = output_dir or config.OUTPUT_DIR
+    with report_generator.FullReportStream(output_dir, compact_json=compact_json) as report_stream:
+        balances = collect_full_balances(account, dust_threshold, concurrent=concurrent,
+                                         on_wallet=report_stream.add_wallet)
+    with METRICS.timer('report_save_seconds', report_type='history'):
+        _save_full_report_history(balances, output_dir)
+    logging.info(f"\nЗавершено обробку звіту типу 'full' для скрипта '{calling_script_name}'.")
+    return balances
+
+def run_balance_script(report_type, calling_script_name="скрипта", dust_threshold=None, concurrent=None,
+                       compact_json=None):
+    """
+    Точка входу звіту по балансу. Час викликів API, повтори, пошук цін і збереження звіту
+    записуються рядком у файл метрик запусків (metrics.jsonl у папці звітів).
+    Не вказані dust_threshold, concurrent та compact_json беруться з налаштувань.
+    """
+    settings = get_settings()
+    dust_threshold = resolve_dust_threshold(dust_threshold)
+    concurrent = settings.concurrency.concurrent_wallets if concurrent is None else concurrent
+    compact_json = settings.report.compact_json if compact_json is None else compact_json
+    with record_run(os.path.join(config.OUTPUT_DIR, METRICS_FILE_NAME), report_type=report_type,
+                    mode='concurrent' if concurrent else 'sequential'):
+        _run_balance_script(report_type, calling_script_name, dust_threshold, concurrent, compact_json)
+
+def _run_balance_script(report_type, calling_script_name, dust_threshold, concurrent, compact_json):
+    logging.info(f"Функція run_balance_script викликана для звіту типу '{report_type}' зі скрипта '{calling_script_name}'")
+    if report_type in ["spot", "earn", "full", "coin_m_futures"]:
+        logging.info(f"Поріг фільтрації 'пилу' для цього запуску: {dust_threshold:.2f} USD (застосовується до Spot та Earn)")
+
+    api_key, secret_key = api.load_api_keys(dotenv_file_path=config.DOTENV_PATH)
+    if not api_key or not secret_key:
+        logging.error("Зупинка виконання run_balance_script через відсутність API ключів.")
+        return
+
+    price_cache = open_report_price_cache()
+    try:
+        try:
+            # Клієнт Binance імпортується лише тут: сам модуль script_runner лишається легким
+            from .account import BinanceAccount
+            account = BinanceAccount(api_key, secret_key, persistent_price_cache=price_cache)
+            if not account.client:
+                logging.error("Зупинка виконання: не вдалося ініціалізувати клієнт Binance.")
+                return
+        except ValueError as e:
+            logging.error(f"Помилка створення об'єкту BinanceAccount: {e}")
+            return
+
+        if report_type == "full":
+            stream_full_report(account, dust_threshold, concurrent, calling_script_name, compact_json=compact_json)
+            return
+        balances = collect_balances(account, report_type, dust_threshold, concurrent=concurrent)
+    finally:
+        if price_cache is not None:
+            price_cache.close()
+    save_balance_report(report_type, balances, calling_script_name, compact_json=compact_json)
+
+async def run_balance_script_async(report_type, calling_script_name="скрипта", dust_threshold=None, compact_json=None):
+    """
+    Асинхронна точка входу: той самий звіт, що й run_balance_script, але через AsyncBinanceAccount.
+    Дозволяє запускати кілька знімків балансу в одному циклі подій без окремого потоку на кожен запит.
+    """
+    settings = get_settings()
+    dust_threshold = resolve_dust_threshold(dust_threshold)
+    compact_json = settings.report.compact_json if compact_json is None else compact_json
+    with record_run(os.path.join(config.OUTPUT_DIR, METRICS_FILE_NAME), report_type=report_type, mode='async'):
+        await _run_balance_script_async(report_type, calling_script_name, dust_threshold, compact_json)
+
+async def _run_balance_script_async(report_type, calling_script_name, dust_threshold, compact_json):
+    from .async_account import AsyncBinanceAccount
 
-    # Зберігаємо історію, якщо це був повний звіт
-    if report_type == 'full':
-        overall_total_balance = total_spot_usd_data + total_earn_usd_data + total_usdt_m_futures_usd_data + total_coin_m_futures_usd_data
-        history_file = os.path.join(config.OUTPUT_DIR, 'balance_history.csv')
-        data_processing.save_balance_history(overall_total_balance, history_file)
+    logging.info(f"Функція run_balance_script_async викликана для звіту типу '{report_type}' зі скрипта '{calling_script_name}'")
+    api_key, secret_key = api.load_api_keys(dotenv_file_path=config.DOTENV_PATH)
+    if not api_key or not secret_key:
+        logging.error("Зупинка виконання run_balance_script_async через відсутність API ключів.")
+        return
+
+    price_cache = open_report_price_cache()
+    try:
+        try:
+            account = await AsyncBinanceAccount.create(
+                api_key, secret_key, connection_limit=get_settings().concurrency.async_connection_limit,
+                persistent_price_cache=price_cache,
+            )
+        except ValueError as e:
+            logging.error(f"Помилка створення об'єкту AsyncBinanceAccount: {e}")
+            return
+        except Exception as e:
+            logging.error(f"Зупинка виконання: не вдалося ініціалізувати асинхронний клієнт Binance: {e}")
+            return
 
-    logging.info(f"\nЗавершено обробку звіту типу '{report_type}' для скрипта '{calling_script_name}'.")
\ No newline at end of file
+        async with account:
+            balances = await collect_balances_async(account, report_type, dust_threshold)
+    finally:
+        if price_cache is not None:
+            price_cache.close()
+    save_balance_report(report_type, balances, calling_script_name, compact_json=compact_json)
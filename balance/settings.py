@@ -0,0 +1,293 @@
+# balance/settings.py
+"""
+Типізовані налаштування продуктивності та поведінки скриптів балансу.
+Значення накладаються шарами (кожен наступний перекриває попередній):
+значення за замовчуванням < профіль < файл налаштувань < змінні середовища < аргументи командного рядка.
+Налаштування перевіряються один раз під час запуску (load_settings) і застосовуються через configure();
+модулі читають їх через get_settings() і не звертаються до змінних середовища самі.
+
+Змінні середовища: BINANCE_BALANCE_PROFILE, BINANCE_BALANCE_CONFIG (шлях до файлу) та
+BINANCE_BALANCE_<РОЗДІЛ>__<ПОЛЕ>, наприклад BINANCE_BALANCE_RETRY__RETRIES=5.
+"""
+import copy
+import json
+import os
+import tomllib
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from . import config
+from .prices import CONVERSION_ASSETS, STABLECOIN_QUOTES, USD_STABLECOINS
+from .rate_limit import DEFAULT_WEIGHT_LIMITS, WEIGHT_SAFETY_RATIO
+
+ENV_PREFIX = 'BINANCE_BALANCE_'
+# Розділювач розділу та поля в назвах змінних середовища
+ENV_NESTED_DELIMITER = '__'
+# Файл налаштувань за замовчуванням (TOML або JSON); використовується, лише якщо існує
+SETTINGS_PATH = os.path.join(config.SERVICE_DIR, 'settings.toml')
+
+class _Section(BaseModel):
+    # Невідомі ключі (помилка в назві) - помилка перевірки, а не тихо проігнороване значення
+    model_config = ConfigDict(extra='forbid', validate_assignment=True)
+
+class PathSettings(_Section):
+    """Шляхи до файлів і папок; відносні шляхи рахуються від кореня проєкту."""
+    dotenv_path: str = config.DOTENV_PATH
+    accounts_path: str = config.ACCOUNTS_PATH
+    log_dir: str = config.LOG_DIR
+    output_dir: str = config.OUTPUT_DIR
+
+    @field_validator('*')
+    @classmethod
+    def _absolute(cls, value):
+        value = os.path.expanduser(value)
+        return value if os.path.isabs(value) else os.path.join(config.PROJECT_ROOT_DIR, value)
+
+class ConcurrencySettings(_Section):
+    # Гаманці повного звіту запитуються паралельно
+    concurrent_wallets: bool = True
+    # Асинхронний клієнт (AsyncClient) замість потоків
+    use_async: bool = False
+    async_connection_limit: int = Field(20, ge=1)
+    # Пакетний режим: акаунтів одночасно та одночасних запитів до API для всіх акаунтів
+    parallel_accounts: int = Field(4, ge=1)
+    max_in_flight_requests: int = Field(8, ge=1)
+    # Потоки завантаження свічок у пакетному технічному аналізі
+    kline_fetch_workers: int = Field(8, ge=1)
+
+class RetrySettings(_Section):
+    """Повтори запитів до API (retry_on_exception)."""
+    retries: int = Field(3, ge=1)
+    delay: float = Field(5.0, ge=0)
+    max_delay: float = Field(60.0, ge=0)
+
+class RateLimitSettings(_Section):
+    """Бюджет запитів: ліміти ваги Binance, ліміт запитів за хвилину та запобіжник серії помилок."""
+    weight_limits: dict[Literal['spot', 'futures', 'coin_m'], int] = Field(
+        default_factory=lambda: dict(DEFAULT_WEIGHT_LIMITS))
+    safety_ratio: float = Field(WEIGHT_SAFETY_RATIO, gt=0, le=1)
+    max_requests_per_minute: int | None = Field(None, ge=1)
+    circuit_failure_threshold: int = Field(5, ge=1)
+    circuit_reset_timeout: float = Field(30.0, gt=0)
+
+    @field_validator('weight_limits')
+    @classmethod
+    def _complete_limits(cls, value):
+        # Можна перекрити ліміт лише одного API, решта - значення за замовчуванням
+        return {**DEFAULT_WEIGHT_LIMITS, **value}
+
+class PriceSettings(_Section):
+    # Активи, вартість яких вважається рівною 1 USD
+    stablecoins: list[str] = Field(default_factory=lambda: list(USD_STABLECOINS), min_length=1)
+    # Котирувальні стейблкоїни для прямого пошуку ціни пари (у порядку пріоритету) та активи непрямої конвертації
+    quote_stablecoins: list[str] = Field(default_factory=lambda: list(STABLECOIN_QUOTES), min_length=1)
+    conversion_assets: list[str] = Field(default_factory=lambda: list(CONVERSION_ASSETS))
+    # Постійний кеш цін між запусками та час життя його записів, секунди
+    persistent_cache: bool = True
+    cache_ttl: float = Field(300, gt=0)
+    negative_ttl: float = Field(60, gt=0)
+    cache_max_entries: int = Field(5000, ge=1)
+
+    @field_validator('stablecoins', 'quote_stablecoins', 'conversion_assets', mode='before')
+    @classmethod
+    def _split_assets(cls, value):
+        if isinstance(value, str):
+            value = value.split(',')
+        return [asset.strip().upper() for asset in value if asset.strip()]
+
+class ReportSettings(_Section):
+    # Поріг 'пилу' для Spot та Earn, USD
+    dust_threshold: float = Field(0.01, ge=0)
+    compact_json: bool = False
+
+class HistorySettings(_Section):
+    # 'binary' - бінарний журнал по днях (balance/history_store.py), 'none' - не зберігати історію
+    backend: Literal['binary', 'none'] = 'binary'
+    snapshot_archive: bool = True
+
+class AnalysisSettings(_Section):
+    # Кількість свічок для технічного аналізу (ліміт Binance - 1000 за запит)
+    kline_limit: int = Field(300, ge=1, le=1000)
+    base_interval: str = '1h'
+    # Формат результату --ta-batch, якщо --ta-output не вказано
+    output_format: Literal['json', 'parquet'] = 'json'
+
+class DaemonSettings(_Section):
+    report_interval: int = Field(60, ge=1)
+    # 0 - синхронізація через REST лише після помилки потоку акаунту
+    resync_interval: int = Field(300, ge=0)
+
+class LoggingSettings(_Section):
+    json_format: bool = False
+    use_queue: bool = True
+    rotation: Literal['size', 'time'] | None = config.LOG_ROTATION
+    max_bytes: int = Field(config.LOG_MAX_BYTES, ge=1)
+    backup_count: int = Field(config.LOG_BACKUP_COUNT, ge=0)
+    retention_days: int | None = Field(config.LOG_RETENTION_DAYS, ge=1)
+
+class Settings(_Section):
+    profile: str | None = None
+    paths: PathSettings = Field(default_factory=PathSettings)
+    concurrency: ConcurrencySettings = Field(default_factory=ConcurrencySettings)
+    retry: RetrySettings = Field(default_factory=RetrySettings)
+    rate_limit: RateLimitSettings = Field(default_factory=RateLimitSettings)
+    prices: PriceSettings = Field(default_factory=PriceSettings)
+    report: ReportSettings = Field(default_factory=ReportSettings)
+    history: HistorySettings = Field(default_factory=HistorySettings)
+    analysis: AnalysisSettings = Field(default_factory=AnalysisSettings)
+    daemon: DaemonSettings = Field(default_factory=DaemonSettings)
+    logging: LoggingSettings = Field(default_factory=LoggingSettings)
+
+# Іменовані профілі: перекриття значень за замовчуванням для типових сценаріїв запуску
+PROFILES = {
+    # Запуск за розкладом: мало повторів з короткими затримками, теплий кеш цін, без архіву знімків
+    'cron-fast': {
+        'retry': {'retries': 2, 'delay': 1.0, 'max_delay': 10.0},
+        'prices': {'cache_ttl': 900, 'negative_ttl': 300},
+        'report': {'compact_json': True},
+        'history': {'snapshot_archive': False},
+    },
+    # Довготривалий процес: терплячі повтори, запас ліміту ваги, щоденна ротація логів у JSON
+    'daemon': {
+        'retry': {'retries': 5, 'delay': 5.0, 'max_delay': 120.0},
+        'rate_limit': {'safety_ratio': 0.8},
+        'prices': {'cache_ttl': 60},
+        'logging': {'json_format': True, 'rotation': 'time'},
+    },
+    # Повний аудит: без порогу пилу та постійного кешу цін, послідовні запити, довга історія свічок
+    'deep-audit': {
+        'concurrency': {'concurrent_wallets': False, 'parallel_accounts': 1, 'max_in_flight_requests': 2},
+        'retry': {'retries': 6, 'delay': 5.0, 'max_delay': 120.0},
+        'prices': {'persistent_cache': False},
+        'report': {'dust_threshold': 0.0},
+        'analysis': {'kline_limit': 1000},
+    },
+}
+
+_SETTINGS = None
+
+def _merge(base, override):
+    """Рекурсивне злиття словників: значення override перекривають base."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def _parse_value(raw):
+    """Значення зі змінної середовища або --set: JSON (числа, true/false, null, списки), інакше рядок."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+def _nested(path, value, delimiter):
+    keys = [key.strip().lower() for key in path.split(delimiter)]
+    if not all(keys):
+        raise ValueError(f"Некоректна назва налаштування: '{path}'")
+    result = value
+    for key in reversed(keys):
+        result = {key: result}
+    return result
+
+def load_settings_file(file_path):
+    """Читає файл налаштувань: .json або TOML (будь-яке інше розширення)."""
+    try:
+        if file_path.lower().endswith('.json'):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        else:
+            with open(file_path, 'rb') as f:
+                data = tomllib.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Не вдалося прочитати файл налаштувань {file_path}: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError(f"Файл налаштувань {file_path} має містити об'єкт з розділами налаштувань")
+    return data
+
+def env_overrides(environ):
+    """Налаштування зі змінних середовища BINANCE_BALANCE_<РОЗДІЛ>__<ПОЛЕ> (без PROFILE та CONFIG)."""
+    values = {}
+    for name, raw in environ.items():
+        if not name.startswith(ENV_PREFIX) or name in (ENV_PREFIX + 'PROFILE', ENV_PREFIX + 'CONFIG'):
+            continue
+        values = _merge(values, _nested(name[len(ENV_PREFIX):], _parse_value(raw), ENV_NESTED_DELIMITER))
+    return values
+
+def parse_assignments(assignments):
+    """['retry.retries=5', 'prices.stablecoins=USDT,USDC'] -> вкладений словник налаштувань."""
+    values = {}
+    for assignment in assignments or ():
+        path, separator, raw = assignment.partition('=')
+        if not separator:
+            raise ValueError(f"Очікується розділ.поле=значення, отримано: '{assignment}'")
+        values = _merge(values, _nested(path, _parse_value(raw.strip()), '.'))
+    return values
+
+def load_settings(profile=None, config_path=None, overrides=None, environ=None):
+    """
+    Збирає та перевіряє налаштування з усіх шарів.
+    :param profile: Назва профілю (перекриває профіль з файлу та змінної середовища).
+    :param config_path: Файл налаштувань (за замовчуванням BINANCE_BALANCE_CONFIG або service/settings.toml, якщо існує).
+    :param overrides: Вкладений словник значень з аргументів командного рядка (найвищий пріоритет).
+    :param environ: Змінні середовища (за замовчуванням os.environ); читаються лише тут.
+    :return: Settings.
+    :raises ValueError: Невідомий профіль, помилка у файлі або значення, що не пройшло перевірку.
+    """
+    environ = os.environ if environ is None else environ
+    config_path = config_path or environ.get(ENV_PREFIX + 'CONFIG')
+    if config_path is None and os.path.exists(SETTINGS_PATH):
+        config_path = SETTINGS_PATH
+    file_values = load_settings_file(config_path) if config_path else {}
+    # Файл може оголошувати власні профілі: [profiles.<назва>]
+    profiles = _merge(PROFILES, file_values.pop('profiles', {}))
+
+    profile = profile or environ.get(ENV_PREFIX + 'PROFILE') or file_values.get('profile')
+    if profile is not None and profile not in profiles:
+        raise ValueError(f"Невідомий профіль налаштувань '{profile}'. Доступні: {', '.join(sorted(profiles))}")
+
+    values = {}
+    for layer in (profiles.get(profile, {}), file_values, env_overrides(environ), overrides or {}):
+        values = _merge(values, copy.deepcopy(layer))
+    values['profile'] = profile
+    return Settings.model_validate(values)
+
+def configure(settings):
+    """
+    Робить налаштування поточними для процесу та застосовує ті, що зберігаються поза Settings:
+    шляхи в config, список стейблкоїнів та ліміти спільного обмежувача запитів.
+    """
+    global _SETTINGS
+    from . import rate_limit
+
+    paths = settings.paths
+    config.DOTENV_PATH = paths.dotenv_path
+    config.ACCOUNTS_PATH = paths.accounts_path
+    config.LOG_DIR = paths.log_dir
+    if paths.output_dir != config.OUTPUT_DIR:
+        config.OUTPUT_DIR = paths.output_dir
+        config.PRICE_CACHE_PATH = os.path.join(paths.output_dir, 'price_cache.sqlite3')
+        config.HISTORY_DIR = os.path.join(paths.output_dir, 'history')
+        config.SNAPSHOT_ARCHIVE_DIR = os.path.join(paths.output_dir, 'snapshots')
+        config.KLINE_STORE_DIR = os.path.join(paths.output_dir, 'klines')
+    # Списки змінюються на місці: модулі, що імпортували їх з balance.prices, бачать ті самі об'єкти
+    USD_STABLECOINS[:] = settings.prices.stablecoins
+    STABLECOIN_QUOTES[:] = settings.prices.quote_stablecoins
+    CONVERSION_ASSETS[:] = settings.prices.conversion_assets
+    rate_limit.DEFAULT_RATE_LIMITER.weight_limits = dict(settings.rate_limit.weight_limits)
+    rate_limit.DEFAULT_RATE_LIMITER.safety_ratio = settings.rate_limit.safety_ratio
+
+    _SETTINGS = settings
+    return settings
+
+def get_settings():
+    """Поточні налаштування процесу (значення за замовчуванням, якщо configure() ще не викликався)."""
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = Settings()
+    return _SETTINGS
+
+def resolve_dust_threshold(dust_threshold=None):
+    """Поріг 'пилу' в USD: явно передане значення або settings.report.dust_threshold."""
+    return get_settings().report.dust_threshold if dust_threshold is None else dust_threshold
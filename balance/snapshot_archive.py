@@ -0,0 +1,234 @@
+# balance/snapshot_archive.py
+import json
+import logging
+import os
+import threading
+import time
+
+# Кількість дельта-записів між ключовими кадрами (повними знімками)
+DEFAULT_KEYFRAME_INTERVAL = 60
+# Назва папки архіву всередині папки звітів
+SNAPSHOT_ARCHIVE_DIR_NAME = 'snapshots'
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.jsonl'
+
+def extract_positions(balances):
+    """
+    Перетворює дані гаманців (формат script_runner.collect_full_balances) на стан для архіву.
+    Кількості зберігаються окремо від цін: кількості змінюються рідко, а ціна кожного активу
+    записується один раз, навіть якщо актив є в кількох гаманцях.
+    :return: (позиції {'гаманець:актив[:продукт]': кількість}, ціни {актив: ціна в USD}).
+    """
+    positions = {}
+    prices = {}
+
+    def add(key, asset, amount, value_usd):
+        positions[key] = positions.get(key, 0.0) + amount
+        if isinstance(value_usd, (int, float)) and amount:
+            prices[asset] = value_usd / amount
+
+    spot_list, _, _ = balances.get('spot', ([], 0.0, 0.0))
+    earn_list, _, _ = balances.get('earn', ([], 0.0, 0.0))
+    _, futures_info = balances.get('futures', (0.0, None))
+    coin_m_list, _ = balances.get('coin_m_futures', ([], 0.0))
+
+    for item in spot_list:
+        add(f"spot:{item['Актив']}", item['Актив'], item['Всього'], item.get('Вартість (USD)'))
+    for item in earn_list:
+        add(f"earn:{item['Актив']}:{item.get('Продукт', '')}", item['Актив'], item['Всього'], item.get('Вартість (USD)'))
+    for item in (futures_info or {}).get('Активи', []):
+        add(f"futures:{item['Актив']}", item['Актив'], item['Загалом в монеті'], item.get('Вартість (USD)'))
+    for item in coin_m_list:
+        add(f"coin_m_futures:{item['Актив']}", item['Актив'], item['Загалом в монеті'], item.get('Вартість (USD)'))
+    return positions, prices
+
+def _diff(previous, current):
+    """Дельта між двома словниками: змінені/нові значення та видалені ключі."""
+    changed = {key: value for key, value in current.items() if previous.get(key) != value}
+    removed = [key for key in previous if key not in current]
+    delta = {}
+    if changed:
+        delta['set'] = changed
+    if removed:
+        delta['del'] = removed
+    return delta
+
+def _apply(state, delta):
+    state.update(delta.get('set', {}))
+    for key in delta.get('del', []):
+        state.pop(key, None)
+
+def position_values(positions, prices):
+    """Вартість кожної позиції в USD (None, якщо ціна активу невідома)."""
+    values = {}
+    for key, amount in positions.items():
+        price = prices.get(key.split(':')[1])
+        values[key] = amount * price if price is not None else None
+    return values
+
+def attribute_pnl(start_state, end_state):
+    """
+    Розкладає зміну вартості кожної позиції між двома знімками на внесок зміни кількості
+    (за початковою ціною) та внесок зміни ціни (на кінцеву кількість).
+    :return: Словник {позиція: {'quantity_effect', 'price_effect', 'total'}} у USD.
+    """
+    attribution = {}
+    for key in set(start_state['positions']) | set(end_state['positions']):
+        asset = key.split(':')[1]
+        start_amount = start_state['positions'].get(key, 0.0)
+        end_amount = end_state['positions'].get(key, 0.0)
+        start_price = start_state['prices'].get(asset)
+        end_price = end_state['prices'].get(asset)
+        if start_price is None:
+            start_price = end_price
+        if end_price is None:
+            end_price = start_price
+        if start_price is None:
+            continue
+        quantity_effect = (end_amount - start_amount) * start_price
+        price_effect = end_amount * (end_price - start_price)
+        attribution[key] = {
+            'quantity_effect': quantity_effect,
+            'price_effect': price_effect,
+            'total': quantity_effect + price_effect,
+        }
+    return attribution
+
+class SnapshotArchive:
+    """
+    Архів знімків позицій кожного запуску з дельта-стисненням.
+    Записи зберігаються в сегментах JSON Lines: кожен сегмент починається з ключового кадру
+    (повний стан), далі йдуть лише зміни відносно попереднього знімка. Відновлення стану
+    на будь-який момент читає лише один сегмент (не більше keyframe_interval записів).
+    """
+    def __init__(self, root_dir, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.root_dir = root_dir
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+        # Останній записаний стан: (позиції, ціни, кількість записів у поточному сегменті, шлях сегмента)
+        self._tail = None
+
+    def segments(self):
+        """Повертає відсортований список (час ключового кадру, шлях сегмента)."""
+        if not os.path.isdir(self.root_dir):
+            return []
+        segments = []
+        for file_name in os.listdir(self.root_dir):
+            if not (file_name.startswith(SEGMENT_PREFIX) and file_name.endswith(SEGMENT_SUFFIX)):
+                continue
+            try:
+                started_at = int(file_name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) / 1000
+            except ValueError:
+                continue
+            segments.append((started_at, os.path.join(self.root_dir, file_name)))
+        return sorted(segments)
+
+    @staticmethod
+    def _read_segment(path, until=None):
+        """
+        Відтворює стани сегмента за порядком записів.
+        :return: Генератор словників {'timestamp', 'positions', 'prices'}.
+        """
+        positions, prices = {}, {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Незавершений запис (наприклад, після аварійної зупинки)
+                    logging.warning(f"Пропущено пошкоджений запис архіву знімків у {path}")
+                    continue
+                if until is not None and record['t'] > until:
+                    return
+                if record.get('k'):
+                    positions, prices = dict(record['positions']), dict(record['prices'])
+                else:
+                    _apply(positions, record.get('positions', {}))
+                    _apply(prices, record.get('prices', {}))
+                yield {'timestamp': record['t'], 'positions': dict(positions), 'prices': dict(prices)}
+
+    def _load_tail(self):
+        segments = self.segments()
+        if not segments:
+            return None
+        path = segments[-1][1]
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return None
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                # Останній запис незавершений - наступний знімок почне новий сегмент
+                return None
+        count, state = 0, None
+        for state in self._read_segment(path):
+            count += 1
+        if state is None:
+            return None
+        return state['positions'], state['prices'], count, path
+
+    def append(self, balances, timestamp=None):
+        """
+        Додає знімок позицій. Ключовий кадр записується на початку кожного сегмента,
+        інакше - лише зміни відносно попереднього знімка.
+        :return: True у разі успіху.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        positions, prices = extract_positions(balances)
+        try:
+            with self._lock:
+                if self._tail is None:
+                    self._tail = self._load_tail()
+                if self._tail is None or self._tail[2] >= self.keyframe_interval:
+                    os.makedirs(self.root_dir, exist_ok=True)
+                    path = os.path.join(self.root_dir, f"{SEGMENT_PREFIX}{int(timestamp * 1000):015d}{SEGMENT_SUFFIX}")
+                    record = {'t': timestamp, 'k': 1, 'positions': positions, 'prices': prices}
+                    count = 0
+                else:
+                    previous_positions, previous_prices, count, path = self._tail
+                    record = {'t': timestamp}
+                    positions_delta = _diff(previous_positions, positions)
+                    prices_delta = _diff(previous_prices, prices)
+                    if positions_delta:
+                        record['positions'] = positions_delta
+                    if prices_delta:
+                        record['prices'] = prices_delta
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+                self._tail = (positions, prices, count + 1, path)
+        except OSError as e:
+            logging.error(f"Помилка при збереженні знімка позицій в архів ({self.root_dir}): {e}")
+            return False
+        logging.info(f"Знімок позицій додано в архів: {self.root_dir}")
+        return True
+
+    def reconstruct(self, at=None):
+        """
+        Відновлює стан на момент `at` (Unix-час; None - останній знімок).
+        :return: Словник {'timestamp', 'positions', 'prices', 'values'} або None, якщо знімків до `at` немає.
+        """
+        candidates = [path for started_at, path in self.segments() if at is None or started_at <= at]
+        if not candidates:
+            return None
+        state = None
+        for state in self._read_segment(candidates[-1], until=at):
+            pass
+        if state is not None:
+            state['values'] = position_values(state['positions'], state['prices'])
+        return state
+
+    def iter_snapshots(self, start=None, end=None):
+        """Послідовно відтворює всі знімки в діапазоні часу [start, end)."""
+        segments = self.segments()
+        for index, (started_at, path) in enumerate(segments):
+            next_started_at = segments[index + 1][0] if index + 1 < len(segments) else None
+            if start is not None and next_started_at is not None and next_started_at <= start:
+                continue
+            if end is not None and started_at >= end:
+                break
+            for state in self._read_segment(path):
+                if start is not None and state['timestamp'] < start:
+                    continue
+                if end is not None and state['timestamp'] >= end:
+                    return
+                yield state
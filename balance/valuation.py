@@ -0,0 +1,43 @@
+# balance/valuation.py
+import numpy as np
+
+def parse_column(rows, field, default=0.0):
+    """
+    Перетворює поле всіх рядків відповіді API (рядки з числами) на масив float.
+    Відповідь - список словників, тож поле з кожного рядка дістається в Python, але рядки
+    перетворюються на числа одразу в масив numpy, без проміжного списку.
+    """
+    return np.fromiter((row.get(field, default) for row in rows), dtype=float, count=len(rows))
+
+def value_positions(assets, amounts, get_price, dust_threshold=None, min_abs_amount=None):
+    """
+    Спільна оцінка позицій для спотового, Earn та ф'ючерсних гаманців.
+    Унікальні активи з ненульовою кількістю визначаються через np.unique, ціна запитується
+    один раз для кожного з них (get_price - єдиний виклик Python на актив) і розгортається
+    назад на рядки за індексами; вартості, маска 'пилу' та підсумки обчислюються операціями над масивами.
+    :param assets: Послідовність тікерів активів.
+    :param amounts: Масив кількостей (той самий порядок, що й assets).
+    :param get_price: Функція, що повертає ціну активу в USD (0.0, якщо ціна невідома).
+    :param dust_threshold: Поріг 'пилу' в USD (None - без фільтрації).
+    :param min_abs_amount: None - враховуються лише додатні кількості, інакше - |кількість| > min_abs_amount.
+    :return: (індекси рядків для звіту, їхні ціни, їхні вартості, загальна вартість у USD, вартість 'пилу' в USD).
+             Рядки з невідомою ціною входять до звіту з ціною 0.0, але не до підсумку.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    held = amounts > 0 if min_abs_amount is None else np.abs(amounts) > min_abs_amount
+    held_indices = np.flatnonzero(held)
+    unique_assets, asset_indices = np.unique(np.asarray(assets, dtype=str)[held_indices], return_inverse=True)
+    unique_prices = np.fromiter((get_price(asset) for asset in unique_assets.tolist()), dtype=float,
+                                count=len(unique_assets))
+    prices = unique_prices[asset_indices]
+
+    priced = prices > 0
+    values = np.where(priced, amounts[held_indices] * prices, 0.0)
+    if dust_threshold is None:
+        dust = np.zeros(len(values), dtype=bool)
+    else:
+        dust = priced & (values < dust_threshold)
+    keep = ~dust
+    total_value_usd = float(values[priced & keep].sum())
+    total_dust_usd = float(values[dust].sum())
+    return held_indices[keep], prices[keep], values[keep], total_value_usd, total_dust_usd
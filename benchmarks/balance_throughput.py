@@ -0,0 +1,177 @@
+# benchmarks/balance_throughput.py
+"""
+Бенчмарк отримання балансу на локальному замінникові Binance API (benchmarks/fake_binance.py):
+час run_balance_script('full') від початку до кінця та кожного збирача гаманця окремо
+для акаунтів різного розміру, з налаштовуваною затримкою та часткою помилок сервера.
+Результати можна зберегти як базові та порівнювати з ними наступні запуски.
+Базові результати довідкової машини зберігаються в benchmarks/balance_baseline.json
+(параметри за замовчуванням); після свідомих змін продуктивності файл оновлюється через --save-baseline.
+
+Приклад:
+    python benchmarks/balance_throughput.py --assets 10 100 1000 10000 --repeat 3
+    python benchmarks/balance_throughput.py --latency-ms 20 --error-rate 0.02
+    python benchmarks/balance_throughput.py --save-baseline benchmarks/balance_baseline.json
+    python benchmarks/balance_throughput.py --baseline benchmarks/balance_baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest import mock
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.fake_binance import FakeBinanceServer, load_recorded_responses, synthetic_responses  # noqa: E402
+
+DEFAULT_ASSET_COUNTS = (10, 100, 1000, 10000)
+# Збирачі гаманців у порядку повного звіту: назва -> виклик на BinanceAccount
+COLLECTORS = {
+    'spot': lambda account: account.get_spot_balance(),
+    'earn': lambda account: account.get_earn_balance(),
+    'futures': lambda account: account.get_futures_balance(),
+    'coin_m_futures': lambda account: account.get_coin_m_futures_balance(),
+}
+# Регресія фіксується, лише якщо різниця з базовим значенням більша за це значення (шум коротких вимірів)
+DEFAULT_MIN_DELTA_MS = 5.0
+
+def _timed(func, failures=None):
+    """Час виклику в мс; помилка (вичерпані повтори при --error-rate) враховується в failures, а не зупиняє бенчмарк."""
+    started = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        if failures is None:
+            raise
+        failures.append(repr(e))
+    return (time.perf_counter() - started) * 1000
+
+def _summary(timings, requests, failures=()):
+    return {'median_ms': statistics.median(timings), 'min_ms': min(timings), 'requests': requests,
+            'failures': len(failures)}
+
+def bench_collectors(server, repeat=3):
+    """
+    Час знімка цін та кожного збирача гаманця на новому акаунті (холодний кеш цін) для кожного повтору.
+    :return: {назва виміру: {'median_ms', 'min_ms', 'requests', 'failures'}}.
+    """
+    from balance import account as account_module
+    timings = {name: [] for name in ('price_snapshot', *COLLECTORS)}
+    failures = {name: [] for name in timings}
+    requests = {}
+    with mock.patch.object(account_module, 'Client', server.client_class()):
+        for _ in range(repeat):
+            account = account_module.BinanceAccount('benchmark-key', 'benchmark-secret')
+            server.reset_counters()
+            timings['price_snapshot'].append(_timed(account.ensure_price_snapshot))
+            requests['price_snapshot'] = server.request_count
+            for name, collect in COLLECTORS.items():
+                server.reset_counters()
+                timings[name].append(_timed(lambda: collect(account), failures[name]))
+                requests[name] = server.request_count
+    return {name: _summary(values, requests[name], failures[name]) for name, values in timings.items()}
+
+def bench_run_balance_script(server, repeat=3, concurrent=True):
+    """
+    Час run_balance_script('full') від початку до кінця: ключі з .env, ініціалізація клієнта,
+    усі гаманці, звіти, історія та архів знімків (у тимчасовій папці, з порожнім кешем цін).
+    """
+    from balance import account as account_module
+    from balance import config, script_runner
+    timings = []
+    failures = []
+    with mock.patch.object(account_module, 'Client', server.client_class()):
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                dotenv_path = os.path.join(temp_dir, '.env')
+                with open(dotenv_path, 'w', encoding='utf-8') as f:
+                    f.write("BINANCE_API_KEY=benchmark-key\nBINANCE_SECRET_KEY=benchmark-secret\n")
+                with mock.patch.multiple(config, OUTPUT_DIR=temp_dir, DOTENV_PATH=dotenv_path,
+                                         PRICE_CACHE_PATH=os.path.join(temp_dir, 'price_cache.sqlite3')):
+                    server.reset_counters()
+                    timings.append(_timed(
+                        lambda: script_runner.run_balance_script('full', 'benchmark', concurrent=concurrent), failures
+                    ))
+    return _summary(timings, server.request_count, failures)
+
+def run_benchmarks(asset_counts=DEFAULT_ASSET_COUNTS, repeat=3, latency=0.0, error_rate=0.0, error_status=429,
+                   recorded_path=None, concurrent=True):
+    """:return: {'<кількість активів>:<вимір>': {'median_ms', 'min_ms', 'requests', 'failures'}}."""
+    results = {}
+    for assets in asset_counts:
+        responses = synthetic_responses(assets)
+        if recorded_path:
+            responses = load_recorded_responses(recorded_path, responses)
+        with FakeBinanceServer(responses, latency=latency, error_rate=error_rate, error_status=error_status) as server:
+            for name, result in bench_collectors(server, repeat).items():
+                results[f"{assets}:{name}"] = result
+            results[f"{assets}:run_balance_script"] = bench_run_balance_script(server, repeat, concurrent)
+    return results
+
+def find_regressions(results, baseline, tolerance=0.25, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Виміри, медіана яких перевищує базову більше ніж на tolerance (частка) та min_delta_ms.
+    :return: Список (вимір, базова медіана, поточна медіана).
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = max(base['median_ms'] * (1 + tolerance), base['median_ms'] + min_delta_ms)
+        if result['median_ms'] > limit:
+            regressions.append((name, base['median_ms'], result['median_ms']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк отримання балансу на локальному замінникові Binance API.")
+    parser.add_argument('--assets', type=int, nargs='+', default=list(DEFAULT_ASSET_COUNTS),
+                        help="Розміри акаунту (кількість активів). (За замовчуванням: 10 100 1000 10000)")
+    parser.add_argument('--repeat', type=int, default=3, help="Кількість повторів кожного виміру.")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Затримка кожної відповіді сервера, мс.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Частка запитів з відповіддю-помилкою (0..1).")
+    parser.add_argument('--error-status', type=int, default=429,
+                        help="HTTP статус помилок: 429 (з Retry-After: 0) або 5xx (повтор з експоненційною затримкою).")
+    parser.add_argument('--recorded', help="JSON файл записаних відповідей {шлях або ключ: тіло}, поверх синтетичних.")
+    parser.add_argument('--sequential', action='store_true', help="run_balance_script без паралельних запитів.")
+    parser.add_argument('--baseline', help="Файл базових результатів: ненульовий код виходу у разі регресії.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Допустиме уповільнення відносно базового (частка).")
+    parser.add_argument('--save-baseline', help="Зберегти результати як базові у вказаний файл.")
+    parser.add_argument('--json', action='store_true', help="Вивести результати у форматі JSON.")
+    parser.add_argument('--verbose', action='store_true', help="Показувати логи скриптів балансу.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+
+    results = run_benchmarks(args.assets, args.repeat, args.latency_ms / 1000, args.error_rate, args.error_status,
+                             args.recorded, concurrent=not args.sequential)
+
+    if args.json:
+        print(json.dumps(results, indent=4, ensure_ascii=False))
+    else:
+        for name, result in results.items():
+            print(f"{name:<32} медіана {result['median_ms']:10.1f} мс   мінімум {result['min_ms']:10.1f} мс   "
+                  f"запитів {result['requests']}" + (f"   помилок {result['failures']}" if result['failures'] else ''))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"Базові результати збережено: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for name, base_ms, current_ms in regressions:
+            print(f"РЕГРЕСІЯ {name}: {base_ms:.1f} мс -> {current_ms:.1f} мс")
+        if regressions:
+            return 1
+        print("Регресій відносно базових результатів немає.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# benchmarks/fake_binance.py
+"""
+Локальний замінник REST API Binance для бенчмарків і тестів без мережі.
+HTTP сервер відповідає на ті самі шляхи, що викликає python-binance (ціни, exchangeInfo,
+спотовий акаунт, Simple Earn, USDT-M та COIN-M ф'ючерси), синтетичними або записаними
+відповідями, з налаштовуваною затримкою та часткою помилок.
+Клієнт з FakeBinanceServer.client_class - справжній binance.Client, лише з адресами цього сервера,
+тож вимірюється весь шлях запиту: HTTP, розбір JSON, обмежувач запитів, повтори та оцінка балансу.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Шлях запиту -> ключ відповіді в словнику відповідей
+ROUTES = {
+    '/api/v3/ping': 'ping',
+    '/api/v3/ticker/price': 'tickers',
+    '/api/v3/exchangeInfo': 'exchange_info',
+    '/api/v3/account': 'account',
+    '/sapi/v1/simple-earn/flexible/position': 'earn_flexible',
+    '/sapi/v1/simple-earn/locked/position': 'earn_locked',
+    '/fapi/v2/account': 'futures_account',
+    '/dapi/v1/account': 'coin_m_account',
+}
+# Реальні активи на початку синтетичного акаунту (решта - A00006, A00007, ...)
+BASE_ASSETS = ('USDT', 'BTC', 'ETH', 'BNB', 'USDC', 'FDUSD')
+STABLE_ASSETS = ('USDT', 'USDC', 'FDUSD')
+# Частка синтетичних активів, що торгуються лише до BTC (перевіряє шлях конвертації через BTC)
+BTC_ONLY_EVERY = 5
+
+def _amount(value):
+    return f"{value:.8f}"
+
+def synthetic_responses(assets=100, seed=0):
+    """
+    Синтетичний акаунт з `assets` активами на споті, частиною з них в Earn,
+    мультиактивною USDT-M маржею з відкритими позиціями та COIN-M гаманцем.
+    :return: Словник {ключ відповіді з ROUTES: тіло відповіді}.
+    """
+    rng = random.Random(seed)
+    names = list(BASE_ASSETS[:assets]) + [f"A{index:05d}" for index in range(len(BASE_ASSETS), assets)]
+    usd_prices = {'USDT': 1.0, 'USDC': 1.0, 'FDUSD': 1.0, 'BTC': 60000.0, 'ETH': 3000.0, 'BNB': 500.0}
+
+    tickers = []
+    symbols = []
+
+    def add_pair(base, quote, price):
+        tickers.append({'symbol': f"{base}{quote}", 'price': _amount(price)})
+        symbols.append({'symbol': f"{base}{quote}", 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': quote})
+
+    for name in names:
+        if name == 'USDT':
+            continue
+        price = usd_prices.setdefault(name, rng.uniform(0.001, 200.0))
+        if name.startswith('A') and int(name[1:]) % BTC_ONLY_EVERY == 0:
+            add_pair(name, 'BTC', price / usd_prices['BTC'])
+        else:
+            add_pair(name, 'USDT', price)
+
+    balances = [
+        {'asset': name, 'free': _amount(rng.uniform(0.0, 100.0)),
+         'locked': _amount(rng.uniform(0.0, 5.0) if index % 7 == 0 else 0.0)}
+        for index, name in enumerate(names)
+    ]
+    flexible_rows = [{'asset': name, 'totalAmount': _amount(rng.uniform(1.0, 50.0))} for name in names[::10]]
+    locked_rows = [
+        {'asset': name, 'amount': _amount(amount), 'totalAmount': _amount(amount), 'endDate': 1767225600000}
+        for name, amount in ((name, rng.uniform(1.0, 50.0)) for name in names[::25])
+    ]
+
+    margin_assets = [name for name in ('USDT', 'USDC', 'BNB', 'FDUSD') if name in usd_prices]
+    futures_assets = [
+        {'asset': name, 'walletBalance': _amount(rng.uniform(10.0, 1000.0) / usd_prices[name]),
+         'unrealizedProfit': _amount(rng.uniform(-5.0, 5.0) / usd_prices[name])}
+        for name in margin_assets
+    ]
+    positions = []
+    for name in [name for name in names if name not in STABLE_ASSETS][:min(assets // 10, 300)]:
+        amount = rng.choice((-1, 1)) * rng.uniform(0.01, 10.0)
+        mark_price = usd_prices[name]
+        positions.append({
+            'symbol': f"{name}USDT", 'positionAmt': _amount(amount), 'entryPrice': _amount(mark_price * 0.99),
+            'notional': _amount(amount * mark_price), 'unrealizedProfit': _amount(amount * mark_price * 0.01),
+            'positionSide': 'BOTH', 'leverage': '10',
+        })
+    coin_m_assets = [
+        {'asset': name, 'walletBalance': _amount(rng.uniform(0.01, 2.0)), 'unrealizedProfit': _amount(0.0)}
+        for name in ('BTC', 'ETH') if name in usd_prices
+    ]
+    return {
+        'ping': {},
+        'tickers': tickers,
+        'exchange_info': {'timezone': 'UTC', 'symbols': symbols},
+        'account': {'balances': balances},
+        'earn_flexible': {'rows': flexible_rows, 'total': len(flexible_rows)},
+        'earn_locked': {'rows': locked_rows, 'total': len(locked_rows)},
+        'futures_account': {'assets': futures_assets, 'positions': positions},
+        'coin_m_account': {'assets': coin_m_assets},
+    }
+
+def load_recorded_responses(file_path, base=None):
+    """
+    Записані відповіді з JSON файлу {ключ з ROUTES або шлях запиту: тіло відповіді}
+    поверх базових (наприклад, синтетичних).
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        recorded = json.load(f)
+    responses = dict(base or {})
+    for key, body in recorded.items():
+        responses[ROUTES.get(key, key)] = body
+    return responses
+
+class _FakeBinanceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Заголовки та тіло відповіді пишуться окремо; без TCP_NODELAY keep-alive з'єднання чекало б на затримане ACK
+    disable_nagle_algorithm = True
+    server_state = None
+
+    def do_GET(self):
+        state = self.server_state
+        url = urlsplit(self.path)
+        key = ROUTES.get(url.path)
+        status, body, headers = state.respond(key, parse_qs(url.query))
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeBinanceServer:
+    """
+    HTTP сервер з відповідями Binance у фоновому потоці.
+    :param latency: Затримка кожної відповіді, секунди.
+    :param error_rate: Частка запитів (0..1), на які повертається помилка error_status.
+    :param error_status: 429 (з Retry-After: retry_after) або 5xx.
+    """
+    def __init__(self, responses, latency=0.0, error_rate=0.0, error_status=429, retry_after=0, seed=0,
+                 host='127.0.0.1', port=0):
+        self.responses = responses
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        handler = type('FakeBinanceHandler', (_FakeBinanceHandler,), {'server_state': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, key, query):
+        """:return: (HTTP статус, тіло відповіді, додаткові заголовки)."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.request_count += 1
+            fail = key not in (None, 'ping') and self._rng.random() < self.error_rate
+            if fail:
+                self.error_count += 1
+        if key is None or key not in self.responses:
+            return 404, {'code': -1, 'msg': 'Unknown endpoint'}, {}
+        if fail:
+            headers = {'Retry-After': str(self.retry_after)} if self.error_status == 429 else {}
+            return self.error_status, {'code': -1003, 'msg': 'Fake server error'}, headers
+        body = self.responses[key]
+        if key == 'tickers' and 'symbol' in query:
+            symbol = query['symbol'][0]
+            ticker = next((ticker for ticker in body if ticker['symbol'] == symbol), None)
+            if ticker is None:
+                return 400, {'code': -1121, 'msg': 'Invalid symbol.'}, {}
+            return 200, ticker, {}
+        return 200, body, {}
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.error_count = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-binance", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def client_class(self):
+        """Підклас binance.Client, усі REST адреси якого вказують на цей сервер."""
+        from binance.client import Client
+        return type('FakeBinanceClient', (Client,), {
+            'API_URL': f"{self.url}/api",
+            'MARGIN_API_URL': f"{self.url}/sapi",
+            'FUTURES_URL': f"{self.url}/fapi",
+            'FUTURES_COIN_URL': f"{self.url}/dapi",
+        })
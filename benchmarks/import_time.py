@@ -0,0 +1,104 @@
+# benchmarks/import_time.py
+"""
+Бенчмарк часу запуску CLI та імпорту модулів.
+Кожен сценарій запускається в окремому процесі інтерпретатора кілька разів; виводиться медіана
+загального часу та найдовші імпорти (python -X importtime).
+
+Приклад:
+    python benchmarks/import_time.py --repeat 5
+    python benchmarks/import_time.py --max-ms 300   # ненульовий код виходу, якщо сценарій повільніший
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Назва сценарію -> аргументи інтерпретатора
+SCENARIOS = {
+    'main --help': ['main.py', '--help'],
+    'import main': ['-c', 'import main'],
+    'import balance.script_runner': ['-c', 'import balance.script_runner'],
+    'import balance.account': ['-c', 'import balance.account'],
+    'import analysis.visualize': ['-c', 'import analysis.visualize'],
+}
+
+# Модулі, яких не повинно бути після запуску легких сценаріїв
+HEAVY_MODULES = ('binance', 'pandas', 'pandas_ta', 'matplotlib', 'pydantic')
+
+def loaded_heavy_modules(code='import main'):
+    """Повертає важкі модулі, завантажені виконанням `code` у новому процесі."""
+    check = (f"{code}\nimport sys\n"
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', check], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(',') if name]
+
+def parse_importtime(stderr, top=5):
+    """Найдовші імпорти верхнього рівня з виводу -X importtime: [(модуль, мс)]."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Лише модулі верхнього рівня (без відступу) - їхній час включає вкладені імпорти
+        if name.startswith(' ') and not name.startswith('  '):
+            try:
+                modules.append((name.strip(), int(cumulative) / 1000))
+            except ValueError:
+                continue
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:top]
+
+def run_scenario(args, repeat=5):
+    """
+    Запускає сценарій `repeat` разів.
+    :return: Словник з медіаною/мінімумом часу (мс) та найдовшими імпортами.
+    """
+    timings = []
+    slowest_imports = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True)
+        timings.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"Сценарій {args} завершився з кодом {result.returncode}: {result.stderr[-500:]}")
+        slowest_imports = parse_importtime(result.stderr)
+    return {
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'slowest_imports': slowest_imports,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк часу запуску CLI та імпорту модулів.")
+    parser.add_argument('--repeat', type=int, default=5, help="Кількість запусків кожного сценарію.")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="Запустити лише вказаний сценарій (можна кілька разів).")
+    parser.add_argument('--max-ms', type=float, help="Допустима медіана часу сценарію 'main --help', мс.")
+    parser.add_argument('--json', action='store_true', help="Вивести результати у форматі JSON.")
+    args = parser.parse_args(argv)
+
+    results = {name: run_scenario(SCENARIOS[name], args.repeat) for name in (args.scenario or SCENARIOS)}
+    heavy = loaded_heavy_modules()
+
+    if args.json:
+        print(json.dumps({'scenarios': results, 'heavy_modules_on_import_main': heavy}, indent=4, ensure_ascii=False))
+    else:
+        for name, result in results.items():
+            print(f"{name:<32} медіана {result['median_ms']:8.1f} мс   мінімум {result['min_ms']:8.1f} мс")
+            for module, cumulative_ms in result['slowest_imports']:
+                print(f"    {module:<40} {cumulative_ms:8.1f} мс")
+        print(f"Важкі модулі після 'import main': {', '.join(heavy) or 'немає'}")
+
+    failed = bool(heavy)
+    if args.max_ms is not None and 'main --help' in results and results['main --help']['median_ms'] > args.max_ms:
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,26 @@
 import argparse
-from balance import script_runner, config
+from balance import config
 import logging
 import os
 
+def _settings_overrides(args):
+    """Значення налаштувань з явно вказаних аргументів командного рядка (найвищий шар, після --set)."""
+    from balance.settings import parse_assignments
+    overrides = parse_assignments(args.settings)
+    flags = {
+        ('concurrency', 'concurrent_wallets'): False if args.sequential else None,
+        ('concurrency', 'use_async'): True if args.use_async else None,
+        ('concurrency', 'parallel_accounts'): args.parallel_accounts,
+        ('daemon', 'report_interval'): args.report_interval,
+        ('report', 'compact_json'): True if args.compact_json else None,
+        ('analysis', 'base_interval'): args.ta_base_interval,
+        ('logging', 'json_format'): True if args.log_json else None,
+    }
+    for (section, field), value in flags.items():
+        if value is not None:
+            overrides.setdefault(section, {})[field] = value
+    return overrides
+
 def main():
     """
     Головна функція для запуску скрипта.
@@ -11,6 +29,26 @@ def main():
     parser = argparse.ArgumentParser(
         description="Скрипт для роботи з акаунтом Binance."
     )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        help=f"Профіль налаштувань: {', '.join(config.SETTINGS_PROFILE_NAMES)} або профіль з файлу налаштувань."
+    )
+    parser.add_argument(
+        '--config',
+        type=str,
+        default=None,
+        help="Файл налаштувань (TOML або JSON). (За замовчуванням: service/settings.toml, якщо існує)"
+    )
+    parser.add_argument(
+        '--set',
+        dest='settings',
+        action='append',
+        default=[],
+        metavar='РОЗДІЛ.ПОЛЕ=ЗНАЧЕННЯ',
+        help="Перекрити налаштування, наприклад --set retry.retries=5 --set prices.stablecoins=USDT,USDC."
+    )
     parser.add_argument(
         '--type',
         type=str,
@@ -18,6 +56,47 @@ def main():
         choices=['full', 'spot', 'earn', 'futures', 'coin_m_futures'],
         help="Тип звіту по балансу для генерації. Якщо не вказано, звіт не генерується."
     )
+    parser.add_argument(
+        '--sequential',
+        action='store_true',
+        help="Отримувати гаманці повного звіту послідовно, без паралельних запитів."
+    )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help="Отримувати баланси через асинхронний клієнт (AsyncClient) в одному циклі подій."
+    )
+    parser.add_argument(
+        '--accounts',
+        nargs='?',
+        const='',
+        default=None,
+        help="Пакетний режим: повні звіти для всіх акаунтів з JSON файлу (за замовчуванням service/accounts.json) "
+             "та зведений звіт по портфелю."
+    )
+    parser.add_argument(
+        '--parallel-accounts',
+        type=int,
+        default=None,
+        help="Кількість акаунтів, що обробляються одночасно в пакетному режимі. (За замовчуванням: 4)"
+    )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help="Режим демона: потоки websocket для цін і залишків та повний звіт за розкладом з поточного стану."
+    )
+    parser.add_argument(
+        '--report-interval',
+        type=int,
+        default=None,
+        help="Інтервал збереження звітів у режимі демона, секунди. (За замовчуванням: 60)"
+    )
+    parser.add_argument(
+        '--compact-json',
+        action='store_true',
+        help="Зберігати JSON звіти компактно, без відступів."
+    )
     parser.add_argument(
         '--visualize',
         action='store_true',
@@ -28,15 +107,81 @@ def main():
         type=str,
         help="Символ для технічного аналізу (наприклад, BTCUSDT)."
     )
+    parser.add_argument(
+        '--ta-incremental',
+        action='store_true',
+        help="Розрахувати індикатори інкрементальним рушієм (без pandas_ta)."
+    )
+    parser.add_argument(
+        '--ta-timeframes',
+        type=str,
+        help="Мультитаймфреймовий аналіз --ta: таймфрейми через кому (наприклад, 4h,1d,1w), "
+             "що будуються з одного базового інтервалу."
+    )
+    parser.add_argument(
+        '--ta-base-interval',
+        type=str,
+        default=None,
+        help="Базовий інтервал свічок для --ta-timeframes. (За замовчуванням: 1h)"
+    )
+    parser.add_argument(
+        '--backtest',
+        type=str,
+        metavar='SYMBOL',
+        help="Бектест правила на локально збережених свічках символу (офлайн, з перебором параметрів)."
+    )
+    parser.add_argument(
+        '--backtest-rule',
+        choices=['rsi', 'supertrend', 'sma_cross'],
+        default='rsi',
+        help="Правило для --backtest. (За замовчуванням: rsi)"
+    )
+    parser.add_argument(
+        '--ta-batch',
+        nargs='*',
+        metavar='SYMBOL',
+        help="Пакетний технічний аналіз кількох символів (без символів - усі активи спотового гаманця)."
+    )
+    parser.add_argument(
+        '--ta-output',
+        type=str,
+        help="Файл результату --ta або --ta-batch: .json або .parquet "
+             "(За замовчуванням для --ta-batch: balance/output/ta_batch_output.json або .parquet "
+             "згідно з analysis.output_format)"
+    )
+    parser.add_argument(
+        '--log-json',
+        action='store_true',
+        help="Писати файл логу у форматі JSON lines (один запис - один рядок JSON)."
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=None,
+        help="Відкрити метрики у форматі Prometheus на локальному порту (http://127.0.0.1:PORT/metrics)."
+    )
     args = parser.parse_args()
 
+    # Налаштування перевіряються один раз: шари за замовчуванням < профіль < файл < змінні середовища < аргументи.
+    # pydantic імпортується лише тут, щоб --help не чекав на нього
+    from balance.settings import configure, load_settings
+    try:
+        settings = configure(load_settings(args.profile, args.config, _settings_overrides(args)))
+    except ValueError as e:
+        parser.error(f"Некоректні налаштування: {e}")
+
     # Налаштування логування
-    log_suffix = args.type if args.type else "main"
-    config.setup_logging(f"_{log_suffix}_report")
+    log_suffix = "daemon" if args.daemon else args.type if args.type else "main"
+    config.setup_logging(f"_{log_suffix}_report", **settings.logging.model_dump())
+    if settings.profile:
+        logging.info(f"Профіль налаштувань: {settings.profile}")
+
+    if args.metrics_port is not None:
+        from balance.metrics import serve_prometheus
+        serve_prometheus(args.metrics_port)
 
     # --- Виконання Технічного Аналізу ---
-    if args.ta:
-        from analysis.technical_analysis import analyze_symbol
+    if args.ta or args.ta_batch is not None:
         from balance.account import BinanceAccount
         from balance.api import load_api_keys
         
@@ -44,28 +189,75 @@ def main():
         if api_key and secret_key:
             try:
                 account = BinanceAccount(api_key, secret_key)
-                if account.client:
-                    analyze_symbol(account.client, args.ta.upper())
+                if account.client and args.ta and args.ta_timeframes:
+                    from analysis.technical_analysis import analyze_symbol_timeframes
+                    timeframes = [timeframe.strip() for timeframe in args.ta_timeframes.split(',') if timeframe.strip()]
+                    ta_results = analyze_symbol_timeframes(account.client, args.ta.upper(),
+                                                           settings.analysis.base_interval, timeframes,
+                                                           incremental=args.ta_incremental,
+                                                           limit=settings.analysis.kline_limit)
+                    if args.ta_output and ta_results:
+                        from analysis.results import save_results
+                        save_results(list(ta_results.values()), args.ta_output)
+                elif account.client and args.ta:
+                    from analysis.technical_analysis import analyze_symbol
+                    ta_result = analyze_symbol(account.client, args.ta.upper(), incremental=args.ta_incremental,
+                                               limit=settings.analysis.kline_limit)
+                    if args.ta_output and ta_result:
+                        from analysis.results import save_results
+                        save_results([ta_result], args.ta_output)
+                if account.client and args.ta_batch is not None:
+                    from analysis.batch import run_batch_from_cli
+                    run_batch_from_cli(account, args.ta_batch, incremental=args.ta_incremental,
+                                       output_path=args.ta_output)
             except ValueError as e:
                 logging.error(f"Помилка створення об'єкту BinanceAccount: {e}")
         else:
             logging.error("API ключі не знайдено, технічний аналіз неможливий.")
 
+    # --- Бектест (офлайн, без API ключів) ---
+    if args.backtest:
+        from analysis.backtest import run_backtest_from_cli
+        try:
+            run_backtest_from_cli(args.backtest, args.backtest_rule, output_path=args.ta_output)
+        except ValueError as e:
+            logging.error(f"Помилка бектесту: {e}")
+
     # --- Генерація Звіту по Балансу ---
     if args.type:
+        # Важкі модулі (клієнт Binance, numpy) імпортуються лише для обраної дії,
+        # щоб --help та --visualize запускалися швидко
+        from balance import script_runner
         script_name_for_log = f"{args.type}_report.py"
-        script_runner.run_balance_script(args.type, script_name_for_log)
+        # Поріг пилу, паралельність та формат JSON беруться з налаштувань
+        if settings.concurrency.use_async:
+            import asyncio
+            asyncio.run(script_runner.run_balance_script_async(args.type, script_name_for_log))
+        else:
+            script_runner.run_balance_script(args.type, script_name_for_log)
+
+    # --- Пакетний режим для кількох акаунтів ---
+    if args.accounts is not None:
+        from balance import batch_runner
+        batch_runner.run_batch_from_file(args.accounts or None)
+
+    # --- Режим демона ---
+    if args.daemon:
+        from balance import daemon
+        daemon.run_daemon()
 
     # --- Візуалізація ---
     if args.visualize:
         from analysis.visualize import plot_balance_history
-        history_file = os.path.join(config.OUTPUT_DIR, 'balance_history.csv')
+        from balance.history_store import open_history_store
+        # Історія старого формату (balance_history.csv) імпортується у сховище під час першого відкриття
+        history_store = open_history_store(config.OUTPUT_DIR)
         output_image = os.path.join(config.OUTPUT_DIR, 'history_chart.png')
-        plot_balance_history(history_file, output_image)
+        plot_balance_history(history_store.root_dir, output_image)
 
     # Якщо жоден з основних аргументів не надано
-    if not args.type and not args.ta and not args.visualize:
-        logging.info("Не вказано жодної дії. Використовуйте --type, --ta або --visualize. Додайте -h для допомоги.")
+    if not args.type and not args.ta and args.ta_batch is None and not args.backtest and not args.visualize and args.accounts is None and not args.daemon:
+        logging.info("Не вказано жодної дії. Використовуйте --type, --accounts, --daemon, --ta, --ta-batch, --backtest або --visualize. Додайте -h для допомоги.")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import MagicMock
-from balance.account import BinanceAccount
+from balance.account import BinanceAccount, build_futures_balance
 
 @pytest.fixture
 def mock_binance_client(mocker):
@@ -105,7 +105,43 @@ def test_get_futures_balance_with_mock(mock_binance_client):
     total_usd, futures_info = account.get_futures_balance()
 
     assert total_usd == pytest.approx(1050.0)
-    assert futures_info['Актив'] == 'USDT'
+    assert futures_info['Актив'] == 'USD'
+
+def test_build_futures_balance_multi_asset_with_positions():
+    """
+    Мультиактивна маржа: оцінюються всі маржинальні активи, позиції беруться з тієї самої відповіді.
+    """
+    futures_account_info = {
+        'assets': [
+            {'asset': 'USDT', 'walletBalance': '1000.0', 'unrealizedProfit': '50.0'},
+            {'asset': 'USDC', 'walletBalance': '200.0', 'unrealizedProfit': '-10.0'},
+            {'asset': 'BNB', 'walletBalance': '2.0', 'unrealizedProfit': '0.0'},
+            {'asset': 'FDUSD', 'walletBalance': '0.0', 'unrealizedProfit': '0.0'},
+        ],
+        'positions': [
+            {'symbol': 'BTCUSDT', 'positionAmt': '0.01', 'notional': '600.0', 'entryPrice': '55000.0',
+             'unrealizedProfit': '50.0', 'positionSide': 'BOTH', 'leverage': '10'},
+            {'symbol': 'ETHUSDC', 'positionAmt': '-1.0', 'notional': '-3000.0', 'entryPrice': '2990.0',
+             'unrealizedProfit': '-10.0', 'positionSide': 'BOTH', 'leverage': '5'},
+            {'symbol': 'XRPUSDT', 'positionAmt': '0', 'notional': '0', 'unrealizedProfit': '0'},
+        ],
+    }
+    prices = {'USDT': 1.0, 'USDC': 1.0, 'BNB': 500.0}
+    get_price = MagicMock(side_effect=lambda asset: prices.get(asset, 0.0))
+
+    total_usd, futures_info = build_futures_balance(futures_account_info, get_price)
+
+    assert total_usd == pytest.approx(1050.0 + 190.0 + 1000.0)
+    assert futures_info['Загалом (USD)'] == pytest.approx(total_usd)
+    assert futures_info['Нереалізований PNL'] == pytest.approx(40.0)
+    assert [item['Актив'] for item in futures_info['Активи']] == ['USDT', 'USDC', 'BNB']
+    assert futures_info['Активи'][2]['Вартість (USD)'] == pytest.approx(1000.0)
+    # Позиції впорядковані за номіналом; нульові пропущені, маркувальна ціна виведена з номіналу
+    positions = futures_info['Позиції']
+    assert [position['Символ'] for position in positions] == ['ETHUSDC', 'BTCUSDT']
+    assert positions[0]['Сторона'] == 'SHORT'
+    assert positions[1]['Маркувальна ціна'] == pytest.approx(60000.0)
+    assert get_price.call_count == 3
 
 def test_get_coin_m_futures_balance_with_mock(mock_binance_client):
     """
@@ -0,0 +1,49 @@
+import json
+import pandas as pd
+from analysis.kline_store import KlineStore
+from analysis.results import TechnicalAnalysisResult, validate_indicator_columns, save_results
+from analysis.technical_analysis import analyze_symbol, latest_indicators
+from tests.test_incremental import _frame
+from tests.test_kline_store import FakeKlineClient
+
+def test_incremental_engine_covers_strategy_columns():
+    """
+    Назви колонок інкрементального рушія збігаються з назвами pandas_ta у групах звіту;
+    бракує лише зміщених у майбутнє індикаторів.
+    """
+    missing, unexpected = validate_indicator_columns(latest_indicators(_frame()).index)
+
+    assert sorted(missing) == ['DPO_20', 'ICS_26', 'ISA_9', 'ISB_26']
+    assert unexpected == []
+
+def test_result_reports_missing_columns_and_exports(tmp_path):
+    """
+    Неочікувані колонки потрапляють в extra, відсутні - в missing; експорт у JSON та Parquet.
+    """
+    row = pd.Series({'close': 101.5, 'RSI_14': 55.0, 'SMA_20': float('nan'), 'AO': 1.0},
+                    name=pd.Timestamp('2024-05-01'))
+    result = TechnicalAnalysisResult.from_row('BTCUSDT', row)
+
+    assert result.indicators['momentum'] == {'RSI_14': 55.0}
+    assert result.indicators['trend'] == {'SMA_20': None}
+    assert result.extra == {'AO': 1.0}
+    assert 'AO_5_34' in result.missing
+    assert json.loads(result.to_json())['time'] == '2024-05-01T00:00:00'
+
+    assert save_results([result], str(tmp_path / 'ta.parquet'))
+    table = pd.read_parquet(tmp_path / 'ta.parquet')
+    assert table.loc[0, 'symbol'] == 'BTCUSDT' and table.loc[0, 'RSI_14'] == 55.0
+    assert save_results([result], str(tmp_path / 'ta.json'))
+    assert json.loads((tmp_path / 'ta.json').read_text(encoding='utf-8'))[0]['extra'] == {'AO': 1.0}
+
+def test_analyze_symbol_returns_result_without_printing(tmp_path, capsys):
+    """
+    analyze_symbol повертає структурований результат; друк - опційний.
+    """
+    result = analyze_symbol(FakeKlineClient(total=300), 'ETHUSDT', incremental=True, print_result=False,
+                            kline_store=KlineStore(str(tmp_path)))
+
+    assert capsys.readouterr().out == ''
+    assert result.symbol == 'ETHUSDT' and result.close == 399.0
+    assert result.values()['SMA_20'] == 389.5
+    assert 'Індикатори Моментуму' in result.format_text()
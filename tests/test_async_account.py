@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from balance.async_account import AsyncBinanceAccount
+
+def _make_client():
+    client = MagicMock()
+    client.get_all_tickers = AsyncMock(return_value=[
+        {'symbol': 'BTCUSDT', 'price': '60000.0'},
+        {'symbol': 'ETHUSDT', 'price': '3000.0'},
+    ])
+    client.get_exchange_info = AsyncMock(return_value={'symbols': [
+        {'symbol': 'BTCUSDT', 'status': 'TRADING', 'baseAsset': 'BTC', 'quoteAsset': 'USDT'},
+        {'symbol': 'ETHUSDT', 'status': 'TRADING', 'baseAsset': 'ETH', 'quoteAsset': 'USDT'},
+    ]})
+    client.get_account = AsyncMock(return_value={'balances': [
+        {'asset': 'BTC', 'free': '1.0', 'locked': '0.5'},
+        {'asset': 'ETH', 'free': '10.0', 'locked': '5.0'},
+        {'asset': 'USDT', 'free': '0.001', 'locked': '0.0'},
+    ]})
+    client.futures_coin_account = AsyncMock(return_value={'assets': [
+        {'asset': 'BTC', 'walletBalance': '2.0', 'unrealizedProfit': '-0.1'},
+    ]})
+    client.get_symbol_ticker = AsyncMock()
+    return client
+
+def test_async_spot_balance_uses_single_snapshot():
+    """
+    Асинхронний акаунт рахує спотовий баланс так само, як синхронний,
+    завантажуючи знімок цін один раз.
+    """
+    client = _make_client()
+    account = AsyncBinanceAccount(client)
+
+    spot_list, total_usd, dust_usd = asyncio.run(account.get_spot_balance(dust_threshold=0.01))
+
+    assert total_usd == pytest.approx(1.5 * 60000.0 + 15 * 3000.0)
+    assert dust_usd == pytest.approx(0.001)
+    assert len(spot_list) == 2
+    client.get_all_tickers.assert_awaited_once()
+    client.get_symbol_ticker.assert_not_awaited()
+
+def test_async_coin_m_futures_balance():
+    client = _make_client()
+    account = AsyncBinanceAccount(client)
+
+    coin_m_list, total_usd = asyncio.run(account.get_coin_m_futures_balance())
+
+    assert total_usd == pytest.approx(1.9 * 60000.0)
+    assert coin_m_list[0]['Актив'] == 'BTC'
+
+@pytest.mark.parametrize('error', [OSError("мережа недоступна"), asyncio.CancelledError()])
+def test_create_closes_connector_on_any_error(mocker, error):
+    """
+    Якщо створення клієнта завершилося будь-якою помилкою, пул з'єднань закривається, а помилка передається далі.
+    """
+    connector = MagicMock(close=AsyncMock())
+    mocker.patch('balance.async_account.aiohttp.TCPConnector', return_value=connector)
+    mocker.patch('balance.async_account.AsyncClient.create', AsyncMock(side_effect=error))
+
+    with pytest.raises(type(error)):
+        asyncio.run(AsyncBinanceAccount.create("test_key", "test_secret"))
+    connector.close.assert_awaited_once()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.backtest import signals_to_positions, run_backtest, backtest_rule, sweep, load_backtest_frame
+from analysis.kline_store import KlineStore
+from tests.test_incremental import _frame
+from tests.test_kline_store import FakeKlineClient
+
+def test_positions_fees_and_drawdown():
+    """
+    Позиція діє з наступної свічки після сигналу; комісія списується на вході та виході.
+    """
+    close = [100.0, 100.0, 110.0, 99.0, 99.0, 120.0]
+    entries = [True, False, False, False, False, False]
+    exits = [False, False, True, False, False, False]
+
+    assert signals_to_positions(entries, exits).tolist() == [1, 1, 0, 0, 0, 0]
+    result = run_backtest(close, entries, exits, fee=0.01)
+
+    assert result.equity.tolist() == pytest.approx([1.0, 0.99, 0.99 * 1.1, 0.99 * 1.1 * 0.99, 1.07811, 1.07811])
+    assert result.trades == 1
+    assert result.max_drawdown == pytest.approx(-0.01)
+    assert result.exposure == pytest.approx(2 / 6)
+
+def test_parallel_sweep_matches_single_runs():
+    """
+    Перебір у пулі процесів дає ті самі результати, що й окремі бектести.
+    """
+    df = _frame(500)
+    grid = {'lower': [25, 30, 35], 'upper': [65, 70]}
+
+    results = sweep(df, 'rsi', grid, max_workers=2, chunk_size=2)
+
+    assert len(results) == 6
+    assert [r.sharpe for r in results] == sorted((r.sharpe for r in results), reverse=True)
+    for result in results:
+        single = backtest_rule(df, 'rsi', result.params)
+        assert result.total_return == pytest.approx(single.total_return)
+        assert result.equity is None
+
+def test_backtest_frame_loads_offline_from_kline_store(tmp_path):
+    """
+    Бектест працює з локальних свічок без клієнта біржі; індикатори розраховуються на кожній свічці.
+    """
+    store = KlineStore(str(tmp_path))
+    store.update(FakeKlineClient(total=120), 'BTCUSDT', '1d', limit=120)
+
+    df = load_backtest_frame('BTCUSDT', kline_store=store)
+
+    assert len(df) == 120
+    assert np.isnan(df['SMA_20'].iloc[18]) and df['SMA_20'].iloc[19] == pytest.approx(109.5)
+    assert backtest_rule(df, 'sma_cross', {'fast': 5, 'slow': 20}).trades == 1
+    with pytest.raises(ValueError):
+        load_backtest_frame('ETHUSDT', kline_store=store)
@@ -0,0 +1,82 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from balance import batch_runner
+from balance.api import load_accounts
+from balance.report_generator import prepare_portfolio_report_data
+
+def _balances(spot_value, btc_amount):
+    return {
+        'spot': ([{'Актив': 'BTC', 'Вільний': btc_amount, 'Заблокований': 0.0, 'Всього': btc_amount,
+                   'Вартість (USD)': spot_value}], spot_value, 0.5),
+        'earn': ([], 0.0, 0.0),
+        'futures': (100.0, {'Актив': 'USD', 'Баланс гаманця': 100.0, 'Нереалізований PNL': 0.0,
+                            'Загалом (USD)': 100.0,
+                            'Активи': [{'Актив': 'USDT', 'Баланс гаманця': 100.0, 'Нереалізований PNL': 0.0,
+                                        'Загалом в монеті': 100.0, 'Ціна (USD)': 1.0, 'Вартість (USD)': 100.0}],
+                            'Позиції': []}),
+        'coin_m_futures': ([], 0.0),
+    }
+
+def test_load_accounts_skips_invalid_entries(tmp_path):
+    accounts_file = tmp_path / 'accounts.json'
+    accounts_file.write_text(json.dumps([
+        {'name': 'main', 'api_key': 'k1', 'secret_key': 's1'},
+        {'name': 'broken', 'api_key': 'k2'},
+        {'api_key': 'k3', 'secret_key': 's3'},
+        "sub4",
+        None,
+    ]), encoding='utf-8')
+
+    accounts = load_accounts(str(accounts_file))
+
+    assert accounts == [('main', 'k1', 's1'), ('account_3', 'k3', 's3')]
+
+def test_prepare_portfolio_report_aggregates_accounts():
+    json_data, txt_data, suffix = prepare_portfolio_report_data(
+        {'main': _balances(600.0, 0.01), 'sub1': _balances(1200.0, 0.02)}, failed_accounts=['sub2']
+    )
+
+    assert suffix == 'portfolio_output'
+    assert json_data['total_balance_estimated_usd'] == pytest.approx(600.0 + 1200.0 + 2 * 100.0)
+    # Маржинальні активи USDT-M входять у підсумки по активах так само, як спот, Earn та COIN-M
+    assert json_data['assets'] == [
+        {'Актив': 'BTC', 'Всього': pytest.approx(0.03), 'Вартість (USD)': pytest.approx(1800.0)},
+        {'Актив': 'USDT', 'Всього': pytest.approx(200.0), 'Вартість (USD)': pytest.approx(200.0)},
+    ]
+    assert 'sub2' in txt_data
+
+def test_batch_runner_shares_price_snapshot(mocker, tmp_path):
+    """
+    Знімок цін завантажується один раз і передається всім акаунтам.
+    """
+    mocker.patch.object(batch_runner.config, 'OUTPUT_DIR', str(tmp_path))
+    mocker.patch.object(batch_runner.config, 'PRICE_CACHE_PATH', str(tmp_path / 'price_cache.sqlite3'))
+    created_accounts = []
+
+    def make_account(api_key, secret_key, request_budget=None, persistent_price_cache=None):
+        account = MagicMock()
+        account.client = MagicMock()
+        account.ensure_price_snapshot.return_value = 'snapshot'
+        created_accounts.append(account)
+        return account
+
+    mocker.patch.object(batch_runner, 'BinanceAccount', side_effect=make_account)
+    mocker.patch.object(batch_runner.script_runner, 'collect_full_balances',
+                        side_effect=lambda account, dust, concurrent: _balances(600.0, 0.01))
+
+    results = batch_runner.run_batch_balance_script(
+        [('main', 'k1', 's1'), ('sub1', 'k2', 's2')], max_parallel_accounts=2
+    )
+
+    assert set(results) == {'main', 'sub1'}
+    assert sum(account.ensure_price_snapshot.call_count for account in created_accounts) == 1
+    for account in created_accounts:
+        account.set_price_snapshot.assert_called_once_with('snapshot')
+    portfolio = json.loads((tmp_path / 'portfolio_output.json').read_text(encoding='utf-8'))
+    assert portfolio['total_balance_estimated_usd'] == pytest.approx(2 * 700.0)
+    assert (tmp_path / 'accounts' / 'sub1' / 'balance_output.json').exists()
+    # Пакетний запуск записує власний рядок метрик, як і звичайний звіт
+    metrics = [json.loads(line) for line in (tmp_path / 'metrics.jsonl').read_text(encoding='utf-8').splitlines()]
+    assert [(record['report_type'], record['mode'], record['status']) for record in metrics][-1] == \
+        ('portfolio', 'batch', 'ok')
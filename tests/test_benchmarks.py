@@ -0,0 +1,33 @@
+import json
+from benchmarks.balance_throughput import bench_collectors, bench_run_balance_script, find_regressions
+from benchmarks.fake_binance import FakeBinanceServer, load_recorded_responses, synthetic_responses
+
+def test_fake_server_serves_every_collector_and_full_run(tmp_path):
+    """
+    Справжній клієнт python-binance працює із замінником сервера: кожен збирач робить очікувану
+    кількість запитів, а повний запуск run_balance_script не звертається до реального API.
+    """
+    recorded_path = tmp_path / 'recorded.json'
+    recorded_path.write_text(json.dumps({'/dapi/v1/account': {'assets': []}}), encoding='utf-8')
+    responses = load_recorded_responses(str(recorded_path), synthetic_responses(20))
+    with FakeBinanceServer(responses) as server:
+        results = bench_collectors(server, repeat=1)
+        full_run = bench_run_balance_script(server, repeat=1)
+    assert {name: result['requests'] for name, result in results.items()} == {
+        'price_snapshot': 2, 'spot': 1, 'earn': 2, 'futures': 1, 'coin_m_futures': 1,
+    }
+    # ping конструктора Client та перевірочний ping, знімок цін, 5 запитів гаманців
+    assert full_run['requests'] == 9
+    assert full_run['failures'] == 0
+
+def test_error_rate_is_retried_and_regressions_are_detected():
+    with FakeBinanceServer(synthetic_responses(10), error_rate=0.5, seed=1) as server:
+        results = bench_collectors(server, repeat=1)
+        assert server.error_count > 0
+    # Помилки повторюються retry_on_exception; вичерпані повтори рахуються, а не зупиняють бенчмарк
+    assert sum(result['requests'] for result in results.values()) > 7
+    assert all(result['failures'] in (0, 1) for result in results.values())
+
+    baseline = {'10:spot': {'median_ms': 10.0}, '10:earn': {'median_ms': 10.0}}
+    current = {'10:spot': {'median_ms': 11.0}, '10:earn': {'median_ms': 40.0}, '10:futures': {'median_ms': 99.0}}
+    assert find_regressions(current, baseline, tolerance=0.25, min_delta_ms=5.0) == [('10:earn', 10.0, 40.0)]
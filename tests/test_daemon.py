@@ -0,0 +1,93 @@
+import json
+import threading
+import pytest
+from unittest.mock import MagicMock
+from balance import daemon
+from balance.history_store import BalanceHistoryStore
+from balance.prices import PriceSnapshot
+
+def _snapshot():
+    return PriceSnapshot(
+        {'BTCUSDT': 60000.0, 'ETHBTC': 0.05},
+        {'BTCUSDT': ('BTC', 'USDT'), 'ETHBTC': ('ETH', 'BTC')},
+    )
+
+def test_live_portfolio_applies_ticker_and_account_events():
+    """
+    Ціни з !miniTicker@arr та залишки з outboundAccountPosition змінюють оцінку без запитів до API.
+    """
+    portfolio = daemon.LivePortfolio(_snapshot())
+    portfolio.load_spot({'balances': [{'asset': 'ETH', 'free': '1.0', 'locked': '0.0'}]})
+    _, total_usd, _ = portfolio.balances()['spot']
+    assert total_usd == pytest.approx(3000.0)
+
+    assert portfolio.apply_miniticker([{'s': 'BTCUSDT', 'c': '70000.0'}, {'s': 'UNKNOWN', 'c': '1.0'}]) == 1
+    _, total_usd, _ = portfolio.balances()['spot']
+    assert total_usd == pytest.approx(3500.0)
+
+    assert portfolio.apply_user_event({'e': 'outboundAccountPosition', 'B': [{'a': 'ETH', 'f': '2.0', 'l': '1.0'}]})
+    assert not portfolio.apply_user_event({'e': 'executionReport'})
+    spot_list, total_usd, _ = portfolio.balances()['spot']
+    assert total_usd == pytest.approx(3 * 3500.0)
+    assert spot_list[0]['Заблокований'] == 1.0
+
+def test_daemon_emits_reports_from_streamed_state(mocker, tmp_path):
+    """
+    Демон завантажує стан через REST один раз, а звіт будує з подій websocket.
+    """
+    mocker.patch.object(daemon.config, 'OUTPUT_DIR', str(tmp_path))
+    account = MagicMock()
+    account.refresh_price_snapshot.return_value = _snapshot()
+    account.get_account_info.return_value = {'balances': [{'asset': 'BTC', 'free': '1.0', 'locked': '0.0'}]}
+    account.get_earn_positions.return_value = (None, None)
+    account.get_futures_account_info.return_value = None
+    account.get_coin_m_account_info.return_value = None
+
+    websocket_manager = MagicMock()
+
+    def start_user_socket(callback):
+        # Подія надходить після підключення потоку
+        websocket_manager.price_callback([{'s': 'BTCUSDT', 'c': '65000.0'}])
+        callback({'e': 'outboundAccountPosition', 'B': [{'a': 'BTC', 'f': '2.0', 'l': '0.0'}]})
+
+    websocket_manager.start_miniticker_socket.side_effect = \
+        lambda callback: setattr(websocket_manager, 'price_callback', callback)
+    websocket_manager.start_user_socket.side_effect = start_user_socket
+
+    balance_daemon = daemon.BalanceDaemon(
+        account, report_interval=0, resync_interval=3600, websocket_manager_factory=lambda **kwargs: websocket_manager
+    )
+    assert balance_daemon.run(stop_event=threading.Event(), max_reports=2) == 2
+
+    account.get_account_info.assert_called_once()
+    websocket_manager.stop.assert_called_once()
+    report = json.loads((tmp_path / 'balance_output.json').read_text(encoding='utf-8'))
+    assert report['total_balance_estimated_usd'] == pytest.approx(130000.0)
+    totals = BalanceHistoryStore(str(tmp_path / 'history')).read(wallet='total')
+    assert len(totals) == 2
+
+def test_daemon_skips_reports_without_price_snapshot_and_stops_on_startup_failure(mocker, tmp_path, caplog):
+    """
+    Без знімка цін звіт не зберігається (інакше історія отримала б нульові підсумки),
+    а помилка початкової синхронізації зупиняє демон із записом у лог.
+    """
+    mocker.patch.object(daemon.config, 'OUTPUT_DIR', str(tmp_path))
+    save_report = mocker.patch.object(daemon.script_runner, 'save_balance_report')
+    account = MagicMock()
+    account.refresh_price_snapshot.return_value = None
+    account.get_earn_positions.return_value = (None, None)
+    websocket_manager = MagicMock()
+    balance_daemon = daemon.BalanceDaemon(
+        account, report_interval=0, resync_interval=0, websocket_manager_factory=lambda **kwargs: websocket_manager
+    )
+
+    assert balance_daemon.resync_interval == 0
+    assert balance_daemon.run(stop_event=threading.Event(), max_reports=2) == 2
+    save_report.assert_not_called()
+    account.get_account_info.assert_called_once()
+
+    account.get_account_info.side_effect = ConnectionError("мережа недоступна")
+    websocket_manager.reset_mock()
+    assert balance_daemon.run(stop_event=threading.Event(), max_reports=1) == 0
+    websocket_manager.start.assert_not_called()
+    assert "не вдалося завантажити початковий стан" in caplog.text
@@ -1,5 +1,10 @@
 import pandas as pd
-from balance.data_processing import format_spot_balance_table
+from balance.data_processing import (
+    format_spot_balance_table,
+    format_earn_balance_table,
+    TABLE_RENDERER,
+    SPOT_TABLE_COLUMNS,
+)
 
 def test_format_spot_balance_table_basic():
     """
@@ -40,3 +45,37 @@ def test_format_spot_balance_table_no_price():
     assert 'LUNA' in result_table
     assert '100.00000000' in result_table
     assert 'N/A' in result_table
+
+def test_table_renderer_matches_pandas_layout():
+    """
+    Таблиця має той самий вигляд, що й DataFrame.to_string(index=False).
+    """
+    spot_data = [
+        {'Актив': 'BTC', 'Вільний': 1.0, 'Заблокований': 0.5, 'Всього': 1.5, 'Вартість (USD)': 100000.0},
+        {'Актив': 'LUNA', 'Вільний': 100.0, 'Заблокований': 0.0, 'Всього': 100.0, 'Вартість (USD)': 'N/A'}
+    ]
+    expected = pd.DataFrame({
+        'Актив': ['BTC', 'LUNA'],
+        'Вільний': ['1.00000000', '100.00000000'],
+        'Заблокований': ['0.50000000', '0.00000000'],
+        'Всього': ['1.50000000', '100.00000000'],
+        'Вартість (USD)': ['100000.00', 'N/A'],
+    }).to_string(index=False)
+
+    result_table = format_spot_balance_table(spot_data)
+
+    assert result_table == expected
+    assert list(TABLE_RENDERER.iter_lines(spot_data, SPOT_TABLE_COLUMNS)) == expected.split('\n')
+
+def test_format_earn_balance_table_end_date_column():
+    """
+    Колонка 'Дата закінчення' з'являється лише за наявності Locked продуктів з датою.
+    """
+    flexible = {'Актив': 'BTC', 'Продукт': 'Flexible Simple Earn', 'Всього': 1.0, 'Вартість (USD)': 60000.0}
+    locked = {'Актив': 'ETH', 'Продукт': 'Locked Simple Earn', 'Всього': 2.0, 'Вартість (USD)': 'N/A',
+              'Дата закінчення': 1700000000000}
+
+    assert 'Дата закінчення' not in format_earn_balance_table([flexible])
+    table_lines = format_earn_balance_table([flexible, locked]).split('\n')
+    assert 'Дата закінчення' in table_lines[0]
+    assert table_lines[2].split() == ['ETH', 'Locked', 'Simple', 'Earn', '2.00000000', '1700000000000', 'N/A']
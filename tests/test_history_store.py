@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from datetime import datetime, timezone
+from balance.history_store import BalanceHistoryStore, HISTORY_DTYPE, open_history_store
+
+DAY_1 = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+DAY_2 = datetime(2025, 1, 2, 12, 0, tzinfo=timezone.utc).timestamp()
+
+BALANCES = {
+    'spot': ([{'Актив': 'BTC', 'Всього': 0.5, 'Вартість (USD)': 30000.0},
+              {'Актив': 'NEW', 'Всього': 10.0, 'Вартість (USD)': 'N/A'}], 30000.0, 0.5),
+    'earn': ([{'Актив': 'USDT', 'Всього': 100.0, 'Вартість (USD)': 100.0}], 100.0, 0.0),
+    'futures': (50.0, {'Актив': 'USD', 'Баланс гаманця': 50.0, 'Нереалізований PNL': 0.0, 'Загалом (USD)': 50.0,
+                       'Активи': [{'Актив': 'USDT', 'Загалом в монеті': 50.0, 'Вартість (USD)': 50.0}],
+                       'Позиції': []}),
+    'coin_m_futures': ([], 0.0),
+}
+
+def test_store_appends_per_wallet_and_asset_rows(tmp_path):
+    """
+    Кожен знімок зберігає рядки активів, підсумки гаманців та загальний баланс у файлі свого дня.
+    """
+    store = BalanceHistoryStore(str(tmp_path))
+    assert store.append(BALANCES, timestamp=DAY_1)
+    assert store.append(BALANCES, timestamp=DAY_2)
+
+    assert [day.isoformat() for day in store.partitions()] == ['2025-01-01', '2025-01-02']
+    rows = store.read(end=DAY_1 + 1)
+    assert rows.dtype == HISTORY_DTYPE
+    assert rows[rows['wallet'] == 0]['value_usd'].tolist() == [30150.0]
+    spot_btc = store.read(wallet='spot', asset='BTC')
+    assert spot_btc['amount'].tolist() == [0.5, 0.5]
+    assert np.isnan(store.read(wallet='spot', asset='NEW')['value_usd']).all()
+
+    frame = store.read_frame(start=DAY_2, wallet='futures')
+    assert frame['asset'].tolist() == ['USDT', '']
+    assert frame['value_usd'].tolist() == [50.0, 50.0]
+
+def test_store_range_reads_and_truncated_tail(tmp_path):
+    """
+    Читання за період відкидає записи поза діапазоном, а незавершений останній запис ігнорується.
+    """
+    store = BalanceHistoryStore(str(tmp_path))
+    for offset in range(5):
+        store.append_total(1000.0 + offset, timestamp=DAY_1 + offset * 60)
+    with open(store._partition_path(store.partitions()[0]), 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    timestamps, totals = store.total_series(start=DAY_1 + 60, end=DAY_1 + 180)
+    assert totals.tolist() == [1001.0, 1002.0]
+    assert len(store.read()) == 5
+
+def test_append_after_truncated_tail_keeps_records_aligned(tmp_path):
+    """
+    Дописування після незавершеного запису відкидає його, тож наступні записи читаються без зсуву.
+    """
+    store = BalanceHistoryStore(str(tmp_path))
+    store.append_total(1000.0, timestamp=DAY_1)
+    with open(store._partition_path(store.partitions()[0]), 'ab') as f:
+        f.write(b'\x01' * 7)
+
+    store.append_total(1001.0, timestamp=DAY_1 + 60)
+    store.append_total(1002.0, timestamp=DAY_1 + 120)
+
+    timestamps, totals = store.total_series()
+    assert totals.tolist() == [1000.0, 1001.0, 1002.0]
+    assert store.read()['timestamp'].tolist() == [DAY_1, DAY_1 + 60, DAY_1 + 120]
+
+def test_open_history_store_imports_legacy_csv(tmp_path):
+    """
+    Історія старого формату (balance_history.csv) імпортується один раз у порожнє сховище.
+    """
+    (tmp_path / 'balance_history.csv').write_text(
+        "timestamp,total_balance_usd\n2025-01-01 10:00:00,100.50\n2025-01-01 11:00:00,101.25\n", encoding='utf-8'
+    )
+    store = open_history_store(str(tmp_path))
+    assert store.read(wallet='total')['value_usd'].tolist() == pytest.approx([100.5, 101.25])
+
+    store.append_total(102.0)
+    assert len(open_history_store(str(tmp_path)).read(wallet='total')) == 3
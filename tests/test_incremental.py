@@ -0,0 +1,127 @@
+import logging
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.incremental import IncrementalIndicatorEngine, SMA, EMA, RSI, MACD, BBANDS, ATR, OBV, STOCH, AROON
+from analysis.results import INCREMENTAL_INDICATOR_GROUPS, TechnicalAnalysisResult, validate_indicator_columns
+from analysis.technical_analysis import latest_indicators
+
+def _frame(length=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, length))
+    high = close + rng.uniform(0.1, 2.0, length)
+    low = close - rng.uniform(0.1, 2.0, length)
+    index = pd.date_range('2024-01-01', periods=length, freq='D', name='timestamp')
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.uniform(1, 10, length)}, index=index)
+
+def _ema(series, length):
+    seeded = series.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = series.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean()
+
+def test_incremental_values_match_full_recalculation():
+    """
+    Останні значення інкрементальних індикаторів збігаються з розрахунком по всій історії в pandas.
+    """
+    df = _frame()
+    close, high, low = df['close'], df['high'], df['low']
+    engine = IncrementalIndicatorEngine([SMA(20), EMA(50), RSI(14), MACD(12, 26, 9), BBANDS(20, 2.0),
+                                         ATR(14), OBV(), STOCH(14, 3, 3), AROON(14)])
+    latest = latest_indicators(df, engine)
+
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1 / 14, min_periods=14).mean()
+    macd = _ema(close, 12) - _ema(close, 26)
+    signal = _ema(macd.dropna(), 9)
+    true_range = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    true_range.iloc[0] = np.nan
+    stoch = 100 * (close - low.rolling(14).min()) / (high.rolling(14).max() - low.rolling(14).min())
+    stoch_k = stoch.rolling(3).mean()
+    window = close.iloc[-20:]
+
+    expected = {
+        'SMA_20': window.mean(),
+        'EMA_50': _ema(close, 50).iloc[-1],
+        'RSI_14': 100 * gain.iloc[-1] / (gain.iloc[-1] + loss.iloc[-1]),
+        'MACD_12_26_9': macd.iloc[-1],
+        'MACDs_12_26_9': signal.iloc[-1],
+        'BBU_20_2.0': window.mean() + 2 * window.std(ddof=0),
+        'ATRr_14': true_range.ewm(alpha=1 / 14, min_periods=14).mean().iloc[-1],
+        'OBV': (np.sign(change.fillna(1)) * df['volume']).sum(),
+        'STOCHk_14_3_3': stoch_k.iloc[-1],
+        'STOCHd_14_3_3': stoch_k.rolling(3).mean().iloc[-1],
+        # Максимум вікна з 15 свічок на позиції argmax -> (14 - argmax) свічок тому
+        'AROONU_14': 100 * int(np.argmax(high.iloc[-15:].to_numpy())) / 14,
+    }
+    for name, value in expected.items():
+        assert latest[name] == pytest.approx(value, rel=1e-9), name
+    assert latest.name == df.index[-1]
+    assert latest['close'] == close.iloc[-1]
+
+def test_engine_updates_one_candle_at_a_time_like_full_pass():
+    """
+    Дописування свічки до прогрітого рушія дає той самий результат, що й повний прохід.
+    """
+    df = _frame(260)
+    warm = IncrementalIndicatorEngine()
+    latest_indicators(df.iloc[:-1], warm)
+    incremental = latest_indicators(df.iloc[-1:], warm)
+    full = latest_indicators(df)
+
+    assert warm.count == len(df)
+    for name, value in full.items():
+        if isinstance(value, float) and math.isnan(value):
+            assert math.isnan(incremental[name]), name
+        else:
+            assert incremental[name] == pytest.approx(value), name
+    # Усі індикатори стандартного набору прогріті на 260 денних свічках
+    assert not any(math.isnan(value) for value in full.drop(['PSARs_0.02_0.2', 'PSARl_0.02_0.2',
+                                                             'SUPERTl_7_3.0', 'SUPERTs_7_3.0']))
+
+def test_incremental_result_has_no_missing_columns(caplog):
+    """
+    Результат інкрементального рушія перевіряється на його власний набір колонок, без попереджень про DPO та Ішимоку.
+    """
+    latest = latest_indicators(_frame())
+
+    assert validate_indicator_columns(latest.index, INCREMENTAL_INDICATOR_GROUPS) == ([], [])
+    with caplog.at_level(logging.WARNING):
+        result = TechnicalAnalysisResult.from_row('BTCUSDT', latest, groups=INCREMENTAL_INDICATOR_GROUPS)
+    assert result.missing == []
+    assert not caplog.records
+
+def test_latest_indicators_collects_values_once(mocker):
+    """
+    Прогрів по всій історії збирає значення індикаторів лише після останньої свічки.
+    """
+    df = _frame(50)
+    engine = IncrementalIndicatorEngine()
+    latest = mocker.spy(engine, 'latest')
+
+    result = latest_indicators(df, engine)
+
+    assert latest.call_count == 1
+    assert engine.count == len(df)
+    assert result['close'] == df['close'].iloc[-1]
+
+def test_engine_matches_pandas_ta_after_warmup():
+    """
+    Після прогріву рушій дає ті самі колонки та значення, що й стратегія pandas_ta (add_technical_indicators).
+    """
+    pytest.importorskip("pandas_ta")
+    from analysis.technical_analysis import add_technical_indicators
+
+    df = _frame(600)
+    expected = add_technical_indicators(df.copy()).iloc[-1]
+    latest = latest_indicators(df)
+
+    assert sorted(set(latest.index) - set(expected.index)) == []
+    for name, value in latest.items():
+        if math.isnan(expected[name]):
+            assert math.isnan(value), name
+        else:
+            assert value == pytest.approx(expected[name], rel=1e-6, abs=1e-9), name
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from analysis.kline_store import KlineStore, KLINE_DTYPE
+from analysis.technical_analysis import get_historical_data
+
+DAY_MS = 86_400_000
+
+class FakeKlineClient:
+    """Імітує GET /api/v3/klines для денних свічок з open_time = 0, DAY_MS, ..., (total - 1) * DAY_MS."""
+    def __init__(self, total):
+        self.total = total
+        self.calls = []
+
+    def _kline(self, index):
+        close = str(100.0 + index)
+        return [index * DAY_MS, close, close, close, close, '1.0', (index + 1) * DAY_MS - 1,
+                '100.0', 10, '0.5', '50.0', '0']
+
+    def get_klines(self, symbol, interval, limit, startTime=None, endTime=None):
+        self.calls.append({'limit': limit, 'startTime': startTime, 'endTime': endTime})
+        indices = range(self.total)
+        if startTime is not None:
+            indices = [i for i in indices if i * DAY_MS >= startTime][:limit]
+        else:
+            if endTime is not None:
+                indices = [i for i in indices if i * DAY_MS <= endTime]
+            indices = list(indices)[-limit:]
+        return [self._kline(i) for i in indices]
+
+def test_store_fetches_only_new_candles_after_first_download(tmp_path):
+    """
+    Перший запуск завантажує історію сторінками, наступний - один запит від останньої (незакритої) свічки.
+    """
+    client = FakeKlineClient(total=250)
+    store = KlineStore(str(tmp_path), max_request_limit=100)
+
+    first = store.update(client, 'btcusdt', '1d', limit=200)
+    assert len(first) == 200 and len(client.calls) == 2
+    assert first['open_time'][-1] == 249 * DAY_MS
+
+    client.total = 252
+    client.calls.clear()
+    second = store.update(client, 'BTCUSDT', '1d', limit=200)
+
+    assert client.calls == [{'limit': 100, 'startTime': 249 * DAY_MS, 'endTime': None}]
+    assert isinstance(second, np.memmap)
+    assert second['open_time'][-1] == 251 * DAY_MS
+    assert np.array_equal(np.diff(store.load('BTCUSDT', '1d')['open_time']), np.full(201, DAY_MS))
+
+def test_store_backfills_deeper_history_and_feeds_dataframe(tmp_path):
+    """
+    Більший ліміт дозавантажує свічки в минуле; DataFrame будується з масиву сховища.
+    """
+    client = FakeKlineClient(total=400)
+    store = KlineStore(str(tmp_path), max_request_limit=100)
+    store.update(client, 'ETHUSDT', '1d', limit=50)
+
+    client.calls.clear()
+    df = get_historical_data(client, 'ETHUSDT', limit=320, kline_store=store)
+
+    assert [call['endTime'] for call in client.calls[1:]] == [350 * DAY_MS - 1, 250 * DAY_MS - 1, 150 * DAY_MS - 1]
+    assert len(df) == 320
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert df['close'].iloc[-1] == pytest.approx(499.0)
+    assert df.index[0] == np.datetime64(80 * DAY_MS, 'ms')
+    assert len(store.load('ETHUSDT', '1d')) == 320
+    assert store.load('ETHUSDT', '1d').dtype == KLINE_DTYPE
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _loaded_modules(code, modules):
+    check = f"{code}\nimport sys\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', check], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(',') if name]
+
+@pytest.mark.parametrize('code, forbidden', [
+    ('import main', ('binance', 'pandas', 'numpy', 'matplotlib', 'pydantic')),
+    ('import balance.script_runner', ('binance', 'pandas', 'matplotlib')),
+    ('import analysis.visualize', ('binance', 'pandas', 'matplotlib')),
+])
+def test_cli_modules_do_not_import_heavy_dependencies(code, forbidden):
+    """
+    Важкі залежності (клієнт Binance, pandas, matplotlib) завантажуються лише дією, якій вони потрібні.
+    """
+    assert _loaded_modules(code, forbidden) == []
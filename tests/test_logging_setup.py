@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import time
+import pytest
+from balance import config
+
+@pytest.fixture
+def isolated_logging(mocker, tmp_path):
+    """Тимчасова папка логів; обробники кореневого логера (зокрема pytest) відновлюються після тесту."""
+    mocker.patch.object(config, 'LOG_DIR', str(tmp_path))
+    mocker.patch.object(config, '_LOGGING_INITIALIZED', False)
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    for handler in saved_handlers:
+        root.removeHandler(handler)
+    yield tmp_path
+    config.shutdown_logging()
+    root.setLevel(saved_level)
+    for handler in saved_handlers:
+        root.addHandler(handler)
+
+def test_queue_logging_writes_json_lines_off_the_calling_thread(isolated_logging):
+    """
+    Виклик logging.* лише кладе запис у чергу; файл JSON lines пише потік QueueListener.
+    """
+    config.setup_logging('_full_report', json_format=True)
+    assert [type(handler).__name__ for handler in logging.getLogger().handlers] == ['_LogQueueHandler']
+    logging.info("Баланс %s: %.2f USD", 'spot', 12.5)
+    try:
+        raise ValueError("збій")
+    except ValueError:
+        logging.exception("Помилка гаманця")
+    config.shutdown_logging()
+
+    lines = (isolated_logging / 'full_report.log').read_text(encoding='utf-8').splitlines()
+    entries = [json.loads(line) for line in lines]
+    assert entries[1]['message'] == "Баланс spot: 12.50 USD"
+    assert entries[1]['level'] == 'INFO' and entries[1]['module'] == 'test_logging_setup.py'
+    assert entries[2]['message'] == "Помилка гаманця"
+    assert 'ValueError: збій' in entries[2]['exception']
+
+def test_rotation_and_retention_bound_the_log_directory(isolated_logging):
+    old_log = isolated_logging / '2024-01-01_00-00-00_full_report.log'
+    old_log.write_text("старий лог", encoding='utf-8')
+    stale = time.time() - 40 * 86400
+    os.utime(old_log, (stale, stale))
+
+    config.setup_logging('_spot_report', use_queue=False, max_bytes=200, backup_count=2, retention_days=30)
+    for index in range(50):
+        logging.info(f"Рядок логу {index}")
+    config.shutdown_logging()
+
+    assert not old_log.exists()
+    expected = ['spot_report.log', 'spot_report.log.1', 'spot_report.log.2']
+    if config.fcntl is not None:
+        expected.insert(0, 'spot_report.lock')
+    assert sorted(path.name for path in isolated_logging.iterdir()) == expected
+
+def test_repeated_setup_registers_exit_handler_once_and_logs_cleanup_errors(isolated_logging, mocker):
+    """
+    Повторне налаштування не додає ще один обробник atexit, а помилка видалення старого логу потрапляє у файл логу.
+    """
+    mocker.patch.object(config, '_ATEXIT_REGISTERED', False)
+    register = mocker.patch.object(config.atexit, 'register')
+    old_log = isolated_logging / 'old_report.log'
+    old_log.write_text("старий лог", encoding='utf-8')
+    stale = time.time() - 40 * 86400
+    os.utime(old_log, (stale, stale))
+    mocker.patch.object(config.os, 'remove', side_effect=PermissionError("зайнято"))
+
+    for _ in range(2):
+        config.setup_logging('_full_report')
+        config.shutdown_logging()
+
+    register.assert_called_once_with(config.shutdown_logging)
+    assert "Не вдалося видалити старий файл логу" in (isolated_logging / 'full_report.log').read_text(encoding='utf-8')
+
+@pytest.mark.skipif(config.fcntl is None, reason="блокування між процесами лише з fcntl")
+def test_rotation_by_another_process_reopens_the_log_file(tmp_path):
+    """
+    Обробник, файл якого ротував інший процес, перевідкриває новий файл замість запису в ротований.
+    """
+    log_path = str(tmp_path / 'full_report.log')
+    first = config._file_handler(log_path, 'size', 10_000, 3)
+    second = config._file_handler(log_path, 'size', 10_000, 3)
+    try:
+        first.handle(logging.makeLogRecord({'msg': "перший"}))
+        first.doRollover()
+        second.handle(logging.makeLogRecord({'msg': "другий"}))
+    finally:
+        first.close()
+        second.close()
+
+    assert (tmp_path / 'full_report.log.1').read_text(encoding='utf-8') == "перший\n"
+    assert (tmp_path / 'full_report.log').read_text(encoding='utf-8') == "другий\n"
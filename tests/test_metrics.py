@@ -0,0 +1,63 @@
+import json
+import urllib.request
+from unittest.mock import MagicMock
+from balance import account as account_module
+from balance.account import BinanceAccount, retry_on_exception
+from balance.metrics import MetricsRegistry, record_run, serve_prometheus
+
+def _counter(records, name, **labels):
+    return sum(record['value'] for record in records
+               if record['name'] == name and all(record['labels'].get(k) == v for k, v in labels.items()))
+
+def test_run_record_contains_api_timers_cache_counters_and_retries(mocker, tmp_path):
+    """
+    Запис запуску містить час кожного методу API, влучання/промахи кешу цін та кількість повторів.
+    """
+    mocker.patch.object(account_module.time, 'sleep')
+    client = MagicMock()
+    client.get_symbol_ticker.return_value = {'price': '60000.0'}
+    mocker.patch('balance.account.Client', return_value=client)
+    account = BinanceAccount(api_key="test_key", secret_key="test_secret")
+    account.client = client
+    mocker.patch.object(account, 'ensure_price_snapshot', return_value=None)
+    calls = {'count': 0}
+
+    @retry_on_exception(retries=3, delay=1)
+    def flaky():
+        calls['count'] += 1
+        if calls['count'] == 1:
+            raise account_module.ConnectionError("reset")
+        return 'ok'
+
+    metrics_path = tmp_path / 'metrics.jsonl'
+    with record_run(str(metrics_path), report_type='spot'):
+        account.get_price_in_usd('BTC')
+        account.get_price_in_usd('BTC')
+        flaky()
+
+    record = json.loads(metrics_path.read_text(encoding='utf-8').splitlines()[-1])
+    assert record['report_type'] == 'spot' and record['status'] == 'ok'
+    assert _counter(record['counters'], 'price_cache_misses_total') == 1
+    assert _counter(record['counters'], 'price_cache_hits_total', source='memory') == 1
+    assert _counter(record['counters'], 'api_retries_total', function='flaky') == 1
+    api_timers = [timer for timer in record['timers'] if timer['name'] == 'api_call_seconds']
+    assert {timer['labels']['method'] for timer in api_timers} == {'get_symbol_ticker'}
+    assert any(timer['name'] == 'price_resolution_seconds' for timer in record['timers'])
+
+def test_prometheus_endpoint_exposes_counters_and_summaries():
+    registry = MetricsRegistry()
+    registry.increment('api_retries_total', function='get_account')
+    registry.observe('api_call_seconds', 0.25, method='get_account')
+    registry.observe('api_call_seconds', 0.75, method='get_account')
+    server = serve_prometheus(0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            text = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert '# TYPE binance_balance_api_retries_total counter' in text
+    assert 'binance_balance_api_retries_total{function="get_account"} 1' in text
+    assert 'binance_balance_api_call_seconds_count{method="get_account"} 2' in text
+    assert 'binance_balance_api_call_seconds_sum{method="get_account"} 1.000000' in text
@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+from balance import price_cache
+from balance.account import BinanceAccount
+from balance.price_cache import PersistentPriceCache
+
+def _set_time(mocker, value):
+    mocker.patch.object(price_cache.time, 'time', return_value=value)
+
+def test_persistent_cache_expires_positive_and_negative_entries(mocker, tmp_path):
+    """
+    Додатні ціни живуть ttl секунд, негативні записи (0.0) - коротший negative_ttl.
+    """
+    _set_time(mocker, 1000.0)
+    cache = PersistentPriceCache(str(tmp_path / 'prices.sqlite3'), ttl=300, negative_ttl=60)
+    cache.set_many({'BTC': 60000.0, 'DEAD': 0.0})
+
+    _set_time(mocker, 1059.0)
+    assert cache.get('BTC') == 60000.0
+    assert cache.get('DEAD') == 0.0
+
+    _set_time(mocker, 1061.0)
+    assert cache.get('BTC') == 60000.0
+    assert cache.get('DEAD') is None
+
+    _set_time(mocker, 1301.0)
+    assert cache.get('BTC') is None
+    cache.close()
+
+def test_persistent_cache_evicts_oldest_entries(mocker, tmp_path):
+    """
+    Розмір кешу обмежено max_entries: видаляються найдавніше оновлені записи.
+    """
+    cache = PersistentPriceCache(str(tmp_path / 'prices.sqlite3'), max_entries=2)
+    for offset, symbol in enumerate(['AAA', 'BBB', 'CCC']):
+        _set_time(mocker, 1000.0 + offset)
+        cache.set(symbol, 1.0 + offset)
+    cache.evict()
+
+    assert cache.get('AAA') is None
+    assert cache.get('BBB') == 2.0
+    assert cache.get('CCC') == 3.0
+    cache.close()
+
+def test_account_starts_with_warm_cache(mocker, tmp_path):
+    """
+    Ціни, знайдені одним запуском, повторно використовуються наступним без запитів до API.
+    """
+    db_path = str(tmp_path / 'prices.sqlite3')
+    first_client = MagicMock()
+    first_client.get_all_tickers.return_value = [{'symbol': 'BTCUSDT', 'price': '60000.0'}]
+    first_client.get_exchange_info.return_value = {
+        'symbols': [{'symbol': 'BTCUSDT', 'status': 'TRADING', 'baseAsset': 'BTC', 'quoteAsset': 'USDT'}]
+    }
+    mocker.patch('balance.account.Client', return_value=first_client)
+    with PersistentPriceCache(db_path) as cache:
+        assert BinanceAccount('key', 'secret', persistent_price_cache=cache).get_price_in_usd('BTC') == 60000.0
+
+    second_client = MagicMock()
+    mocker.patch('balance.account.Client', return_value=second_client)
+    with PersistentPriceCache(db_path) as cache:
+        account = BinanceAccount('key', 'secret', persistent_price_cache=cache)
+        assert account.get_price_in_usd('BTC') == 60000.0
+    second_client.get_all_tickers.assert_not_called()
+    second_client.get_symbol_ticker.assert_not_called()
+
+def test_negative_price_is_retried_after_ttl(mocker):
+    """
+    Невдалий пошук ціни кешується лише на negative TTL, а не до кінця роботи процесу.
+    """
+    mock_client = MagicMock()
+    mock_client.get_all_tickers.return_value = [{'symbol': 'BTCUSDT', 'price': '60000.0'}]
+    mock_client.get_exchange_info.return_value = {
+        'symbols': [{'symbol': 'BTCUSDT', 'status': 'TRADING', 'baseAsset': 'BTC', 'quoteAsset': 'USDT'}]
+    }
+    mocker.patch('balance.account.Client', return_value=mock_client)
+    monotonic = mocker.patch.object(price_cache.time, 'monotonic', return_value=100.0)
+    account = BinanceAccount('key', 'secret')
+
+    assert account.get_price_in_usd('NEW') == 0.0
+    account.price_snapshot.usd_prices['NEW'] = 2.5
+    assert account.get_price_in_usd('NEW') == 0.0
+
+    monotonic.return_value = 100.0 + price_cache.DEFAULT_NEGATIVE_PRICE_TTL + 1
+    assert account.get_price_in_usd('NEW') == 2.5
+
+def test_memory_prices_expire_and_reset_on_snapshot_refresh(mocker):
+    """
+    Ціни в пам'яті довготривалого акаунту живуть лише price TTL і скидаються після оновлення знімка цін.
+    """
+    mock_client = MagicMock()
+    mock_client.get_all_tickers.return_value = [{'symbol': 'BTCUSDT', 'price': '60000.0'}]
+    mock_client.get_exchange_info.return_value = {
+        'symbols': [{'symbol': 'BTCUSDT', 'status': 'TRADING', 'baseAsset': 'BTC', 'quoteAsset': 'USDT'}]
+    }
+    mocker.patch('balance.account.Client', return_value=mock_client)
+    monotonic = mocker.patch.object(price_cache.time, 'monotonic', return_value=100.0)
+    account = BinanceAccount('key', 'secret')
+
+    assert account.get_price_in_usd('BTC') == 60000.0
+    account.price_snapshot.usd_prices['BTC'] = 65000.0
+    assert account.get_price_in_usd('BTC') == 60000.0
+    monotonic.return_value = 100.0 + price_cache.DEFAULT_PRICE_TTL + 1
+    assert account.get_price_in_usd('BTC') == 65000.0
+
+    mock_client.get_all_tickers.return_value = [{'symbol': 'BTCUSDT', 'price': '70000.0'}]
+    account.refresh_price_snapshot()
+    assert account.get_price_in_usd('BTC') == 70000.0
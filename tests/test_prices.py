@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import MagicMock
+from balance.account import BinanceAccount
+from balance.prices import PriceSnapshot
+
+TICKERS = [
+    {'symbol': 'BTCUSDT', 'price': '60000.0'},
+    {'symbol': 'ETHUSDT', 'price': '3000.0'},
+    {'symbol': 'BNBUSDT', 'price': '500.0'},
+    {'symbol': 'XYZBTC', 'price': '0.001'},
+    {'symbol': 'OLDUSDT', 'price': '1.0'},
+]
+
+EXCHANGE_INFO = {
+    'symbols': [
+        {'symbol': 'BTCUSDT', 'status': 'TRADING', 'baseAsset': 'BTC', 'quoteAsset': 'USDT'},
+        {'symbol': 'ETHUSDT', 'status': 'TRADING', 'baseAsset': 'ETH', 'quoteAsset': 'USDT'},
+        {'symbol': 'BNBUSDT', 'status': 'TRADING', 'baseAsset': 'BNB', 'quoteAsset': 'USDT'},
+        {'symbol': 'XYZBTC', 'status': 'TRADING', 'baseAsset': 'XYZ', 'quoteAsset': 'BTC'},
+        {'symbol': 'OLDUSDT', 'status': 'BREAK', 'baseAsset': 'OLD', 'quoteAsset': 'USDT'},
+    ]
+}
+
+@pytest.fixture
+def snapshot_client(mocker):
+    """Імітований клієнт, що повертає повний знімок цін."""
+    mock_client = MagicMock()
+    mock_client.get_all_tickers.return_value = TICKERS
+    mock_client.get_exchange_info.return_value = EXCHANGE_INFO
+    mock_client.get_account.return_value = {
+        'balances': [
+            {'asset': 'BTC', 'free': '1.0', 'locked': '0.0'},
+            {'asset': 'ETH', 'free': '2.0', 'locked': '0.0'},
+            {'asset': 'XYZ', 'free': '100.0', 'locked': '0.0'},
+        ]
+    }
+    mocker.patch('balance.account.Client', return_value=mock_client)
+    return mock_client
+
+def test_snapshot_resolves_direct_and_converted_prices():
+    snapshot = PriceSnapshot.from_responses(TICKERS, EXCHANGE_INFO)
+
+    assert snapshot.resolve_usd('USDT') == 1.0
+    assert snapshot.resolve_usd('ETH') == pytest.approx(3000.0)
+    # XYZ торгується лише в парі з BTC
+    assert snapshot.resolve_usd('XYZ') == pytest.approx(0.001 * 60000.0)
+    # Пари, що не торгуються, не потрапляють в індекс
+    assert snapshot.resolve_usd('OLD') is None
+
+def test_spot_balance_uses_snapshot_without_per_symbol_requests(snapshot_client):
+    account = BinanceAccount(api_key="test_key", secret_key="test_secret")
+
+    spot_list, total_usd, dust_usd = account.get_spot_balance(dust_threshold=0.01)
+
+    assert total_usd == pytest.approx(60000.0 + 2 * 3000.0 + 100 * 60.0)
+    assert len(spot_list) == 3
+    snapshot_client.get_symbol_ticker.assert_not_called()
+    snapshot_client.get_all_tickers.assert_called_once()
+
+def test_conversion_graph_multi_hop_routes():
+    """
+    Активи, що торгуються лише в парах з ETH, FDUSD або TRY, оцінюються через кілька кроків.
+    """
+    tickers = TICKERS + [
+        {'symbol': 'ABCETH', 'price': '0.01'},
+        {'symbol': 'FDUSDUSDT', 'price': '1.0'},
+        {'symbol': 'DEFFDUSD', 'price': '2.0'},
+        {'symbol': 'USDTTRY', 'price': '40.0'},
+        {'symbol': 'GHITRY', 'price': '80.0'},
+    ]
+    exchange_info = {'symbols': EXCHANGE_INFO['symbols'] + [
+        {'symbol': 'ABCETH', 'status': 'TRADING', 'baseAsset': 'ABC', 'quoteAsset': 'ETH'},
+        {'symbol': 'FDUSDUSDT', 'status': 'TRADING', 'baseAsset': 'FDUSD', 'quoteAsset': 'USDT'},
+        {'symbol': 'DEFFDUSD', 'status': 'TRADING', 'baseAsset': 'DEF', 'quoteAsset': 'FDUSD'},
+        {'symbol': 'USDTTRY', 'status': 'TRADING', 'baseAsset': 'USDT', 'quoteAsset': 'TRY'},
+        {'symbol': 'GHITRY', 'status': 'TRADING', 'baseAsset': 'GHI', 'quoteAsset': 'TRY'},
+    ]}
+    snapshot = PriceSnapshot.from_responses(tickers, exchange_info)
+
+    assert snapshot.resolve_usd('ABC') == pytest.approx(0.01 * 3000.0)
+    assert snapshot.resolve_usd('DEF') == pytest.approx(2.0)
+    assert snapshot.resolve_usd('GHI') == pytest.approx(80.0 / 40.0)
+    assert snapshot.graph.get_route('ABC') == ['ABCETH', 'ETHUSDT']
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from binance.exceptions import BinanceAPIException
+from balance import account as account_module
+from balance import async_account as async_account_module
+from balance.account import BinanceAccount, retry_on_exception
+from balance.rate_limit import (
+    CircuitBreaker,
+    CircuitOpenError,
+    WeightRateLimiter,
+    compute_backoff_delay,
+)
+
+def _api_error(status_code, code=-1003, headers=None):
+    response = MagicMock()
+    response.headers = headers or {}
+    return BinanceAPIException(response, status_code, f'{{"code": {code}, "msg": "Too many requests"}}')
+
+def test_backoff_grows_exponentially_with_jitter():
+    for attempt, upper in [(1, 2.0), (2, 4.0), (3, 8.0), (10, 30.0)]:
+        delay = compute_backoff_delay(attempt, base_delay=2.0, max_delay=30.0)
+        assert upper / 2 <= delay <= upper
+
+def test_retry_honors_retry_after_on_rate_limit(mocker):
+    sleep = mocker.patch.object(account_module.time, 'sleep')
+    calls = {'count': 0}
+
+    @retry_on_exception(retries=3, delay=2)
+    def flaky():
+        calls['count'] += 1
+        if calls['count'] == 1:
+            raise _api_error(429, headers={'Retry-After': '7'})
+        return 'ok'
+
+    assert flaky() == 'ok'
+    sleep.assert_called_once_with(7.0)
+
+def test_retry_gives_up_after_all_attempts(mocker):
+    mocker.patch.object(account_module.time, 'sleep')
+    failing = MagicMock(side_effect=_api_error(500, code=-1000), __name__='failing')
+
+    with pytest.raises(BinanceAPIException):
+        retry_on_exception(retries=3, delay=1)(failing)()
+    assert failing.call_count == 3
+
+def test_limiter_waits_when_used_weight_near_limit():
+    limiter = WeightRateLimiter(weight_limits={'spot': 1000})
+    limiter.update_from_headers({'x-mbx-used-weight-1m': '500'})
+    assert limiter.wait_time('spot') == 0.0
+
+    limiter.update_from_headers({'x-mbx-used-weight-1m': '950'})
+    assert 0.0 < limiter.wait_time('spot') <= 60.0
+    # Вага інших API рахується окремо
+    assert limiter.wait_time('futures') == 0.0
+
+class _SharedResponseClient:
+    """Як binance.Client: остання відповідь зберігається в одному атрибуті, спільному для всіх потоків."""
+    def __init__(self, *args, **kwargs):
+        self.session = MagicMock(hooks={'response': []})
+        self.response = None
+        self._barrier = threading.Barrier(2)
+
+    def _respond(self, weight, result):
+        self.response = MagicMock(headers={'x-mbx-used-weight-1m': str(weight)})
+        for hook in self.session.hooks['response']:
+            hook(self.response)
+        # Обидва запити отримали відповіді до того, як будь-який виклик прочитав заголовки
+        self._barrier.wait(timeout=5)
+        return result
+
+    def ping(self):
+        return {}
+
+    def get_account(self):
+        return self._respond(950, {'balances': []})
+
+    def futures_account(self):
+        return self._respond(100, {'assets': []})
+
+def test_concurrent_calls_record_their_own_weight_headers(mocker):
+    """
+    Паралельні виклики спотового та ф'ючерсного API записують вагу зі своєї відповіді, а не з останньої спільної.
+    """
+    mocker.patch('balance.account.Client', _SharedResponseClient)
+    limiter = WeightRateLimiter()
+    account = BinanceAccount(api_key="test_key", secret_key="test_secret", rate_limiter=limiter)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(account._call_api, 'get_account'),
+                   executor.submit(account._call_api, 'futures_account')]
+        for future in futures:
+            future.result()
+    assert limiter._used_weight['spot'][0] == 950
+    assert limiter._used_weight['futures'][0] == 100
+
+    async_client = MagicMock()
+
+    async def respond(weight, result):
+        async_client.response = MagicMock(headers={'x-mbx-used-weight-1m': str(weight)})
+        await async_account_module._on_request_end(None, None, MagicMock(response=async_client.response))
+        await asyncio.sleep(0)
+        return result
+
+    async_client.get_account = lambda: respond(700, {'balances': []})
+    async_client.futures_account = lambda: respond(50, {'assets': []})
+    async_limiter = WeightRateLimiter()
+    async_account = async_account_module.AsyncBinanceAccount(async_client, rate_limiter=async_limiter)
+
+    async def run():
+        await asyncio.gather(async_account._call_api('get_account'), async_account._call_api('futures_account'))
+
+    asyncio.run(run())
+    assert async_limiter._used_weight['spot'][0] == 700
+    assert async_limiter._used_weight['futures'][0] == 50
+
+def test_circuit_breaker_opens_and_half_opens(mocker):
+    clock = mocker.patch('balance.rate_limit.time.monotonic', return_value=100.0)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0)
+
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.return_value = 111.0
+    breaker.before_call()  # пробний запит дозволено
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
@@ -0,0 +1,108 @@
+import json
+import pytest
+from balance import report_generator
+from balance.data_processing import save_to_json
+
+def _wallets():
+    return {
+        'spot': ([{'Актив': 'BTC', 'Вільний': 1.0, 'Заблокований': 0.0, 'Всього': 1.0, 'Вартість (USD)': 60000.0}],
+                 60000.0, 0.5),
+        'earn': ([{'Актив': 'USDT', 'Продукт': 'Flexible Simple Earn', 'Всього': 100.0, 'Вартість (USD)': 100.0}],
+                 100.0, 0.0),
+        'futures': (250.0, {'Актив': 'USD', 'Баланс гаманця': 200.0, 'Нереалізований PNL': 50.0,
+                            'Загалом (USD)': 250.0,
+                            'Активи': [{'Актив': 'USDT', 'Баланс гаманця': 200.0, 'Нереалізований PNL': 50.0,
+                                        'Загалом в монеті': 250.0, 'Ціна (USD)': 1.0, 'Вартість (USD)': 250.0}],
+                            'Позиції': []}),
+        'coin_m_futures': ([{'Актив': 'BTC', 'Баланс гаманця': 0.1, 'Нереалізований PNL': 0.0,
+                             'Загалом в монеті': 0.1, 'Вартість (USD)': 6000.0}], 6000.0),
+    }
+
+def _strip_timestamp(text):
+    return [line for line in text.split('\n') if not line.startswith('Звіт про баланс Binance станом на')]
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_stream_matches_prepared_full_report_in_any_wallet_order(tmp_path, compact):
+    """
+    Потоковий запис дає той самий звіт, що й prepare_full_report_data, незалежно від порядку гаманців.
+    """
+    wallets = _wallets()
+    expected_json, expected_txt, suffix = report_generator.prepare_full_report_data(
+        *wallets['spot'], *wallets['earn'], *reversed(wallets['futures']), *wallets['coin_m_futures']
+    )
+
+    with report_generator.FullReportStream(str(tmp_path), compact_json=compact) as stream:
+        for wallet in ['coin_m_futures', 'futures', 'spot', 'earn']:
+            stream.add_wallet(wallet, wallets[wallet])
+
+    json_text = (tmp_path / f'{suffix}.json').read_text(encoding='utf-8')
+    streamed_json = json.loads(json_text)
+    assert ('\n' not in json_text) == compact
+    assert streamed_json.pop('timestamp')
+    expected_json.pop('timestamp')
+    assert streamed_json == expected_json
+    streamed_txt = (tmp_path / f'{suffix}.txt').read_text(encoding='utf-8')
+    assert _strip_timestamp(streamed_txt) == _strip_timestamp(expected_txt)
+
+def test_failed_report_keeps_previous_files(tmp_path):
+    """
+    Якщо отримання гаманців обривається помилкою, попередній звіт лишається цілим, а тимчасових файлів немає.
+    """
+    save_to_json({'old': True}, str(tmp_path), 'balance_output.json')
+
+    with pytest.raises(RuntimeError):
+        with report_generator.FullReportStream(str(tmp_path)) as stream:
+            stream.add_wallet('spot', _wallets()['spot'])
+            raise RuntimeError("API недоступний")
+
+    assert json.loads((tmp_path / 'balance_output.json').read_text(encoding='utf-8')) == {'old': True}
+    assert not (tmp_path / 'balance_output.txt').exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['balance_output.json']
+
+def test_error_while_finishing_report_keeps_previous_files(tmp_path, mocker):
+    """
+    Помилка під час запису підсумків звіту не зберігає обрізаний звіт замість попереднього.
+    """
+    save_to_json({'old': True}, str(tmp_path), 'balance_output.json')
+    mocker.patch.object(report_generator, '_full_report_footer', side_effect=OSError("диск заповнено"))
+
+    with pytest.raises(OSError):
+        with report_generator.FullReportStream(str(tmp_path)) as stream:
+            for wallet, result in _wallets().items():
+                stream.add_wallet(wallet, result)
+
+    assert json.loads((tmp_path / 'balance_output.json').read_text(encoding='utf-8')) == {'old': True}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['balance_output.json']
+
+def test_spot_report_reuses_rendered_table(mocker):
+    """
+    Таблиця, уже відрендерена для логу, потрапляє у TXT звіт без повторного форматування.
+    """
+    render = mocker.spy(report_generator.data_processing.TABLE_RENDERER, 'render')
+    spot_list, total_usd, dust_usd = _wallets()['spot']
+    table = report_generator.data_processing.format_spot_balance_table(spot_list)
+
+    _, txt_data, _ = report_generator.prepare_spot_report_data(spot_list, total_usd, dust_usd, table)
+
+    assert table in txt_data
+    assert render.call_count == 1
+
+def test_failed_json_commit_discards_txt_temp_file(tmp_path, mocker):
+    """
+    Якщо не вдалося замінити JSON файл звіту, тимчасовий TXT файл теж відкидається.
+    """
+    real_replace = report_generator.data_processing.os.replace
+
+    def replace(source, target):
+        if target.endswith('.json'):
+            raise OSError("немає доступу")
+        return real_replace(source, target)
+
+    mocker.patch.object(report_generator.data_processing.os, 'replace', side_effect=replace)
+
+    with pytest.raises(OSError):
+        with report_generator.FullReportStream(str(tmp_path)) as stream:
+            for wallet, result in _wallets().items():
+                stream.add_wallet(wallet, result)
+
+    assert list(tmp_path.iterdir()) == []
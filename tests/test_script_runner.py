@@ -0,0 +1,57 @@
+import threading
+from unittest.mock import MagicMock
+from balance.script_runner import collect_full_balances
+
+def _make_account():
+    account = MagicMock()
+    account.get_spot_balance.return_value = ([{'Актив': 'BTC'}], 100.0, 1.0)
+    account.get_earn_balance.return_value = ([], 50.0, 0.0)
+    account.get_futures_balance.return_value = (25.0, {'Актив': 'USDT'})
+    account.get_coin_m_futures_balance.return_value = ([], 10.0)
+    return account
+
+def test_collect_full_balances_concurrent_matches_sequential():
+    """
+    Паралельний та послідовний режими повертають однакові дані гаманців.
+    """
+    sequential = collect_full_balances(_make_account(), 0.5, concurrent=False)
+    concurrent = collect_full_balances(_make_account(), 0.5, concurrent=True)
+
+    assert concurrent == sequential
+    assert concurrent['spot'] == ([{'Актив': 'BTC'}], 100.0, 1.0)
+    assert concurrent['futures'] == (25.0, {'Актив': 'USDT'})
+
+def test_collect_full_balances_runs_wallets_in_parallel():
+    """
+    Усі чотири гаманці запитуються одночасно: кожен чекає, доки стартують інші.
+    """
+    account = _make_account()
+    barrier = threading.Barrier(4, timeout=5)
+
+    def wait_for_all(result):
+        def _call(*args, **kwargs):
+            barrier.wait()
+            return result
+        return _call
+
+    account.get_spot_balance.side_effect = wait_for_all(([], 0.0, 0.0))
+    account.get_earn_balance.side_effect = wait_for_all(([], 0.0, 0.0))
+    account.get_futures_balance.side_effect = wait_for_all((0.0, None))
+    account.get_coin_m_futures_balance.side_effect = wait_for_all(([], 0.0))
+
+    balances = collect_full_balances(account, 0.01, concurrent=True)
+
+    assert set(balances) == {'spot', 'earn', 'futures', 'coin_m_futures'}
+    account.ensure_price_snapshot.assert_called_once()
+
+def test_collect_full_balances_reports_each_wallet_as_it_arrives():
+    """
+    on_wallet викликається для кожного гаманця, щойно його отримано (в обох режимах).
+    """
+    for concurrent in (False, True):
+        received = []
+        balances = collect_full_balances(_make_account(), 0.5, concurrent=concurrent,
+                                         on_wallet=lambda wallet, result: received.append((wallet, result)))
+
+        assert sorted(received) == sorted(balances.items())
+        assert list(balances) == ['spot', 'earn', 'futures', 'coin_m_futures']
@@ -0,0 +1,105 @@
+import os
+import pytest
+from balance import account as account_module
+from balance import config, rate_limit, settings as settings_module
+from balance.account import BinanceAccount, retry_on_exception
+from balance.account import build_spot_balance
+from balance.prices import CONVERSION_ASSETS, STABLECOIN_QUOTES, USD_STABLECOINS
+from balance.settings import configure, load_settings
+
+def test_layers_override_in_order_profile_file_env_cli(tmp_path):
+    """
+    Шари накладаються у порядку: профіль < файл < змінні середовища < аргументи командного рядка.
+    """
+    settings_file = tmp_path / 'settings.toml'
+    settings_file.write_text(
+        'profile = "cron-fast"\n'
+        '[retry]\nretries = 4\n'
+        '[prices]\nstablecoins = ["usdt", "fdusd"]\n',
+        encoding='utf-8',
+    )
+    environ = {
+        'BINANCE_BALANCE_RETRY__DELAY': '0.5',
+        'BINANCE_BALANCE_RATE_LIMIT__WEIGHT_LIMITS__SPOT': '3000',
+        'BINANCE_BALANCE_REPORT__DUST_THRESHOLD': '1',
+        'BINANCE_API_KEY': 'не налаштування',
+    }
+    overrides = settings_module.parse_assignments(['report.dust_threshold=0.5', 'paths.output_dir=reports'])
+
+    settings = load_settings(config_path=str(settings_file), overrides=overrides, environ=environ)
+
+    assert settings.profile == 'cron-fast'
+    # Назви профілів для довідки main.py збігаються з визначеними профілями
+    assert tuple(settings_module.PROFILES) == config.SETTINGS_PROFILE_NAMES
+    # Профіль
+    assert settings.prices.cache_ttl == 900 and settings.history.snapshot_archive is False
+    # Файл перекриває профіль, змінна середовища - файл, аргумент - змінну середовища
+    assert settings.retry.retries == 4 and settings.retry.delay == 0.5
+    assert settings.prices.stablecoins == ['USDT', 'FDUSD']
+    assert settings.report.dust_threshold == 0.5
+    assert settings.rate_limit.weight_limits == {'spot': 3000, 'futures': 2400, 'coin_m': 2400}
+    assert settings.paths.output_dir == os.path.join(config.PROJECT_ROOT_DIR, 'reports')
+
+@pytest.mark.parametrize('kwargs', [
+    {'profile': 'невідомий'},
+    {'overrides': {'retry': {'retires': 5}}},
+    {'overrides': {'analysis': {'kline_limit': 5000}}},
+    {'environ': {'BINANCE_BALANCE_HISTORY__BACKEND': 'csv'}},
+])
+def test_invalid_settings_are_rejected_at_load(kwargs):
+    kwargs.setdefault('environ', {})
+    with pytest.raises(ValueError):
+        load_settings(config_path=None, **kwargs)
+
+def test_configured_settings_drive_retries_and_stablecoins(mocker, monkeypatch, tmp_path):
+    """
+    Після configure() кількість повторів і список стейблкоїнів беруться з налаштувань без повторного читання середовища.
+    """
+    for name in ('DOTENV_PATH', 'ACCOUNTS_PATH', 'LOG_DIR', 'OUTPUT_DIR', 'PRICE_CACHE_PATH', 'HISTORY_DIR',
+                 'SNAPSHOT_ARCHIVE_DIR', 'KLINE_STORE_DIR'):
+        monkeypatch.setattr(config, name, getattr(config, name))
+    monkeypatch.setattr(settings_module, '_SETTINGS', None)
+    monkeypatch.setattr(rate_limit, 'DEFAULT_RATE_LIMITER', rate_limit.WeightRateLimiter())
+    original_lists = [(prices_list, list(prices_list)) for prices_list in (USD_STABLECOINS, STABLECOIN_QUOTES,
+                                                                          CONVERSION_ASSETS)]
+    mocker.patch.object(account_module.time, 'sleep')
+    mocker.patch('balance.account.Client')
+    try:
+        configure(load_settings(overrides={
+            'retry': {'retries': 2},
+            'prices': {'stablecoins': 'USDT,FDUSD', 'quote_stablecoins': 'fdusd', 'conversion_assets': []},
+            'report': {'dust_threshold': 5.0},
+            'rate_limit': {'safety_ratio': 0.5},
+            'paths': {'output_dir': str(tmp_path)},
+        }, environ={}))
+
+        assert config.PRICE_CACHE_PATH == str(tmp_path / 'price_cache.sqlite3')
+        assert rate_limit.DEFAULT_RATE_LIMITER.safety_ratio == 0.5
+
+        account = BinanceAccount(api_key="test_key", secret_key="test_secret")
+        assert account.get_price_in_usd('FDUSD') == 1.0
+        account.client.get_symbol_ticker.assert_not_called()
+        # Без знімка цін пряма ціна шукається лише через налаштовані котирувальні стейблкоїни
+        account.price_snapshot, account._price_snapshot_attempted = None, True
+        account.client.get_symbol_ticker.return_value = {'price': '2.0'}
+        assert account.get_price_in_usd('ABC') == 2.0
+        account.client.get_symbol_ticker.assert_called_once_with(symbol='ABCFDUSD')
+        # Поріг 'пилу' за замовчуванням береться з налаштувань
+        spot_list, _, dust = build_spot_balance(
+            {'balances': [{'asset': 'ABC', 'free': '1.0', 'locked': '0.0'}]}, lambda asset: 2.0
+        )
+        assert spot_list == [] and dust == 2.0
+
+        calls = {'count': 0}
+
+        @retry_on_exception()
+        def failing():
+            calls['count'] += 1
+            raise account_module.ConnectionError("reset")
+
+        with pytest.raises(account_module.ConnectionError):
+            failing()
+        assert calls['count'] == 2
+    finally:
+        for prices_list, original in original_lists:
+            prices_list[:] = original
@@ -0,0 +1,52 @@
+import json
+import pytest
+from balance.snapshot_archive import SnapshotArchive, attribute_pnl
+
+def _balances(btc_amount, btc_price, usdt_earn=100.0):
+    return {
+        'spot': ([{'Актив': 'BTC', 'Всього': btc_amount, 'Вартість (USD)': btc_amount * btc_price}],
+                 btc_amount * btc_price, 0.0),
+        'earn': ([{'Актив': 'USDT', 'Продукт': 'Flexible Simple Earn', 'Всього': usdt_earn,
+                   'Вартість (USD)': usdt_earn}] if usdt_earn else [], usdt_earn, 0.0),
+        'futures': (0.0, None),
+        'coin_m_futures': ([{'Актив': 'BTC', 'Загалом в монеті': 0.1, 'Вартість (USD)': 0.1 * btc_price}],
+                           0.1 * btc_price),
+    }
+
+def test_archive_stores_deltas_between_keyframes(tmp_path):
+    """
+    Між ключовими кадрами записуються лише змінені позиції та ціни.
+    """
+    archive = SnapshotArchive(str(tmp_path), keyframe_interval=3)
+    archive.append(_balances(1.0, 60000.0), timestamp=100.0)
+    archive.append(_balances(1.0, 61000.0), timestamp=160.0)
+    archive.append(_balances(1.5, 61000.0, usdt_earn=0.0), timestamp=220.0)
+    archive.append(_balances(1.5, 62000.0, usdt_earn=0.0), timestamp=280.0)
+
+    segments = archive.segments()
+    assert len(segments) == 2
+    records = [json.loads(line) for line in open(segments[0][1], encoding='utf-8')]
+    assert records[0]['k'] == 1
+    assert records[1] == {'t': 160.0, 'prices': {'set': {'BTC': 61000.0}}}
+    assert records[2]['positions'] == {'set': {'spot:BTC': 1.5}, 'del': ['earn:USDT:Flexible Simple Earn']}
+
+def test_archive_reconstructs_any_point_in_time(tmp_path):
+    """
+    Стан на довільний момент відновлюється з найближчого ключового кадру та дельт,
+    у тому числі новим екземпляром архіву (наступним запуском).
+    """
+    archive = SnapshotArchive(str(tmp_path), keyframe_interval=2)
+    for index, (amount, price) in enumerate([(1.0, 60000.0), (1.0, 61000.0), (2.0, 61000.0), (2.0, 59000.0)]):
+        archive.append(_balances(amount, price), timestamp=100.0 + index * 60)
+
+    state = SnapshotArchive(str(tmp_path)).reconstruct(at=190.0)
+    assert state['timestamp'] == 160.0
+    assert state['positions']['spot:BTC'] == 1.0
+    assert state['values']['coin_m_futures:BTC'] == pytest.approx(6100.0)
+    assert SnapshotArchive(str(tmp_path)).reconstruct()['prices']['BTC'] == 59000.0
+    assert SnapshotArchive(str(tmp_path)).reconstruct(at=50.0) is None
+    assert [snapshot['timestamp'] for snapshot in archive.iter_snapshots(start=150.0, end=280.0)] == [160.0, 220.0]
+
+    attribution = attribute_pnl(archive.reconstruct(at=100.0), archive.reconstruct())
+    assert attribution['spot:BTC']['quantity_effect'] == pytest.approx(60000.0)
+    assert attribution['spot:BTC']['price_effect'] == pytest.approx(2 * -1000.0)
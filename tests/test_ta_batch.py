@@ -0,0 +1,40 @@
+import json
+from unittest.mock import MagicMock
+from analysis.batch import held_spot_symbols, run_batch_analysis, save_batch_result
+from analysis.kline_store import KlineStore
+from tests.test_kline_store import FakeKlineClient
+
+class FailingSymbolClient(FakeKlineClient):
+    def get_klines(self, symbol, interval, limit, startTime=None, endTime=None):
+        if symbol == 'BADUSDT':
+            raise ValueError("Invalid symbol.")
+        return super().get_klines(symbol, interval, limit, startTime, endTime)
+
+def test_held_spot_symbols_skip_stablecoins():
+    """
+    Без списку символів аналізуються всі нестейблкоїн активи спотового гаманця.
+    """
+    account = MagicMock()
+    account.get_spot_balance.return_value = ([{'Актив': 'ETH'}, {'Актив': 'USDT'}, {'Актив': 'BTC'}], 0.0, 0.0)
+
+    assert held_spot_symbols(account) == ['BTCUSDT', 'ETHUSDT']
+
+def test_batch_analysis_in_process_pool_writes_single_table(tmp_path):
+    """
+    Символи аналізуються в пулі процесів; помилка одного символу не зупиняє інших.
+    """
+    client = FailingSymbolClient(total=260)
+    store = KlineStore(str(tmp_path / 'klines'))
+
+    rows, errors = run_batch_analysis(client, ['ethusdt', 'BTCUSDT', 'BADUSDT', 'ETHUSDT'], limit=250,
+                                      kline_store=store, incremental=True, max_workers=2)
+
+    assert [row['symbol'] for row in rows] == ['BTCUSDT', 'ETHUSDT']
+    assert set(errors) == {'BADUSDT'}
+    assert rows[0]['close'] == 359.0 and rows[0]['SMA_20'] == 349.5
+    assert rows[0]['PSARs_0.02_0.2'] is None
+
+    output_path = save_batch_result(rows, errors, str(tmp_path / 'ta.json'))
+    saved = json.loads(open(output_path, encoding='utf-8').read())
+    assert saved['results'] == rows
+    assert saved['errors'] == errors
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.kline_store import KlineStore, KLINE_DTYPE
+from analysis.technical_analysis import analyze_timeframes
+from analysis.timeframes import resample_klines, HOUR_MS, DAY_MS
+
+def _hourly(start_ms, count, seed=3):
+    rng = np.random.default_rng(seed)
+    records = np.zeros(count, dtype=KLINE_DTYPE)
+    records['open_time'] = start_ms + np.arange(count) * HOUR_MS
+    records['close_time'] = records['open_time'] + HOUR_MS - 1
+    records['open'] = 100 + rng.normal(0, 1, count)
+    records['close'] = records['open'] + rng.normal(0, 1, count)
+    records['high'] = np.maximum(records['open'], records['close']) + rng.uniform(0, 1, count)
+    records['low'] = np.minimum(records['open'], records['close']) - rng.uniform(0, 1, count)
+    records['volume'] = rng.uniform(1, 5, count)
+    records['number_of_trades'] = rng.integers(1, 100, count)
+    return records
+
+class HourlyClient:
+    """Імітує get_klines для годинних свічок; фіксує запитані інтервали."""
+    def __init__(self, records):
+        self.records = records
+        self.intervals = []
+
+    def get_klines(self, symbol, interval, limit, startTime=None, endTime=None):
+        self.intervals.append(interval)
+        records = self.records
+        if startTime is not None:
+            records = records[records['open_time'] >= startTime][:limit]
+        else:
+            if endTime is not None:
+                records = records[records['open_time'] <= endTime]
+            records = records[-limit:]
+        return [list(record.tolist()) + ['0'] for record in records]
+
+def test_resample_matches_pandas_and_binance_week_alignment():
+    """
+    OHLCV старших інтервалів збігаються з pandas resample; тижні починаються в понеділок.
+    """
+    # 2024-01-03 05:00 UTC (середа): перший денний та тижневий кошики неповні і відкидаються
+    start = int(pd.Timestamp('2024-01-03 05:00', tz='UTC').value // 1_000_000)
+    records = _hourly(start, 24 * 30)
+    frame = pd.DataFrame({name: records[name] for name in ('open', 'high', 'low', 'close', 'volume')},
+                         index=pd.to_datetime(records['open_time'], unit='ms'))
+
+    daily = resample_klines(records, '1d', '1h')
+    expected = frame.resample('1D').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    expected = expected.iloc[1:]
+    assert np.array_equal(daily['open_time'], expected.index.as_unit('ms').asi8)
+    for name in ('open', 'high', 'low', 'close', 'volume'):
+        assert np.allclose(daily[name], expected[name].to_numpy()), name
+    assert daily['number_of_trades'][0] == records['number_of_trades'][19:43].sum()
+
+    weekly = resample_klines(records, '1w')
+    assert [pd.Timestamp(t, unit='ms').day_name() for t in weekly['open_time']] == ['Monday'] * len(weekly)
+    assert weekly['open_time'][0] == pd.Timestamp('2024-01-08').value // 1_000_000
+    assert weekly['close_time'][0] == weekly['open_time'][1] - 1
+
+    four_hours = resample_klines(records, '4h')
+    assert four_hours['open_time'][0] == start + 3 * HOUR_MS
+    with pytest.raises(ValueError):
+        resample_klines(records, '1w', '5h')
+
+def test_analyze_timeframes_downloads_only_base_interval(tmp_path):
+    """
+    Усі таймфрейми будуються з одного завантаження базового інтервалу.
+    """
+    client = HourlyClient(_hourly(0, 24 * 70))
+    store = KlineStore(str(tmp_path), max_request_limit=1000)
+
+    results = analyze_timeframes(client, 'BTCUSDT', '1h', ('1h', '4h', '1d'), limit=60, kline_store=store,
+                                 incremental=True)
+
+    assert set(client.intervals) == {'1h'}
+    assert results['1d'].name == pd.Timestamp((70 - 60) * DAY_MS, unit='ms') + pd.Timedelta(days=59)
+    assert results['1d']['close'] == results['4h']['close'] == results['1h']['close']
+    assert not np.isnan(results['4h']['SMA_50'])
@@ -0,0 +1,36 @@
+import pytest
+from unittest.mock import MagicMock
+from balance.account import build_spot_balance
+from balance.valuation import value_positions
+
+def test_value_positions_masks_dust_and_unknown_prices():
+    """
+    Пил виключається з підсумку та звіту, а активи без ціни лишаються у звіті без вартості.
+    """
+    prices = {'BTC': 60000.0, 'SHIB': 0.00001, 'NEW': 0.0}
+    get_price = MagicMock(side_effect=prices.get)
+    indices, row_prices, values, total, dust = value_positions(
+        ['BTC', 'SHIB', 'NEW', 'BTC', 'ETH'], [1.0, 100.0, 5.0, 0.5, 0.0], get_price, dust_threshold=0.01
+    )
+
+    assert indices.tolist() == [0, 2, 3]
+    assert row_prices.tolist() == [60000.0, 0.0, 60000.0]
+    assert values.tolist() == [60000.0, 0.0, 30000.0]
+    assert total == pytest.approx(90000.0)
+    assert dust == pytest.approx(0.001)
+    # Ціна кожного активу запитується один раз і лише для ненульових позицій
+    assert sorted(call.args[0] for call in get_price.call_args_list) == ['BTC', 'NEW', 'SHIB']
+
+def test_build_spot_balance_skips_zero_rows_of_large_account():
+    """
+    get_account повертає всі активи біржі з нульовими залишками - ціни для них не шукаються.
+    """
+    balances = [{'asset': f'A{index}', 'free': '0.00000000', 'locked': '0.00000000'} for index in range(5000)]
+    balances.append({'asset': 'ETH', 'free': '1.5', 'locked': '0.5'})
+    get_price = MagicMock(return_value=3000.0)
+
+    spot_list, total, dust = build_spot_balance({'balances': balances}, get_price)
+
+    get_price.assert_called_once_with('ETH')
+    assert spot_list == [{'Актив': 'ETH', 'Вільний': 1.5, 'Заблокований': 0.5, 'Всього': 2.0, 'Вартість (USD)': 6000.0}]
+    assert (total, dust) == (6000.0, 0.0)